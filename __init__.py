@@ -4,3 +4,4 @@ from .integer import (IntegerEditor, )
 from .color import (RGBAPicker, )
 from .file import (FilePicker, FilePickerTranslation, )
 from .image import (ImagePicker, ImagePickerTranslation, )
+from .resource_browser import (ResourceBrowser, ResourceListModel, )
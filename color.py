@@ -12,39 +12,14 @@ from PySide6.QtWidgets import (
 
 
 from .interface.previewable_editor import (PreviewableEditor, ValueChangedData, )
+from .dialog_pool import (DialogPool, )
 
-class RGBAPicker(PreviewableEditor[str], ):
-    @staticmethod
-    def formatRGBA(r: int, g: int, b: int, a: int) -> str:
-        return "rgba({}, {}, {}, {})".format(r, g, b, a / 255.0)
-
-    @staticmethod
-    def parseRGBA(value: str) -> tuple[int, int, int, int]:
-        try:
-            r, g, b, a = [float(x.strip()) for x in value[5:-1].split(",")]
-            return int(r), int(g), int(b), int(a * 255)
-        except (ValueError, IndexError):
-            return 0, 0, 0, 0
-
-    def __init__(
-        self,
-        parent: Optional[QObject] = None,
-        /,
-        labelText: Optional[str] = None,
-        windowIcon: Optional[QIcon | QPixmap] = None,
-        formatter: Callable[[int, int, int, int], str] = formatRGBA,
-        parser: Callable[[str], tuple[int, int, int, int]] = parseRGBA,
-    ):
-        super().__init__(parent, labelText=labelText, )
-        self.__formatter = formatter
-        self.__parser = parser
-
+class _RGBADialog(QDialog, ):
+    def __init__(self, ):
+        super().__init__()
         # dialog used to edit A,R,G,B
-        self.__dialog = QDialog()
-        self.__dialog.setModal(True, )
-        if windowIcon:
-            self.__dialog.setWindowIcon(windowIcon, )
-        self.__layout = QGridLayout(self.__dialog, )
+        self.setModal(True, )
+        self.__layout = QGridLayout(self, )
 
         self.__layout.addWidget(QLabel("A:"), 0, 0, alignment=Qt.AlignmentFlag.AlignRight)
         self.__spinA = QSpinBox()
@@ -74,8 +49,8 @@ class RGBAPicker(PreviewableEditor[str], ):
 
         # buttons
         self.__buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, )
-        self.__buttons.accepted.connect(self.__dialog.accept, )
-        self.__buttons.rejected.connect(self.__dialog.reject, )
+        self.__buttons.accepted.connect(self.accept, )
+        self.__buttons.rejected.connect(self.reject, )
         self.__layout.addWidget(self.__buttons, 4, 0, 1, 3, )
 
     def __updateSample(self, _=None):
@@ -89,20 +64,76 @@ class RGBAPicker(PreviewableEditor[str], ):
             f"background-color: rgba({r},{g},{b},{alpha}); border: 1px solid #000;"
         )
 
-    def getValue(self) -> str:
-        a = self.__spinA.value()
-        r = self.__spinR.value()
-        g = self.__spinG.value()
-        b = self.__spinB.value()
-        return self.__formatter(r, g, b, a)
-
-    def setValue(self, value: str) -> None:
-        r, g, b, a = self.__parser(value)
+    def choose(
+        self, r: int, g: int, b: int, a: int,
+        windowIcon: Optional[QIcon | QPixmap],
+    ) -> Optional[tuple[int, int, int, int]]:
+        """
+        Show the dialog with the given color. The chosen color, or None if
+        the dialog was cancelled.
+        """
+        DialogPool.setWindowIcon(self, windowIcon, )
+        # populate dialog with current value
         self.__spinA.setValue(a)
         self.__spinR.setValue(r)
         self.__spinG.setValue(g)
         self.__spinB.setValue(b)
-        self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
+        self.__updateSample()
+
+        if self.exec() == QDialog.DialogCode.Accepted:
+            return self.__spinR.value(), self.__spinG.value(), self.__spinB.value(), self.__spinA.value()
+        return None
+
+
+class RGBAPicker(PreviewableEditor[str], ):
+    @staticmethod
+    def formatRGBA(r: int, g: int, b: int, a: int) -> str:
+        return "rgba({}, {}, {}, {})".format(r, g, b, a / 255.0)
+
+    @staticmethod
+    def parseRGBA(value: str) -> tuple[int, int, int, int]:
+        try:
+            r, g, b, a = [float(x.strip()) for x in value[5:-1].split(",")]
+            return int(r), int(g), int(b), int(a * 255)
+        except (ValueError, IndexError):
+            return 0, 0, 0, 0
+
+    def __init__(
+        self,
+        parent: Optional[QObject] = None,
+        /,
+        labelText: Optional[str] = None,
+        windowIcon: Optional[QIcon | QPixmap] = None,
+        formatter: Callable[[int, int, int, int], str] = formatRGBA,
+        parser: Callable[[str], tuple[int, int, int, int]] = parseRGBA,
+        sharedDialog: bool = False,
+    ):
+        """
+        The dialog is only built when the picker is first opened. With
+        `sharedDialog`, every RGBAPicker uses one dialog.
+        """
+        super().__init__(parent, labelText=labelText, )
+        self.__formatter = formatter
+        self.__parser = parser
+        self.__windowIcon = windowIcon
+        self.__sharedDialog = sharedDialog
+        # current color, channels clamped as the spin boxes would
+        self.__rgba = (0, 0, 0, 0, )
+
+        self.__dialog: Optional[_RGBADialog] = None
+
+    def __getDialog(self, ) -> _RGBADialog:
+        if self.__dialog is None:
+            self.__dialog = DialogPool.get(RGBAPicker, _RGBADialog, ) if self.__sharedDialog else _RGBADialog()
+        return self.__dialog
+
+    def getValue(self) -> str:
+        r, g, b, a = self.__rgba
+        return self.__formatter(r, g, b, a)
+
+    def setValue(self, value: str) -> None:
+        self.__rgba = tuple(min(max(c, 0, ), 255, ) for c in self.__parser(value))
+        self._emitValueChanged(ValueChangedData(None, self.getValue(), ), )
 
     def getPreview(self) -> str:
         r, g, b, a = self.__parser(self.getValue())
@@ -116,15 +147,8 @@ class RGBAPicker(PreviewableEditor[str], ):
         """
 
     def _modify(self) -> None:
-        # populate dialog with current value
         r, g, b, a = self.__parser(self.getValue())
-        self.__spinA.setValue(a)
-        self.__spinR.setValue(r)
-        self.__spinG.setValue(g)
-        self.__spinB.setValue(b)
-        self.__updateSample()
-
-        if self.__dialog.exec() == QDialog.DialogCode.Accepted:
+        chosen = self.__getDialog().choose(r, g, b, a, self.__windowIcon, )
+        if chosen is not None:
             # apply chosen value
-            self.setValue(self.getValue())
-
+            self.setValue(self.__formatter(*chosen))
@@ -0,0 +1,31 @@
+from typing import (Callable, Hashable, TypeVar, Optional, )
+import weakref
+
+from PySide6.QtGui import (QPixmap, QIcon, )
+from PySide6.QtWidgets import (QDialog, )
+
+
+D = TypeVar("D", bound=QDialog, )
+class DialogPool:
+    """
+    Dialogs shared by every editor asking with the same key.
+    A pooled dialog lives as long as one of the editors holding it.
+    """
+    __dialogs: "weakref.WeakValueDictionary[Hashable, QDialog]" = weakref.WeakValueDictionary()
+
+    @classmethod
+    def get(cls, key: Hashable, factory: Callable[[], D], ) -> D:
+        dialog = cls.__dialogs.get(key, )
+        if dialog is None:
+            dialog = factory()
+            cls.__dialogs[key] = dialog
+        return dialog
+
+    @staticmethod
+    def setWindowIcon(dialog: QDialog, windowIcon: Optional[QIcon | QPixmap], ):
+        """
+        Give `dialog` the icon of the picker it is shown for. A pooled dialog
+        is shared by pickers with different icons, so this is done on every
+        showing, and the icon is cleared for pickers without one.
+        """
+        dialog.setWindowIcon(QIcon(windowIcon) if windowIcon else QIcon())
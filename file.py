@@ -1,20 +1,18 @@
 from typing import (Optional, Iterable, )
+from functools import (partial, )
+import logging
 
-from PySide6.QtCore import (QObject, Slot, Qt, )
+from PySide6.QtCore import (QObject, )
 from PySide6.QtGui import (QPixmap, QIcon, )
-from PySide6.QtWidgets import (
-    QDialog,
-    QVBoxLayout,
-    QHBoxLayout,
-    QListWidget,
-    QPushButton,
-    QInputDialog,
-    QFileDialog,
-    QDialogButtonBox,
-)
 
 from .interface.previewable_editor import (PreviewableEditor, ValueChangedData, )
 from .management import (ResourceManager, )
+from .management.future_watcher import (ResourceFutureWatcher, )
+from .resource_browser import (ResourceBrowser, )
+from .resource_dialog import (ResourcePickerDialog, )
+from .dialog_pool import (DialogPool, )
+
+_logger = logging.getLogger(__name__, )
 
 
 class FilePickerTranslation:
@@ -36,8 +34,31 @@ class FilePickerTranslation:
             return "All Files (*)"
     def noFileSelected(self) -> str:
         return "(no file)"
+    def searchPlaceholder(self) -> str:
+        return "Search..."
+    def addFailedTitle(self) -> str:
+        return "Cannot Add File"
+    def addFailed(self, path: str, error: BaseException) -> str:
+        return f"Failed to add {path}: {error}"
     
 
+class _FilePickerDialog(ResourcePickerDialog, ):
+    def __init__(
+        self, resourceManager: ResourceManager,
+        allowExtensions: Optional[Iterable[str]],
+        translation: FilePickerTranslation,
+    ):
+        super().__init__(
+            resourceManager, allowExtensions, translation,
+            ResourceBrowser(resourceManager, allowExtensions, ),
+        )
+        self.__extensions = allowExtensions
+        self.__l18n = translation
+
+    def _fileFilter(self, ) -> str:
+        return self.__l18n.fileFilter(self.__extensions)
+
+
 class FilePicker(PreviewableEditor[str], ):
     def __init__(
         self, resourceManager: ResourceManager,
@@ -46,79 +67,45 @@ class FilePicker(PreviewableEditor[str], ):
         labelText: Optional[str] = None,
         windowIcon: Optional[QIcon | QPixmap] = None,
         translation: FilePickerTranslation = FilePickerTranslation(),
+        sharedDialog: bool = False,
     ):
+        """
+        The dialog is only built when the picker is first opened. With
+        `sharedDialog`, pickers of the same manager, extensions and
+        translation use one dialog between them.
+        """
         super().__init__(parent, labelText=labelText, )
         self.__manager = resourceManager
         self.__extensions = set(allowExtensions) if allowExtensions is not None else None
         self.__l18n = translation
+        self.__windowIcon = windowIcon
+        self.__sharedDialog = sharedDialog
 
         # current selected resource path (string)
         self.__value: Optional[str] = None
-
-        # dialog UI
-        self.__dialog = QDialog()
-        self.__dialog.setModal(True)
-        self.__dialog.setWindowTitle(self.__l18n.resourceManagerTitle())
-        if windowIcon:
-            self.__dialog.setWindowIcon(windowIcon, )
-        self.__layout = QVBoxLayout(self.__dialog)
-
-        self.__list = QListWidget()
-        self.__layout.addWidget(self.__list)
-
-        btnRow = QHBoxLayout()
-        self.__addBtn = QPushButton(self.__l18n.addButton())
-        self.__removeBtn = QPushButton(self.__l18n.removeButton())
-        btnRow.addWidget(self.__addBtn)
-        btnRow.addWidget(self.__removeBtn)
-        self.__layout.addLayout(btnRow)
-
-        self.__buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
-        self.__layout.addWidget(self.__buttons)
-
-        # connections
-        self.__addBtn.clicked.connect(self.__onAdd)
-        self.__removeBtn.clicked.connect(self.__onRemove)
-        self.__buttons.accepted.connect(self.__dialog.accept)
-        self.__buttons.rejected.connect(self.__dialog.reject)
-
-    def __refreshList(self):
-        self.__list.clear()
-        resources = self.__manager.listResources(self.__extensions)
-        for r in resources:
-            # r is ReferenceCountedResource
-            self.__list.addItem(r.path)
-
-    @Slot()
-    def __onAdd(self, ):
-        path, _ = QFileDialog.getOpenFileName(
-            self.__dialog, 
-            self.__l18n.dialogTitle(self.labelText),
-            filter=self.__l18n.fileFilter(self.__extensions),
-        )
-
-        if path:
-            # add to resource manager (copy into root if needed)
-            subFolder = QInputDialog.getText(
-                self.__dialog,
-                self.__l18n.dialogTitle(self.labelText),
-                self.__l18n.subFolderLabel(),
-                text="",
-            )
-            res = self.__manager.addResource(path, True, subFolder=subFolder[0] if subFolder[1] else '')
-            # refresh list and select new
-            self.__refreshList()
-            items = self.__list.findItems(res.path, Qt.MatchFlag.MatchExactly)
-            if items:
-                self.__list.setCurrentItem(items[0])
-
-    @Slot()
-    def __onRemove(self, ):
-        item = self.__list.currentItem()
-        if not item:
-            return
-        self.__manager.removeResource(item.text(), True)
-        self.__refreshList()
+        # why the value could not be added to the manager, shown in the preview
+        self.__addError: Optional[BaseException] = None
+
+        self.__dialog: Optional[_FilePickerDialog] = None
+
+    def __getDialog(self, ) -> _FilePickerDialog:
+        if self.__dialog is None:
+            manager, extensions, translation = self.__manager, self.__extensions, self.__l18n
+            factory = lambda: _FilePickerDialog(manager, extensions, translation, )
+            if self.__sharedDialog:
+                self.__dialog = DialogPool.get((
+                    FilePicker, manager,
+                    frozenset(extensions) if extensions is not None else None, translation,
+                ), factory, )
+            else:
+                self.__dialog = factory()
+        return self.__dialog
+
+    def __onAddFailed(self, value: str, error: BaseException, ):
+        _logger.warning("Failed to add %s", value, exc_info=error, )
+        if value == self.__value:
+            self.__addError = error
+            self._refreshPreview()
 
     def getValue(self) -> str:
         return self.__value or ""
@@ -126,23 +113,23 @@ class FilePicker(PreviewableEditor[str], ):
     def setValue(self, value: str) -> None:
         oldValue = self.__value
         self.__value = value
-        self.__manager.addResource(value, False)  # ensure it's in the manager
-        self.valueChanged.emit(ValueChangedData(oldValue, self.__value, ), )
+        self.__addError = None
+        if value and not self.isBinding():
+            # ensure it's in the manager, without blocking on hashing
+            watcher = ResourceFutureWatcher(self.__manager.addResourceAsync(value, False, ), self, )
+            watcher.failed.connect(partial(self.__onAddFailed, value, ), )
+        self._emitValueChanged(ValueChangedData(oldValue, self.__value, ), )
 
     def getPreview(self) -> str:
         if not self.__value:
             return self.__l18n.noFileSelected()
+        if self.__addError is not None:
+            return self.__l18n.addFailed(self.__value, self.__addError, )
         # show filename and full path in preview
         return f"{self.__value}"
 
     def _modify(self) -> None:
-        # populate list and pre-select current value
-        self.__refreshList()
-        if self.__value:
-            items = self.__list.findItems(self.__value, Qt.MatchFlag.MatchExactly)
-            if items:
-                self.__list.setCurrentItem(items[0])
-
-        if self.__dialog.exec() == QDialog.DialogCode.Accepted:
-            item = self.__list.currentItem()
-            self.__value = item.text() if item else None
\ No newline at end of file
+        accepted, value = self.__getDialog().choose(self.__value, self.labelText, self.__windowIcon, )
+        if accepted:
+            self.__value = value
+            self.__addError = None
\ No newline at end of file
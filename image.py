@@ -1,21 +1,31 @@
-from typing import Optional, Iterable
+from typing import Optional, Iterable, Tuple, Any
+from concurrent.futures import (ThreadPoolExecutor, Future, )
+from functools import (partial, )
+from pathlib import Path
+import logging
 
-from PySide6.QtCore import (QObject, Slot, Qt, )
-from PySide6.QtGui import (QPixmap, QIcon, )
+from PySide6.QtCore import (QObject, Slot, )
+from PySide6.QtGui import (QPixmap, QIcon, QImage, )
 from PySide6.QtWidgets import (
-    QDialog,
-    QVBoxLayout,
     QHBoxLayout,
-    QListWidget,
-    QListWidgetItem,
-    QPushButton,
-    QFileDialog,
-    QInputDialog,
-    QDialogButtonBox,
+    QComboBox,
+    QCheckBox,
+    QSpinBox,
+    QLabel,
+    QMessageBox,
 )
 
 from .interface.previewable_editor import (PreviewableEditor, ValueChangedData, )
-from .management import (ResourceManager, )
+from .management import (ResourceManager, ReferenceCountedResource, )
+from .management.future_watcher import (ResourceFutureWatcher, )
+from .management.thumbnail import (ThumbnailCache, ThumbnailLoader, )
+from .management.image_metadata import (ImageMetadataIndex, ImageMetadata, )
+from .management.perceptual import (PerceptualHashIndex, )
+from .resource_browser import (ResourceBrowser, )
+from .resource_dialog import (ResourcePickerDialog, )
+from .dialog_pool import (DialogPool, )
+
+_logger = logging.getLogger(__name__, )
 
 
 class ImagePickerTranslation:
@@ -37,10 +47,230 @@ class ImagePickerTranslation:
             return "Image Files (*.png *.jpg *.jpeg *.bmp *.gif *.webp)"
     def noImageSelected(self) -> str:
         return "(no image)"
+    def searchPlaceholder(self) -> str:
+        return "Search..."
+    def sortLabel(self) -> str:
+        return "Sort by:"
+    def sortField(self, field: str) -> str:
+        return {
+            "name": "Name", "width": "Width", "height": "Height", "pixels": "Pixel count",
+            "format": "Format", "depth": "Color depth", "frames": "Frames",
+        }[field]
+    def descending(self) -> str:
+        return "Descending"
+    def anyFormat(self) -> str:
+        return "All formats"
+    def minWidthLabel(self) -> str:
+        return "Min width:"
+    def minHeightLabel(self) -> str:
+        return "Min height:"
+    def metadataToolTip(self, metadata: ImageMetadata) -> str:
+        frames = f", {metadata.frameCount} frames" if metadata.frameCount > 1 else ""
+        depth = f", {metadata.depth} bpp" if metadata.depth else ""
+        return f"{metadata.width} x {metadata.height}, {metadata.format.upper()}{depth}{frames}"
+    def similarImageTitle(self) -> str:
+        return "Similar Image"
+    def similarImageQuestion(self, path: str, existing: str) -> str:
+        return f"{existing} looks like {path} and is already managed.\nUse it instead of importing a copy?"
+    def addFailedTitle(self) -> str:
+        return "Cannot Add Image"
+    def addFailed(self, path: str, error: BaseException) -> str:
+        return f"Failed to add {path}: {error}"
+
+
+class _ImagePickerDialog(ResourcePickerDialog, ):
+    SORT_FIELDS = ("name", "width", "height", "pixels", "format", "depth", "frames", )
+
+    def __init__(
+        self, resourceManager: ResourceManager,
+        allowExtensions: Iterable[str],
+        translation: ImagePickerTranslation,
+        thumbnailSize: int,
+        suggestSimilar: bool,
+    ):
+        # icons are decoded in the background, and only for the rows on screen
+        super().__init__(
+            resourceManager, allowExtensions, translation,
+            ResourceBrowser(
+                resourceManager, allowExtensions,
+                thumbnails=ThumbnailCache.forManager(resourceManager, ),
+                thumbnailSize=thumbnailSize, iconSize=64,
+            ),
+        )
+        self.__manager = resourceManager
+        self.__metadata = ImageMetadataIndex.forManager(resourceManager, )
+        # near-duplicate lookup on import, hashes of managed images being kept up to date in the background
+        self.__similar = PerceptualHashIndex.forManager(resourceManager, ) if suggestSimilar else None
+        self.__similarUpdate: Optional[Future] = None
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        # headers are read off the GUI thread, the list is sorted and filtered again once they are in
+        self.__collecting: Optional[Future] = None
+        self.__collected = False
+        self.__collectExecutor: Optional[ThreadPoolExecutor] = None
+        self.__extensions = allowExtensions
+        self.__i18n = translation
+        self.__list = self.resourceBrowser()
+        self.__list.resourceModel().setToolTip(self.__toolTip, )
+
+        # sorting and filtering only need image headers, never pixels
+        viewRow = QHBoxLayout()
+        self.__sortBox = QComboBox()
+        for field in self.SORT_FIELDS:
+            self.__sortBox.addItem(self.__i18n.sortField(field), field, )
+        self.__descendingBox = QCheckBox(self.__i18n.descending())
+        self.__formatBox = QComboBox()
+        self.__formatBox.addItem(self.__i18n.anyFormat(), "", )
+        # formats as QImageReader names them
+        for imageFormat in sorted({
+            "jpeg" if e.lower() in (".jpg", ".jpe", ) else e.lower().lstrip(".")
+            for e in self.__extensions
+        }):
+            self.__formatBox.addItem(imageFormat.upper(), imageFormat, )
+        self.__minWidthBox = QSpinBox()
+        self.__minWidthBox.setRange(0, 1 << 16, )
+        self.__minHeightBox = QSpinBox()
+        self.__minHeightBox.setRange(0, 1 << 16, )
+        viewRow.addWidget(QLabel(self.__i18n.sortLabel()))
+        viewRow.addWidget(self.__sortBox)
+        viewRow.addWidget(self.__descendingBox)
+        viewRow.addWidget(self.__formatBox)
+        viewRow.addWidget(QLabel(self.__i18n.minWidthLabel()))
+        viewRow.addWidget(self.__minWidthBox)
+        viewRow.addWidget(QLabel(self.__i18n.minHeightLabel()))
+        viewRow.addWidget(self.__minHeightBox)
+        self._insertControls(viewRow, )
+
+        # connections
+        self.__sortBox.currentIndexChanged.connect(self.__refreshList)
+        self.__descendingBox.toggled.connect(self.__refreshList)
+        self.__formatBox.currentIndexChanged.connect(self.__refreshList)
+        self.__minWidthBox.valueChanged.connect(self.__refreshList)
+        self.__minHeightBox.valueChanged.connect(self.__refreshList)
+
+    def __toolTip(self, path: str, ) -> Optional[str]:
+        metadata = self.__metadata.get(path, False, )
+        return self.__i18n.metadataToolTip(metadata) if metadata is not None else None
+
+    @staticmethod
+    def __sortValue(field: str, metadata: ImageMetadata, ) -> Any:
+        if field == "pixels":
+            return metadata.width * metadata.height
+        if field == "frames":
+            return metadata.frameCount
+        return getattr(metadata, field, )
+
+    @Slot()
+    def __refreshList(self, ):
+        field = self.__sortBox.currentData()
+        needsMetadata = field != "name" or self.__formatBox.currentData() or \
+            self.__minWidthBox.value() or self.__minHeightBox.value()
+        if needsMetadata and not self.__collected and self.__collecting is None:
+            # read the headers of every listed image not indexed yet, once
+            # per opening and in the background; the view is applied again
+            # with them once they are read
+            if self.__collectExecutor is None:
+                self.__collectExecutor = executor = ThreadPoolExecutor(1, thread_name_prefix="ImageMetadata", )
+                self.destroyed.connect(lambda: executor.shutdown(False, cancel_futures=True, ), )
+            self.__collecting = self.__collectExecutor.submit(
+                self.__metadata.collect, self.__manager.searchPaths("", self.__extensions, ),
+            )
+            watcher = ResourceFutureWatcher(self.__collecting, self, )
+            watcher.finished.connect(self.__onCollected, )
+        self.__applyView()
+
+    @Slot(object, )
+    def __onCollected(self, _: Any, ):
+        self.__collecting = None
+        self.__collected = True
+        self.__applyView()
+
+    def __applyView(self, ):
+        """
+        Filter and sort the list with the metadata indexed so far
+        """
+        field = self.__sortBox.currentData()
+        imageFormat = self.__formatBox.currentData()
+        minWidth = self.__minWidthBox.value()
+        minHeight = self.__minHeightBox.value()
+        model = self.__list.resourceModel()
+        if imageFormat or minWidth or minHeight:
+            def accept(path: str, ) -> bool:
+                metadata = self.__metadata.get(path, False, )
+                return metadata is not None and (
+                    (not imageFormat or metadata.format == imageFormat) and
+                    metadata.width >= minWidth and metadata.height >= minHeight
+                )
+            model.setFilter(accept, )
+        else:
+            model.setFilter(None, )
+        if field == "name":
+            model.setSortKey(None, self.__descendingBox.isChecked(), )
+        else:
+            def key(path: str, ) -> Tuple:
+                metadata = self.__metadata.get(path, False, )
+                # images without metadata go last, then by name
+                if metadata is None:
+                    return (1, 0, path.casefold(), )
+                return (0, self.__sortValue(field, metadata, ), path.casefold(), )
+            model.setSortKey(key, self.__descendingBox.isChecked(), )
+        current = self.__list.currentPath()
+        self.__list.refresh()
+        if current:
+            self.__list.setCurrentPath(current, )
+
+    def _fileFilter(self, ) -> str:
+        return self.__i18n.imageFilter(self.__extensions)
+
+    def _acceptAdd(self, path: str, ) -> bool:
+        existing = self.__findSimilar(path, )
+        if existing is not None and QMessageBox.question(
+            self, self.__i18n.similarImageTitle(),
+            self.__i18n.similarImageQuestion(path, existing, ),
+        ) == QMessageBox.StandardButton.Yes:
+            self.__list.setCurrentPath(existing, )
+            return False
+        return True
+
+    def __updateSimilar(self, ):
+        if self.__similar is None or (self.__similarUpdate is not None and not self.__similarUpdate.done()):
+            return
+        if self.__executor is None:
+            self.__executor = executor = ThreadPoolExecutor(1, thread_name_prefix="PerceptualHash", )
+            self.destroyed.connect(lambda: executor.shutdown(False, cancel_futures=True, ), )
+        paths = [r.path for r in self.__manager.listResources(self.__extensions, )]
+        self.__similarUpdate = self.__executor.submit(self.__similar.update, paths, )
+
+    def __findSimilar(self, path: str, ) -> Optional[str]:
+        """
+        The closest managed image looking like the file at `path`, among
+        those hashed so far
+        """
+        if self.__similar is None:
+            return None
+        for existing, _ in self.__similar.findSimilar(path, ):
+            if self.__manager.getResource(existing, ) is not None and Path(existing, ).suffix in self.__extensions:
+                return existing
+        return None
+
+    def _prepare(self, ):
+        # images may have been added since the last opening
+        self.__collected = False
+        self.__refreshList()
+        self.__updateSimilar()
+
+    def _finish(self, ):
+        self.__list.cancelIcons()
+        # keep the digests and headers read while browsing, written off the GUI thread
+        self.__manager.scheduleHashIndexSave()
+        self.__metadata.scheduleSave()
+        if self.__similar is not None:
+            self.__similar.scheduleSave()
 
 
 class ImagePicker(PreviewableEditor[str], ):
     DEFAULT_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp"}
+    THUMBNAIL_SIZE = 128
+    PREVIEW_SIZE = 48
 
     def __init__(
         self, resourceManager: ResourceManager,
@@ -49,119 +279,121 @@ class ImagePicker(PreviewableEditor[str], ):
         labelText: Optional[str] = None,
         windowIcon: Optional[QIcon | QPixmap] = None,
         translation: ImagePickerTranslation = ImagePickerTranslation(),
+        sharedDialog: bool = False,
+        suggestSimilar: bool = False,
     ):
+        """
+        The dialog is only built when the picker is first opened. With
+        `sharedDialog`, pickers of the same manager, extensions and
+        translation use one dialog between them.
+        With `suggestSimilar`, importing an image that looks like a managed
+        one offers to use that one instead.
+        """
         super().__init__(parent, labelText=labelText, )
         self.__manager = resourceManager
         self.__extensions = set(allowExtensions) if allowExtensions is not None else self.DEFAULT_EXTENSIONS
         self.__i18n = translation
+        self.__windowIcon = windowIcon
+        self.__sharedDialog = sharedDialog
+        self.__suggestSimilar = suggestSimilar
 
         self.__value: Optional[str] = None
+        # (resource name, thumbnail) shown for the value, once loaded
+        self.__previewImage: Optional[Tuple[str, QImage]] = None
+        # shared by the manager's pickers, connected on the first preview
+        self.__previewLoader: Optional[ThumbnailLoader] = None
+        # why the value could not be added to the manager, shown in the preview
+        self.__addError: Optional[BaseException] = None
 
-        self.__dialog = QDialog()
-        self.__dialog.setModal(True)
-        self.__dialog.setWindowTitle(self.__i18n.resourceManagerTitle())
-        if windowIcon:
-            self.__dialog.setWindowIcon(windowIcon)
-        self.__layout = QVBoxLayout(self.__dialog)
+        self.__dialog: Optional[_ImagePickerDialog] = None
 
-        self.__list = QListWidget()
-        self.__list.setIconSize(QPixmap(64, 64).size())
-        self.__layout.addWidget(self.__list)
+    def __getDialog(self, ) -> _ImagePickerDialog:
+        if self.__dialog is None:
+            manager, extensions, translation = self.__manager, self.__extensions, self.__i18n
+            suggestSimilar = self.__suggestSimilar
+            factory = lambda: _ImagePickerDialog(
+                manager, extensions, translation, self.THUMBNAIL_SIZE, suggestSimilar,
+            )
+            if self.__sharedDialog:
+                self.__dialog = DialogPool.get(
+                    (ImagePicker, manager, frozenset(extensions), translation, suggestSimilar, ), factory,
+                )
+            else:
+                self.__dialog = factory()
+        return self.__dialog
 
-        btnRow = QHBoxLayout()
-        self.__addBtn = QPushButton(self.__i18n.addButton())
-        self.__removeBtn = QPushButton(self.__i18n.removeButton())
-        btnRow.addWidget(self.__addBtn)
-        btnRow.addWidget(self.__removeBtn)
-        self.__layout.addLayout(btnRow)
+    @Slot(object, )
+    def __onValueAdded(self, res: ReferenceCountedResource, ):
+        if res.path == self.__value:
+            self.__requestPreview()
 
-        self.__buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
-        self.__layout.addWidget(self.__buttons)
+    def __requestPreview(self, ):
+        # decoded and hashed on a worker, the preview shows no image meanwhile
+        if self.__previewLoader is None:
+            self.__previewLoader = ThumbnailLoader.forManager(self.__manager, )
+            self.__previewLoader.loaded.connect(self.__onPreviewLoaded, )
+        image = self.__previewLoader.request(self.__value, self.PREVIEW_SIZE, )
+        if image is not None:
+            self.__onPreviewLoaded(self.__value, self.PREVIEW_SIZE, image, )
 
-        # connections
-        self.__addBtn.clicked.connect(self.__onAdd)
-        self.__removeBtn.clicked.connect(self.__onRemove)
-        self.__buttons.accepted.connect(self.__dialog.accept)
-        self.__buttons.rejected.connect(self.__dialog.reject)
-
-    def __refreshList(self):
-        self.__list.clear()
-        resources = self.__manager.listResources(self.__extensions)
-        for r in resources:
-            item = QListWidgetItem(f"{r.path}")
-            pix = QPixmap(
-                self.__manager.getRootPath() + "/" +
-                self.__manager.getPathResolver().importPathToRelativePath(r.path, )
-            )
-            if not pix.isNull():
-                icon = QIcon(pix.scaled(
-                    128, 128, Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                ), )
-                item.setIcon(icon, )
-            self.__list.addItem(item, )
+    @Slot(str, int, QImage, )
+    def __onPreviewLoaded(self, path: str, size: int, image: QImage, ):
+        if path != self.__value or size != self.PREVIEW_SIZE:
+            return
+        # named after the content, so the preview only changes with the file
+        digest = self.__manager.getDigest(path, False, )
+        self.__previewImage = (f"image-preview:{digest or path}-{size}", image, )
+        self._refreshPreview()
 
-    @Slot()
-    def __onAdd(self, ):
-        path, _ = QFileDialog.getOpenFileName(
-            self.__dialog,
-            self.__i18n.dialogTitle(self.labelText),
-            filter=self.__i18n.imageFilter(self.__extensions),
-        )
-        if path:
-            subFolder = QInputDialog.getText(
-                self.__dialog,
-                self.__i18n.dialogTitle(self.labelText),
-                self.__i18n.subFolderLabel(),
-                text="",
-            )
-            res = self.__manager.addResource(
-                path, True, subFolder=subFolder[0] if subFolder[1] else ''
-            )
-            self.__refreshList()
-            items = self.__list.findItems(res.path, Qt.MatchFlag.MatchExactly)
-            if items:
-                self.__list.setCurrentItem(items[0])
+    def __setPreviewValue(self, value: Optional[str], ):
+        if value != self.__value and self.__previewLoader is not None and self.__value:
+            self.__previewLoader.cancel(self.__value, self.PREVIEW_SIZE, )
+        self.__value = value
+        self.__previewImage = None
+        self.__addError = None
 
-    @Slot()
-    def __onRemove(self, ):
-        item = self.__list.currentItem()
-        if not item:
-            return
-        self.__manager.removeResource(item.text(), True)
-        self.__refreshList()
+    def __onAddFailed(self, value: str, error: BaseException, ):
+        _logger.warning("Failed to add %s", value, exc_info=error, )
+        if value == self.__value:
+            self.__addError = error
+            self._refreshPreview()
 
     def getValue(self) -> str:
         return self.__value or ""
 
     def setValue(self, value: str) -> None:
         oldValue = self.__value
-        self.__value = value
-        if value:
-            self.__manager.addResource(value, False)
-        self.valueChanged.emit(ValueChangedData(oldValue, self.__value, ))
+        self.__setPreviewValue(value, )
+        if value and self.isBinding():
+            # only shown, the value is expected to be managed already
+            self.__requestPreview()
+        elif value:
+            watcher = ResourceFutureWatcher(self.__manager.addResourceAsync(value, False, ), self, )
+            # the cached preview needs the digest, available once the file is managed
+            watcher.finished.connect(self.__onValueAdded, )
+            watcher.failed.connect(partial(self.__onAddFailed, value, ), )
+        self._emitValueChanged(ValueChangedData(oldValue, self.__value, ))
 
     def getPreview(self) -> str:
         if not self.__value:
             return self.__i18n.noImageSelected()
-        path = self.__value.replace("\\", "/")
+        if self.__addError is not None:
+            return self.__i18n.addFailed(self.__value, self.__addError, )
+        if self.__previewImage is None:
+            return self.__value
         return f'''
             <div style="display:flex;align-items:center">
-                <img src="file:///{
-                        self.__manager.getRootPath() + "/" +
-                        self.__manager.getPathResolver().importPathToRelativePath(path, )
-                }" width="48" height="48" style="margin-right:6px;border:1px solid #000"/>
+                <img src="{self.__previewImage[0]}" width="{self.PREVIEW_SIZE}" height="{self.PREVIEW_SIZE}" style="margin-right:6px;border:1px solid #000"/>
                         {self.__value}
             </div>
         '''.strip()
 
+    def _previewResources(self) -> Iterable[Tuple[str, QImage]]:
+        return (self.__previewImage, ) if self.__previewImage is not None else ()
+
     def _modify(self) -> None:
-        self.__refreshList()
-        if self.__value:
-            items = self.__list.findItems(self.__value, Qt.MatchFlag.MatchExactly)
-            if items:
-                self.__list.setCurrentItem(items[0])
-
-        if self.__dialog.exec() == QDialog.DialogCode.Accepted:
-            item = self.__list.currentItem()
-            self.__value = item.text() if item else None
+        accepted, value = self.__getDialog().choose(self.__value, self.labelText, self.__windowIcon, )
+        if accepted:
+            self.__setPreviewValue(value, )
+            if value:
+                self.__requestPreview()
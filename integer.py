@@ -11,12 +11,15 @@ class IntegerEditor(Editor[int], ):
         super().__init__(parent, labelText=labelText, )
         self.__editor = QSpinBox()
         self.__editor.setRange(*range)
+        # value before the latest change, reported along with it
+        self.__value = self.getValue()
         self.__editor.editingFinished.connect(self.onEdited, )
         self.__editor.valueChanged.connect(self.__onValueChanged, )
 
     @Slot(int, )
     def __onValueChanged(self, val: int, ):
-        self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
+        oldValue, self.__value = self.__value, self.getValue()
+        self._emitValueChanged(ValueChangedData(oldValue, self.__value, ), )
 
     def getValue(self, ) -> int:
         return int(self.__editor.value())
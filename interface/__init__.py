@@ -1,5 +1,6 @@
 from .mapping import (
     ValueChangedData,
+    ValueDelta,
     Editor,
     PreviewableEditor,
     VStringMappingEditor,
@@ -11,3 +12,7 @@ from .array import (
     ArrayEditor,
     PreviewableArrayEditor,
 )
+
+from .virtual_array import (
+    VirtualArrayEditor,
+)
@@ -1,17 +1,43 @@
-from typing import (Optional, Callable, Iterable, List, )
+from typing import (Optional, Callable, Iterable, List, Dict, )
+from functools import (partial, )
 
 from PySide6.QtCore import (Qt, QObject, Slot, )
 from PySide6.QtGui import (QPixmap, QIcon, )
 from PySide6.QtWidgets import (
     QWidget,
     QGridLayout, # for arranging index labels and editors in a grid
+    QVBoxLayout, # for the item rows, one widget each
+    QHBoxLayout, # for the label, editor and remove button of a row
     QLabel,      # for index labels
     QPushButton, # for add/remove buttons
     QDialog,     # for the editor dialog
 )
 
 
-from .previewable_editor import (PreviewableEditor, ValueChangedData, Editor, T, )
+from .previewable_editor import (PreviewableEditor, ValueChangedData, ValueDelta, Editor, T, )
+
+class _ArrayRow:
+    """
+    Editor and widgets of the item at `index`, all in one row widget at
+    position `index` of the rows layout. `index` is -1 once the row is
+    removed.
+    """
+    __slots__ = ("index", "editor", "widget", "label", "removeButton", )
+
+    def __init__(self, editor: Editor[T], parent: QWidget, ):
+        self.index = -1
+        self.editor = editor
+        self.widget = QWidget(parent, )
+        layout = QHBoxLayout(self.widget, )
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel("", self.widget, )
+        self.label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, )
+        self.label.setMinimumWidth(48, )
+        layout.addWidget(self.label, )
+        layout.addWidget(editor.bindEditingWidget(self.widget, ), 1, )
+        self.removeButton = QPushButton("-", self.widget, )
+        layout.addWidget(self.removeButton, )
+
 
 class ArrayEditor(Editor[Iterable[T]], ):
     def __init__(self,
@@ -20,11 +46,22 @@ class ArrayEditor(Editor[Iterable[T]], ):
                  /,
                  labelText: Optional[str] = None,
                  newItemLabel: str = '',
+                 itemLabel: Optional[Callable[[int], str]] = None,
     ):
+        """
+        `itemLabel(index)` labels the row of the item at 1-based `index`.
+        Without it a row is labelled like the editor first built for its
+        position, or its own editor's label for positions never built.
+        """
         super().__init__(parent, labelText=labelText, )
         self.__editorBuilder = editorBuilder
-        self.__editors: List[Editor[T]] = []
+        self.__itemLabel = itemLabel
+        self.__rows: List[_ArrayRow] = []
         self.__allowChangeItem = True
+        # Set while setValue updates rows, their own changes are not reported
+        self.__applying = False
+        # Label of each position, from the editor first built for it
+        self.__labels: Dict[int, str] = {}
 
         self.__editor = QWidget()
         self.__layout = QGridLayout(self.__editor, )
@@ -45,74 +82,162 @@ class ArrayEditor(Editor[Iterable[T]], ):
         self.__addButton.clicked.connect(self.__onAddButtonClicked, )
         self.__layout.addWidget(self.__addButton, 0, 2, )
 
-    @Slot()
-    def __genValueChangedData(self, _):
-        self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
+        # Then one widget per item, so inserting or removing one only
+        # touches that widget
+        self.__rowsLayout = QVBoxLayout()
+        self.__rowsLayout.setContentsMargins(0, 0, 0, 0)
+        self.__layout.addLayout(self.__rowsLayout, 1, 0, 1, 3, )
+
+    def __genValueChangedData(self, row: _ArrayRow, data: ValueChangedData[T], ):
+        if self.__applying or row.index < 0:
+            # rows being reset by setValue, or removed
+            return
+        self._emitValueChanged(data.nested(row.index, self.getValue, ), )
+
+    def _childEditors(self, ):
+        return [row.editor for row in self.__rows]
     
     @Slot()
     def __onAddButtonClicked(self, ):
         if self.__allowChangeItem:
             self.__allowChangeItem = False
-            self.__addItem(self.__newItemEditor.getValue(), )
+            self.extend([self.__newItemEditor.getValue()], )
+            self._emitEdited()
             self.__allowChangeItem = True
 
-    def __addItemWithoutSignal(self, itemValue: T, ):
-        newIndex = len(self.__editors) + 1
-        editor = self.__editorBuilder(newIndex, )
-        editor.setValue(itemValue, )
-        editor.onEdited.connect(self.onEdited, )
-        editor.valueChanged.connect(self.__genValueChangedData, )
-        self.__editors.append(editor, )
-        self.__layout.addWidget(
-            QLabel(editor.labelText, self.__editor, ), newIndex,
-            0, alignment=Qt.AlignmentFlag.AlignRight,
-        )
-        self.__layout.addWidget(editor.bindEditingWidget(self.__editor, ), newIndex, 1, )
-        removeButton = QPushButton("-", self.__editor, )
-        removeButton.clicked.connect(lambda: self.__removeItem(newIndex, ), )
-        self.__layout.addWidget(removeButton, newIndex, 2, )
-
-    def __addItem(self, itemValue: T, ):
-        self.__addItemWithoutSignal(itemValue, )
-        self.onEdited.emit()
-        self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
-
-    def __setLayoutItemParent(self, row: int, column: int, parent: Optional[QWidget], ):
-        item = self.__layout.itemAtPosition(row, column)
-        if item is not None:
-            widget = item.widget()
-            if widget is not None:
-                widget.setParent(parent, )
-                return widget
-        return None
-
-    def __removeItem(self, index: int, ):
-        if self.__allowChangeItem:
+    def __onRemoveButtonClicked(self, row: _ArrayRow, ):
+        if self.__allowChangeItem and row.index >= 0:
             self.__allowChangeItem = False
-            oldValue = self.getValue()
-            oldValue.pop(index - 1, )
-            self.setValue(oldValue, )
-            self.onEdited.emit()
+            self.removeItems(row.index, )
+            self._emitEdited()
             self.__allowChangeItem = True
 
+    def __buildRows(self, index: int, values: Iterable[T], ) -> List[_ArrayRow]:
+        rows = []
+        for position, value in enumerate(values, index, ):
+            editor = self.__editorBuilder(position + 1, )
+            self.__labels.setdefault(position, editor.labelText, )
+            self._setChildValue(editor, value, )
+            row = _ArrayRow(editor, self.__editor, )
+            editor.onEdited.connect(self._emitEdited, )
+            editor.valueChanged.connect(partial(self.__genValueChangedData, row, ), )
+            row.removeButton.clicked.connect(partial(self.__onRemoveButtonClicked, row, ), )
+            rows.append(row, )
+        return rows
+
+    def __relabelRows(self, first: int, last: Optional[int] = None, ):
+        """
+        Relabel the rows from `first` to `last` (excluded, default the end)
+        whose index changed; their widgets stay where the layout put them
+        """
+        rows = self.__rows
+        for i in range(first, len(rows, ) if last is None else last, ):
+            row = rows[i]
+            if row.index == i:
+                continue
+            row.index = i
+            row.label.setText(
+                self.__itemLabel(i + 1, ) if self.__itemLabel is not None
+                else self.__labels.get(i, row.editor.labelText, ),
+            )
+
+    def __deleteRow(self, row: _ArrayRow, ):
+        row.index = -1
+        self.__rowsLayout.removeWidget(row.widget, )
+        row.widget.deleteLater()
+        row.editor.deleteLater()
+
+    def __insertRows(self, index: int, values: List[T], ):
+        rows = self.__buildRows(index, values, )
+        self.__rows[index:index] = rows
+        for offset, row in enumerate(rows, ):
+            self.__rowsLayout.insertWidget(index + offset, row.widget, )
+        self.__relabelRows(index, )
+
+    def __removeRows(self, index: int, count: int, ):
+        removed = self.__rows[index:index + count]
+        del self.__rows[index:index + count]
+        for row in removed:
+            self.__deleteRow(row, )
+        self.__relabelRows(index, )
+
+    def __emitDelta(self, delta: ValueDelta, ):
+        self._emitValueChanged(ValueChangedData(None, delta=delta, snapshot=self.getValue, ), )
+
+    def insertItems(self, index: int, values: Iterable[T], ):
+        """
+        Insert `values` before the item at `index`. Only rows from `index`
+        on are touched, and one insert delta is emitted.
+        """
+        values = list(values, )
+        index = max(0, min(index, len(self.__rows, ), ), )
+        if not values:
+            return
+        self.__insertRows(index, values, )
+        self.__emitDelta(ValueDelta((index, ), None, values, ValueDelta.INSERT, ), )
+
+    def extend(self, values: Iterable[T], ):
+        self.insertItems(len(self.__rows, ), values, )
+
+    def removeItems(self, index: int, count: int = 1, ):
+        """
+        Remove `count` items from `index` on, emitting one remove delta
+        """
+        count = min(count, len(self.__rows, ) - index, )
+        if index < 0 or count <= 0:
+            return
+        removed = [row.editor.getValue() for row in self.__rows[index:index + count]]
+        self.__removeRows(index, count, )
+        self.__emitDelta(ValueDelta((index, ), removed, None, ValueDelta.REMOVE, ), )
+
+    def moveItem(self, source: int, destination: int, ):
+        """
+        Move the item at `source` so it ends up at `destination`, keeping
+        its editor
+        """
+        rows = self.__rows
+        if source == destination or not (0 <= source < len(rows, ) and 0 <= destination < len(rows, )):
+            return
+        row = rows.pop(source, )
+        rows.insert(destination, row, )
+        self.__rowsLayout.removeWidget(row.widget, )
+        self.__rowsLayout.insertWidget(destination, row.widget, )
+        self.__relabelRows(min(source, destination, ), max(source, destination, ) + 1, )
+        self.__emitDelta(ValueDelta((source, ), None, destination, ValueDelta.MOVE, ), )
+
     def getValue(self, ) -> List[T]:
-        return [self.__editors[i].getValue() for i in range(len(self.__editors))]
+        return [row.editor.getValue() for row in self.__rows]
     
     def setValue(self, value: Iterable[T], ):
-        # Clear existing editors
-        for i in range(len(self.__editors), ):
-            self.__setLayoutItemParent(i + 1, 0, None, ) # remove index label
-            self.__setLayoutItemParent(i + 1, 2, None, ) # remove remove button
-            editorToRemove = self.__editors[i]
-            if editorToRemove is not None: # Remove editor and its widgets
-                editorToRemove.bindEditingWidget(None, )
-        self.__editors.clear()
-
-        # Add new editors based on the provided value
-        for item in value:
-            self.__addItemWithoutSignal(item, )
-        
-        self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
+        self.__applyValues(list(value, ), )
+        self._emitValueChanged(ValueChangedData(None, snapshot=self.getValue, ), )
+
+    def __applyValues(self, values: List[T], ):
+        """
+        Show `values` reusing the rows in place: the common head and tail are
+        kept, rows in between whose value differs are set, and rows are only
+        built or deleted for the change in length
+        """
+        self.__applying = True
+        try:
+            current = self.getValue()
+            end, newEnd = len(current, ), len(values, )
+            start = 0
+            while start < min(end, newEnd, ) and current[start] == values[start]:
+                start += 1
+            while end > start and newEnd > start and current[end - 1] == values[newEnd - 1]:
+                end -= 1
+                newEnd -= 1
+            common = min(end, newEnd, ) - start
+            for i in range(start, start + common, ):
+                if current[i] != values[i]:
+                    self._setChildValue(self.__rows[i].editor, values[i], )
+            if newEnd > end:
+                self.__insertRows(start + common, values[start + common:newEnd], )
+            elif end > newEnd:
+                self.__removeRows(start + common, end - newEnd, )
+        finally:
+            self.__applying = False
 
     def bindEditingWidget(self, parent: Optional[QWidget] = None, ):
         self.__editor.setParent(parent, )
@@ -126,10 +251,11 @@ class PreviewableArrayEditor(PreviewableEditor[Iterable[T]], ):
         /,
         labelText: Optional[str] = None,
         windowIcon: Optional[QPixmap | QIcon] = None,
+        itemLabel: Optional[Callable[[int], str]] = None,
     ):
         super().__init__(parent, labelText=labelText, )
-        self.__arrayEditor = ArrayEditor(editorBuilder, parent, labelText=labelText, )
-        self.__arrayEditor.onEdited.connect(self.onEdited, )
+        self.__arrayEditor = ArrayEditor(editorBuilder, parent, labelText=labelText, itemLabel=itemLabel, )
+        self.__arrayEditor.onEdited.connect(self._emitEdited, )
         self.__arrayEditor.valueChanged.connect(self.__genValueChangedData, )
         self.__dialog = QDialog(modal=True, )
         if windowIcon is not None:
@@ -139,7 +265,10 @@ class PreviewableArrayEditor(PreviewableEditor[Iterable[T]], ):
 
     @Slot()
     def __genValueChangedData(self, data: ValueChangedData[List[T]], ):
-        self.valueChanged.emit(data, )
+        self._emitValueChanged(data, )
+
+    def _childEditors(self, ):
+        return (self.__arrayEditor, )
 
     def getPreview(self, ) -> str:
         return f"[{', '.join(str(item) for item in self.getValue())}]"
@@ -148,7 +277,19 @@ class PreviewableArrayEditor(PreviewableEditor[Iterable[T]], ):
         return self.__arrayEditor.getValue()
     
     def setValue(self, value: Iterable[T], ):
-        self.__arrayEditor.setValue(value, )
+        self._setChildValue(self.__arrayEditor, value, )
+
+    def insertItems(self, index: int, values: Iterable[T], ):
+        self.__arrayEditor.insertItems(index, values, )
+
+    def extend(self, values: Iterable[T], ):
+        self.__arrayEditor.extend(values, )
+
+    def removeItems(self, index: int, count: int = 1, ):
+        self.__arrayEditor.removeItems(index, count, )
+
+    def moveItem(self, source: int, destination: int, ):
+        self.__arrayEditor.moveItem(source, destination, )
 
     def _modify(self) -> None:
         self.__dialog.setWindowTitle(self.__arrayEditor.labelText, )
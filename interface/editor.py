@@ -1,18 +1,92 @@
-from typing import (Optional, TypeVar, Generic, )
+from typing import (Optional, TypeVar, Generic, Callable, Tuple, Any, Hashable, Iterable, Iterator, List, )
 from abc import (abstractmethod, )
+from contextlib import (contextmanager, )
 
 from PySide6.QtCore import (QObject, Signal, )
 from PySide6.QtWidgets import (QWidget, )
 
 
 T = TypeVar("T", )
+class ValueDelta:
+    """
+    One change inside a value, at `keyPath` from its root (mapping keys and
+    array indexes):
+    - "set": the value at `keyPath` went from `oldValue` to `newValue`
+    - "insert": the items of `newValue` were inserted at the index ending `keyPath`
+    - "remove": the items of `oldValue` were removed from that index on
+    - "move": the item at that index was moved to index `newValue`
+    `oldValue` may be None if not available.
+    """
+    SET = "set"
+    INSERT = "insert"
+    REMOVE = "remove"
+    MOVE = "move"
+    __slots__ = ("keyPath", "oldValue", "newValue", "operation", )
+
+    def __init__(self, keyPath: Tuple[Hashable, ...], oldValue: Any, newValue: Any, operation: str = SET, ):
+        self.keyPath = keyPath
+        self.oldValue = oldValue
+        self.newValue = newValue
+        self.operation = operation
+
+    def prefixed(self, key: Hashable, ) -> "ValueDelta":
+        return ValueDelta((key, *self.keyPath, ), self.oldValue, self.newValue, self.operation, )
+
+    def applyTo(self, value: Any, ) -> Any:
+        """
+        Apply to a copy of the value before the change, in place where
+        possible, and return the result
+        """
+        if not self.keyPath:
+            return self.newValue
+        container = value
+        for key in self.keyPath[:-1]:
+            container = container[key]
+        key = self.keyPath[-1]
+        if self.operation == self.INSERT:
+            container[key:key] = self.newValue
+        elif self.operation == self.REMOVE:
+            del container[key:key + len(self.oldValue, )]
+        elif self.operation == self.MOVE:
+            container.insert(self.newValue, container.pop(key, ), )
+        else:
+            container[key] = self.newValue
+        return value
+
+
 class ValueChangedData(Generic[T], ):
-    def __init__(self, oldValue: Optional[T], newValue: T, ):
+    def __init__(
+        self, oldValue: Optional[T], newValue: Optional[T] = None, /,
+        delta: Optional[ValueDelta] = None,
+        snapshot: Optional[Callable[[], T]] = None,
+    ):
         """
-        Maybe None if the old value is not available or not applicable
+        Maybe None if the old value is not available or not applicable.
+        Container editors pass the `delta` that caused the change and a
+        `snapshot` building the new value, only called if `newValue` is read.
+        Without a delta the whole value changed.
         """
         self.oldValue = oldValue
-        self.newValue = newValue
+        self.delta = delta
+        self.__newValue = newValue
+        self.__snapshot = snapshot
+
+    @property
+    def newValue(self, ) -> T:
+        if self.__snapshot is not None:
+            self.__newValue = self.__snapshot()
+            self.__snapshot = None
+        return self.__newValue
+
+    def nested(self, key: Hashable, snapshot: Callable[[], Any], ) -> "ValueChangedData[Any]":
+        """
+        The change as seen by the container holding this value at `key`
+        """
+        if self.delta is None:
+            delta = ValueDelta((key, ), self.oldValue, self.newValue, )
+        else:
+            delta = self.delta.prefixed(key, )
+        return ValueChangedData(None, delta=delta, snapshot=snapshot, )
 
 
 class Editor(QObject, Generic[T], ):
@@ -22,6 +96,106 @@ class Editor(QObject, Generic[T], ):
     def __init__(self, parent: Optional[QObject] = None, /, labelText: Optional[str] = None, ):
         super().__init__(parent, )
         self.labelText = labelText or "……"
+        # Transaction state, see beginUpdate
+        self.__updateDepth = 0
+        self.__updatingChildren: List["Editor[Any]"] = []
+        self.__pendingChange: Optional[ValueChangedData[T]] = None
+        self.__pendingEdited = False
+        # bindValue calls in progress on this editor
+        self.__bindingDepth = 0
+
+    def _childEditors(self, ) -> Iterable["Editor[Any]"]:
+        """
+        Editors whose changes this editor forwards, updated along with it
+        """
+        return ()
+
+    def beginUpdate(self, ):
+        """
+        Hold back `valueChanged` and `onEdited` of this editor and the editors
+        under it until the matching endUpdate, which emits at most one of
+        each per editor. Calls nest.
+        """
+        self.__updateDepth += 1
+        if self.__updateDepth == 1:
+            self.__updatingChildren = list(self._childEditors(), )
+            for child in self.__updatingChildren:
+                child.beginUpdate()
+
+    def endUpdate(self, ):
+        if self.__updateDepth == 0:
+            raise RuntimeError("endUpdate called without a matching beginUpdate", )
+        if self.__updateDepth == 1:
+            # Children commit first, their changes fold into this editor's
+            children, self.__updatingChildren = self.__updatingChildren, []
+            for child in children:
+                child.endUpdate()
+        self.__updateDepth -= 1
+        if self.__updateDepth > 0:
+            return
+        change, self.__pendingChange = self.__pendingChange, None
+        edited, self.__pendingEdited = self.__pendingEdited, False
+        if edited:
+            self.onEdited.emit()
+        if change is not None:
+            self.valueChanged.emit(change, )
+
+    def isUpdating(self, ) -> bool:
+        return self.__updateDepth > 0
+
+    @contextmanager
+    def updating(self, ) -> Iterator["Editor[T]"]:
+        """
+        `with editor.updating(): ...` runs the block between beginUpdate and
+        endUpdate
+        """
+        self.beginUpdate()
+        try:
+            yield self
+        finally:
+            self.endUpdate()
+
+    def _emitValueChanged(self, data: ValueChangedData[T], ):
+        if self.__updateDepth == 0:
+            self.valueChanged.emit(data, )
+        elif self.__pendingChange is None:
+            self.__pendingChange = data
+        else:
+            # Several changes, reported as one change of the whole value
+            self.__pendingChange = ValueChangedData(self.__pendingChange.oldValue, snapshot=self.getValue, )
+
+    def bindValue(self, value: T, ):
+        """
+        setValue only to show `value`, as when a reused editor is given
+        another item. While it runs isBinding() is True, and setValue skips
+        side effects beyond showing the value, such as adding it to a
+        resource manager. Containers pass the binding down to the editors
+        under them through _setChildValue; other editors are not affected.
+        """
+        self.__bindingDepth += 1
+        try:
+            self.setValue(value, )
+        finally:
+            self.__bindingDepth -= 1
+
+    def isBinding(self, ) -> bool:
+        return self.__bindingDepth > 0
+
+    def _setChildValue(self, child: "Editor[Any]", value: Any, ):
+        """
+        Set the value of an editor under this one, binding it while this
+        editor is binding
+        """
+        if self.isBinding():
+            child.bindValue(value, )
+        else:
+            child.setValue(value, )
+
+    def _emitEdited(self, ):
+        if self.__updateDepth == 0:
+            self.onEdited.emit()
+        else:
+            self.__pendingEdited = True
 
     @abstractmethod
     def bindEditingWidget(self, parent: Optional[QWidget] = None, ) -> QWidget: ...
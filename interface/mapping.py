@@ -1,4 +1,5 @@
 from typing import (Optional, Dict, Any, )
+from functools import (partial, )
 
 from PySide6.QtCore import (Qt, QObject, Slot, )
 from PySide6.QtGui import (QIcon, QPixmap, )
@@ -12,7 +13,7 @@ from PySide6.QtWidgets import (
 )
 
 
-from .previewable_editor import (PreviewableEditor, ValueChangedData, Editor, T, )
+from .previewable_editor import (PreviewableEditor, ValueChangedData, ValueDelta, Editor, T, )
 
 class VStringMappingEditor(Editor[Dict[str, Any]], ):
     def __init__(
@@ -24,7 +25,6 @@ class VStringMappingEditor(Editor[Dict[str, Any]], ):
     ):
         super().__init__(parent, labelText=labelText, )
         self.__editors = editors
-        self.__allowEmitChange = True
 
         # Use a QScrollArea so the mapping editor becomes scrollable
         self.__editor = QScrollArea()
@@ -36,30 +36,31 @@ class VStringMappingEditor(Editor[Dict[str, Any]], ):
         self.__layout.setContentsMargins(0, 0, 0, 0)
         self.__editor.setWidget(self.__content)
 
-        for i, editor in enumerate(self.__editors.values()):
+        for i, (key, editor, ) in enumerate(self.__editors.items()):
             self.__layout.addWidget(
                 QLabel(editor.labelText, self.__content, ), i,
                 0, alignment=Qt.AlignmentFlag.AlignRight
             )
             self.__layout.addWidget(editor.bindEditingWidget(self.__content, ), i, 1, )
-            editor.onEdited.connect(self.onEdited, )
-            editor.valueChanged.connect(self.__genValueChangedData, )
+            editor.onEdited.connect(self._emitEdited, )
+            editor.valueChanged.connect(partial(self.__genValueChangedData, key, ), )
 
-    @Slot()
-    def __genValueChangedData(self, _):
-        if self.__allowEmitChange:
-            self.valueChanged.emit(ValueChangedData(None, self.getValue(), ))
+    def __genValueChangedData(self, key: str, data: ValueChangedData[Any], ):
+        # Only the path to the changed item is built, not the whole mapping
+        self._emitValueChanged(data.nested(key, self.getValue, ), )
+
+    def _childEditors(self, ):
+        return self.__editors.values()
     
     def getValue(self, ) -> Dict[str, Any]:
         return {k: e.getValue() for k, e in self.__editors.items()}
     
     def setValue(self, value: Dict[str, Any], ) -> None:
-        self.__allowEmitChange = False
-        for k, v in value.items():
-            if k in self.__editors:
-                self.__editors[k].setValue(v, )
-        self.__allowEmitChange = True
-        self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
+        with self.updating():
+            for k, v in value.items():
+                if k in self.__editors:
+                    self._setChildValue(self.__editors[k], v, )
+            self._emitValueChanged(ValueChangedData(None, snapshot=self.getValue, ), )
 
     def bindEditingWidget(self, parent: Optional[QWidget] = None, ):
         self.__editor.setParent(parent, )
@@ -76,34 +77,33 @@ class TabStringMappingEditor(Editor[Dict[str, Any]], ):
     ):
         super().__init__(parent, labelText=labelText, )
         self.__editors = editors
-        self.__allowEmitChange = True
 
         self.__editor = QTabWidget()
-        for editor in self.__editors.values():
+        for key, editor in self.__editors.items():
             # Wrap each editor's widget in a scroll area so tab content can scroll
             scroll = QScrollArea()
             scroll.setWidgetResizable(True)
             content = editor.bindEditingWidget(scroll)
             scroll.setWidget(content)
             self.__editor.addTab(scroll, editor.labelText)
-            editor.onEdited.connect(self.onEdited)
-            editor.valueChanged.connect(self.__genValueChangedData)
+            editor.onEdited.connect(self._emitEdited, )
+            editor.valueChanged.connect(partial(self.__genValueChangedData, key, ), )
 
-    @Slot()
-    def __genValueChangedData(self, _, ):
-        if self.__allowEmitChange:
-            self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
+    def __genValueChangedData(self, key: str, data: ValueChangedData[Any], ):
+        self._emitValueChanged(data.nested(key, self.getValue, ), )
+
+    def _childEditors(self, ):
+        return self.__editors.values()
     
     def getValue(self, ) -> Dict[str, Any]:
         return {k: e.getValue() for k, e in self.__editors.items()}
     
     def setValue(self, value: Dict[str, Any], ) -> None:
-        self.__allowEmitChange = False
-        for k, v in value.items():
-            if k in self.__editors:
-                self.__editors[k].setValue(v, )
-        self.__allowEmitChange = True
-        self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
+        with self.updating():
+            for k, v in value.items():
+                if k in self.__editors:
+                    self._setChildValue(self.__editors[k], v, )
+            self._emitValueChanged(ValueChangedData(None, snapshot=self.getValue, ), )
 
     def bindEditingWidget(self, parent: Optional[QWidget] = None, ):
         self.__editor.setParent(parent, )
@@ -120,7 +120,7 @@ class VStringMappingPreviewableEditor(PreviewableEditor[Dict[str, Any]], ):
     ):
         super().__init__(parent, labelText=labelText, )
         self.__mappingEditor = VStringMappingEditor(editors, parent, labelText=labelText, )
-        self.__mappingEditor.onEdited.connect(self.onEdited, )
+        self.__mappingEditor.onEdited.connect(self._emitEdited, )
         self.__mappingEditor.valueChanged.connect(self.__genValueChangedData, )
         self.__dialog = QDialog(modal=True, )
         if windowIcon is not None:
@@ -130,7 +130,10 @@ class VStringMappingPreviewableEditor(PreviewableEditor[Dict[str, Any]], ):
 
     @Slot()
     def __genValueChangedData(self, data: ValueChangedData[Dict[str, Any]], ):
-        self.valueChanged.emit(data, )
+        self._emitValueChanged(data, )
+
+    def _childEditors(self, ):
+        return (self.__mappingEditor, )
     
     def getPreview(self, ) -> str:
         return ", ".join(f"{k}: {v}" for k, v in self.getValue().items())
@@ -139,7 +142,7 @@ class VStringMappingPreviewableEditor(PreviewableEditor[Dict[str, Any]], ):
         return self.__mappingEditor.getValue()
     
     def setValue(self, value: Dict[str, Any], ):
-        self.__mappingEditor.setValue(value, )
+        self._setChildValue(self.__mappingEditor, value, )
 
     def _modify(self) -> None:
         self.__dialog.setWindowTitle(self.__mappingEditor.labelText, )
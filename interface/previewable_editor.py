@@ -1,12 +1,12 @@
-from typing import (Optional, )
+from typing import (Optional, Iterable, Tuple, Set, )
 from abc import (abstractmethod, )
 
-from PySide6.QtCore import (Qt, QObject, Slot, )
-from PySide6.QtGui import (QMouseEvent, )
+from PySide6.QtCore import (Qt, QObject, Slot, QUrl, )
+from PySide6.QtGui import (QMouseEvent, QImage, QTextDocument, )
 from PySide6.QtWidgets import (QTextEdit, QWidget, )
 
 
-from .editor import (Editor, ValueChangedData, T, )
+from .editor import (Editor, ValueChangedData, ValueDelta, T, )
 
 class PreviewableEditor(Editor[T], ):
 
@@ -16,14 +16,19 @@ class PreviewableEditor(Editor[T], ):
         self.__editing_widget = QTextEdit(readOnly=True, acceptRichText=True, )
         self.__editing_widget.setCursor(Qt.CursorShape.PointingHandCursor, )
         self.__editing_widget.mousePressEvent = self.__onMouseClicked
+        # html currently shown, the preview is only re-laid out when it changes
+        self.__preview: Optional[str] = None
+        self.__previewDirty = False
+        # names of the images registered in the preview document
+        self.__previewResourceNames: Set[str] = set()
         self.valueChanged.connect(self.__updatePreview, )
 
     def __onMouseClicked(self, event: QMouseEvent, ):
         if event.button() == Qt.MouseButton.LeftButton:
             old_value = self.getValue()
             self._modify()
-            self.onEdited.emit()
-            self.valueChanged.emit(ValueChangedData(old_value, self.getValue(), ), )
+            self._emitEdited()
+            self._emitValueChanged(ValueChangedData(old_value, self.getValue(), ), )
 
         event.accept()
     
@@ -34,7 +39,41 @@ class PreviewableEditor(Editor[T], ):
     
     @Slot()
     def __updatePreview(self, ):
-        self.__editing_widget.setText(self.getPreview(), )
+        self._refreshPreview()
+
+    def endUpdate(self, ):
+        super().endUpdate()
+        if self.__previewDirty and not self.isUpdating():
+            self._refreshPreview()
+
+    def _refreshPreview(self, ):
+        if self.isUpdating():
+            # rendered once, when the update ends
+            self.__previewDirty = True
+            return
+        self.__previewDirty = False
+        preview = self.getPreview()
+        if preview == self.__preview:
+            return
+        document = self.__editing_widget.document()
+        resources = list(self._previewResources(), )
+        names = {name for name, _ in resources}
+        if self.__previewResourceNames - names:
+            # a document cannot drop a single image, clearing it drops them
+            # all and the text is set again below
+            document.clear()
+        for name, image in resources:
+            document.addResource(QTextDocument.ResourceType.ImageResource, QUrl(name, ), image, )
+        self.__previewResourceNames = names
+        self.__editing_widget.setText(preview, )
+        self.__preview = preview
+
+    def _previewResources(self, ) -> Iterable[Tuple[str, QImage]]:
+        """
+        Images referenced by name from the html of `getPreview`, registered
+        in the preview document before it is shown
+        """
+        return ()
     
     @abstractmethod
     def getPreview(self, ) -> str: ...
@@ -0,0 +1,214 @@
+from typing import (Optional, Callable, Iterable, List, )
+from functools import (partial, )
+
+from PySide6.QtCore import (Qt, QObject, Signal, Slot, )
+from PySide6.QtGui import (QResizeEvent, QWheelEvent, )
+from PySide6.QtWidgets import (
+    QWidget,
+    QGridLayout, # for the new item row above the viewport
+    QHBoxLayout, # for the label, editor and remove button of a row
+    QLabel,      # for index labels
+    QPushButton, # for add/remove buttons
+    QScrollBar,
+)
+
+
+from .previewable_editor import (ValueChangedData, ValueDelta, Editor, T, )
+
+class _Viewport(QWidget, ):
+    resized = Signal()
+    wheeled = Signal(int, )
+
+    def resizeEvent(self, event: QResizeEvent, ):
+        super().resizeEvent(event, )
+        self.resized.emit()
+
+    def wheelEvent(self, event: QWheelEvent, ):
+        self.wheeled.emit(event.angleDelta().y(), )
+        event.accept()
+
+
+class _VirtualRow:
+    """
+    Widgets of one visible row, shown for the item at `index`
+    """
+    def __init__(self, editor: Editor[T], parent: QWidget, ):
+        self.editor = editor
+        self.index = -1
+        self.widget = QWidget(parent, )
+        layout = QHBoxLayout(self.widget, )
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel("", self.widget, )
+        self.label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, )
+        self.label.setMinimumWidth(48, )
+        layout.addWidget(self.label, )
+        layout.addWidget(editor.bindEditingWidget(self.widget, ), 1, )
+        self.removeButton = QPushButton("-", self.widget, )
+        layout.addWidget(self.removeButton, )
+
+
+class VirtualArrayEditor(Editor[Iterable[T]], ):
+    """
+    Array editor for long arrays. Values are kept in a list and only the
+    rows in view get widgets; their editors are reused for other items as
+    the view scrolls, so the widget count follows the view's height and
+    not the array's length.
+    Every row must be `rowHeight` pixels high, by default the height of the
+    first row editor.
+    """
+    def __init__(self,
+                 editorBuilder: Callable[[int], Editor[T]],
+                 parent: Optional[QObject] = None,
+                 /,
+                 labelText: Optional[str] = None,
+                 newItemLabel: str = '',
+                 itemLabel: Callable[[int], str] = str,
+                 rowHeight: Optional[int] = None,
+    ):
+        super().__init__(parent, labelText=labelText, )
+        self.__editorBuilder = editorBuilder
+        self.__itemLabel = itemLabel
+        self.__rowHeight = rowHeight
+        self.__values: List[T] = []
+        self.__rows: List[_VirtualRow] = []
+        # Set while rows are filled with item values, their changes are not edits
+        self.__binding = False
+
+        self.__editor = QWidget()
+        self.__layout = QGridLayout(self.__editor, )
+        self.__layout.setContentsMargins(0, 0, 0, 0)
+
+        # First row is for adding new items, as in ArrayEditor
+        self.__layout.addWidget(
+            QLabel(newItemLabel, self.__editor, ), 0,
+            0, alignment=Qt.AlignmentFlag.AlignRight,
+        )
+        self.__newItemEditor = self.__editorBuilder(0, )
+        self.__layout.addWidget(self.__newItemEditor.bindEditingWidget(self.__editor, ), 0, 1, )
+        self.__addButton = QPushButton("+", self.__editor, )
+        self.__addButton.clicked.connect(self.__onAddButtonClicked, )
+        self.__layout.addWidget(self.__addButton, 0, 2, )
+
+        # Then the rows in view, placed by hand
+        self.__viewport = _Viewport(self.__editor, )
+        self.__viewport.resized.connect(self.__layoutRows, )
+        self.__viewport.wheeled.connect(self.__onWheel, )
+        self.__layout.addWidget(self.__viewport, 1, 0, 1, 3, )
+        self.__layout.setRowStretch(1, 1, )
+        self.__scrollBar = QScrollBar(Qt.Orientation.Vertical, self.__editor, )
+        self.__scrollBar.valueChanged.connect(self.__onScrolled, )
+        self.__layout.addWidget(self.__scrollBar, 1, 3, )
+
+    def __newRow(self, ) -> _VirtualRow:
+        row = _VirtualRow(self.__editorBuilder(len(self.__rows, ) + 1, ), self.__viewport, )
+        row.editor.onEdited.connect(self._emitEdited, )
+        row.editor.valueChanged.connect(partial(self.__onRowChanged, row, ), )
+        row.removeButton.clicked.connect(partial(self.__onRemoveButtonClicked, row, ), )
+        if self.__rowHeight is None:
+            self.__rowHeight = max(row.widget.sizeHint().height(), 1, )
+        self.__rows.append(row, )
+        return row
+
+    def __onRowChanged(self, row: _VirtualRow, data: ValueChangedData[T], ):
+        if self.__binding or row.index < 0:
+            return
+        self.__values[row.index] = row.editor.getValue()
+        self._emitValueChanged(data.nested(row.index, self.getValue, ), )
+
+    def _childEditors(self, ):
+        # Row editors only show values held here, they are not part of updates
+        return ()
+
+    @Slot(int, )
+    def __onWheel(self, delta: int, ):
+        self.__scrollBar.setValue(self.__scrollBar.value() - delta * self.__scrollBar.singleStep() * 3 // 120, )
+
+    @Slot(int, )
+    def __onScrolled(self, _: int, ):
+        self.__layoutRows()
+
+    @Slot()
+    def __layoutRows(self, ):
+        if not self.__rows:
+            self.__newRow().widget.hide()
+        rowHeight = self.__rowHeight
+        width, height = self.__viewport.width(), self.__viewport.height()
+        self.__scrollBar.setRange(0, max(0, len(self.__values, ) * rowHeight - height, ), )
+        self.__scrollBar.setPageStep(max(height, 1, ), )
+        self.__scrollBar.setSingleStep(rowHeight, )
+
+        offset = self.__scrollBar.value()
+        first = offset // rowHeight
+        needed = min(height // rowHeight + 2, len(self.__values, ) - first, )
+        while len(self.__rows, ) < needed:
+            self.__newRow()
+        for i, row in enumerate(self.__rows, ):
+            index = first + i
+            if i >= needed:
+                row.index = -1
+                row.widget.hide()
+                continue
+            if row.index != index:
+                row.index = index
+                row.label.setText(self.__itemLabel(index + 1, ), )
+                self.__binding = True
+                try:
+                    # the value is only shown, e.g. pickers do not add it to their manager again
+                    row.editor.bindValue(self.__values[index], )
+                finally:
+                    self.__binding = False
+            row.widget.setGeometry(0, i * rowHeight - offset % rowHeight, width, rowHeight, )
+            row.widget.show()
+
+    def __relayout(self, ):
+        # Items moved under the rows, bind every row again
+        for row in self.__rows:
+            row.index = -1
+        self.__layoutRows()
+
+    def scrollTo(self, index: int, ):
+        """
+        Scroll the item at `index` into view
+        """
+        top = index * self.__rowHeight if self.__rowHeight else 0
+        value = self.__scrollBar.value()
+        if top < value:
+            self.__scrollBar.setValue(top, )
+        elif top + (self.__rowHeight or 0) > value + self.__viewport.height():
+            self.__scrollBar.setValue(top + (self.__rowHeight or 0) - self.__viewport.height(), )
+
+    @Slot()
+    def __onAddButtonClicked(self, ):
+        itemValue = self.__newItemEditor.getValue()
+        self.__values.append(itemValue, )
+        self.__layoutRows()
+        self.scrollTo(len(self.__values, ) - 1, )
+        self._emitEdited()
+        self._emitValueChanged(ValueChangedData(
+            None, delta=ValueDelta((len(self.__values, ) - 1, ), None, [itemValue], ValueDelta.INSERT, ),
+            snapshot=self.getValue,
+        ), )
+
+    def __onRemoveButtonClicked(self, row: _VirtualRow, ):
+        index = row.index
+        if index < 0:
+            return
+        removed = self.__values.pop(index, )
+        self.__relayout()
+        self._emitEdited()
+        self._emitValueChanged(ValueChangedData(
+            None, delta=ValueDelta((index, ), [removed], None, ValueDelta.REMOVE, ),
+            snapshot=self.getValue,
+        ), )
+
+    def getValue(self, ) -> List[T]:
+        return list(self.__values, )
+
+    def setValue(self, value: Iterable[T], ):
+        self.__values = list(value, )
+        self.__relayout()
+        self._emitValueChanged(ValueChangedData(None, snapshot=self.getValue, ), )
+
+    def bindEditingWidget(self, parent: Optional[QWidget] = None, ):
+        self.__editor.setParent(parent, )
+        return self.__editor
@@ -1 +1,9 @@
+from .hash_index import (HashIndex, )
+from .transfer import (ImportStrategy, transferFile, )
+from .scanner import (DirectoryScanner, )
+from .catalog import (ResourceCatalog, )
+from .garbage import (GarbageCollectionReport, GarbageTracker, )
+from .search import (PathSearchIndex, )
+from .events import (ResourceChange, ResourceChangeKind, )
+from .pipeline import (ImportRule, ImportPipeline, )
 from .resource import (ReferenceCountedResource, ResourceFile, ResourcePathResolver, ResourceManager, )
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Memory kept per managed resource by a ResourceManager, measured through
+the API every version of it has: the two-argument constructor and
+`addResource`. Passing the folder of another checkout of the package
+(e.g. a git worktree of an older commit) measures its manager instead,
+for a before/after comparison. Each version is measured in a process of
+its own, so neither benefits from tables the other already grew.
+
+    python -m <package>.management.benchmark [count] [other checkout]
+"""
+from typing import (Optional, )
+from pathlib import Path
+from types import (ModuleType, )
+import gc
+import importlib.util
+import sys
+import tempfile
+import tracemalloc
+
+from . import resource as _resource
+
+
+def _fakePath(i: int, ) -> str:
+    return f"textures/set{i % 200:03d}/texture_{i:06d}.png"
+
+
+def _makeResolver(module: ModuleType, ):
+    class _Resolver(module.ResourcePathResolver, ):
+        def importPathToRelativePath(self, path: str, ) -> str:
+            return path
+
+        def exportPathFromRelativePath(self, path: str, ) -> str:
+            return path
+
+        def resolveNameConflict(self, name: str, ) -> str:
+            return "_" + name
+
+        def isImportantResource(self, fullPath: str, ) -> bool:
+            return False
+
+    return _Resolver()
+
+
+def loadManagement(checkout: str, ) -> ModuleType:
+    """
+    The `management.resource` module of another checkout of the package,
+    imported under its own name so both versions can be loaded at once
+    """
+    folder = Path(checkout, "management", )
+    name = "_benchmarked_management"
+    spec = importlib.util.spec_from_file_location(
+        name, folder / "__init__.py", submodule_search_locations=[folder.as_posix(), ],
+    )
+    package = importlib.util.module_from_spec(spec, )
+    sys.modules[name] = package
+    spec.loader.exec_module(package, )
+    return importlib.import_module(name + ".resource", )
+
+
+def measureManager(count: int, module: ModuleType = _resource, ) -> float:
+    """
+    Memory kept by the ResourceManager of `module` per file added with
+    addResource. The files are written under its root first, so nothing
+    is copied.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        for i in range(count, ):
+            path = Path(root, _fakePath(i, ), )
+            path.parent.mkdir(parents=True, exist_ok=True, )
+            path.write_bytes(i.to_bytes(8, "little", ), )
+            paths.append(path.as_posix(), )
+        resolver = _makeResolver(module, )
+        # Earlier runs must not be freed while this one is measured
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        manager = module.ResourceManager(root, resolver, )
+        for path in paths:
+            manager.addResource(path, False, )
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        shutdown = getattr(manager, "shutdown", None, )
+        if shutdown is not None:
+            shutdown()
+    return (after - before) / count
+
+
+def main(count: int = 100_000, checkout: Optional[str] = None, ):
+    module = loadManagement(checkout, ) if checkout is not None else _resource
+    perResource = measureManager(count, module, )
+    print(f"{count} resources, {checkout or 'this tree'}: {perResource:.1f} bytes/resource")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1], ) if len(sys.argv, ) > 1 else 100_000,
+        sys.argv[2] if len(sys.argv, ) > 2 else None,
+    )
@@ -0,0 +1,117 @@
+from typing import (Dict, Iterable, List, Optional, Tuple, Any, TextIO, )
+from pathlib import Path
+import json
+import os
+import threading
+
+from .storage import (readJson, writeJson, )
+
+
+# exported path -> [path relative to root, size, sample digest, full digest or None, refCount]
+CatalogEntries = Dict[str, List[Any]]
+
+
+class ResourceCatalog:
+    """
+    Durable record of the resources of a ResourceManager.
+    The catalog is a snapshot file plus an append-only journal of changes.
+    Journal records carry absolute values, so replaying one twice is
+    harmless. Once the journal grows past `compactThreshold` records, the
+    owner is expected to write a new snapshot with `compact()`.
+    """
+    VERSION = 1
+    SNAPSHOT_FILE = "catalog.json"
+    JOURNAL_FILE = "catalog.journal"
+
+    def __init__(self, directory: Path, compactThreshold: int = 4096, durable: bool = False, ):
+        self.__snapshotPath = directory / self.SNAPSHOT_FILE
+        self.__journalPath = directory / self.JOURNAL_FILE
+        self.__compactThreshold = compactThreshold
+        self.__durable = durable
+        self.__journal: Optional[TextIO] = None
+        self.__journalLength = 0
+        self.__lock = threading.Lock()
+
+    def load(self, ) -> CatalogEntries:
+        entries: CatalogEntries = {}
+        data = readJson(self.__snapshotPath, )
+        if data is not None and data.get("version", ) == self.VERSION:
+            entries.update(data.get("entries", {}, ), )
+
+        length = 0
+        try:
+            with open(self.__journalPath, "r", encoding="utf-8", ) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line, )
+                    except ValueError:
+                        # A torn last line after a crash
+                        continue
+                    self.__apply(entries, record, )
+                    length += 1
+        except OSError:
+            pass
+        with self.__lock:
+            self.__journalLength = length
+        return entries
+
+    @staticmethod
+    def __apply(entries: CatalogEntries, record: List[Any], ):
+        op = record[0]
+        if op == "add":
+            entries[record[1]] = list(record[2:], )
+        elif op == "ref":
+            entry = entries.get(record[1], )
+            if entry is not None:
+                entry[4] = record[2]
+        elif op == "del":
+            entries.pop(record[1], None, )
+        elif op == "clear":
+            entries.clear()
+
+    def __append(self, record: List[Any], ):
+        with self.__lock:
+            if self.__journal is None:
+                os.makedirs(self.__journalPath.parent, exist_ok=True, )
+                self.__journal = open(self.__journalPath, "a", encoding="utf-8", )
+            self.__journal.write(json.dumps(record, separators=(",", ":", ), ) + "\n", )
+            self.__journal.flush()
+            if self.__durable:
+                os.fsync(self.__journal.fileno(), )
+            self.__journalLength += 1
+
+    def recordAdd(
+        self, exportPath: str, relativePath: str,
+        size: int, sample: str, digest: Optional[str], refCount: int,
+    ):
+        self.__append(["add", exportPath, relativePath, size, sample, digest, refCount, ], )
+
+    def recordRefCount(self, exportPath: str, refCount: int, ):
+        self.__append(["ref", exportPath, refCount, ], )
+
+    def recordRemove(self, exportPath: str, ):
+        self.__append(["del", exportPath, ], )
+
+    def recordClear(self, ):
+        self.__append(["clear", ], )
+
+    def needsCompaction(self, ) -> bool:
+        return self.__journalLength >= self.__compactThreshold
+
+    def compact(self, entries: Iterable[Tuple[str, List[Any]]], ):
+        """
+        Replace the snapshot with `entries` and start an empty journal
+        """
+        with self.__lock:
+            writeJson(self.__snapshotPath, {"version": self.VERSION, "entries": dict(entries, ), }, durable=True, )
+            # Records in the old journal are all part of the new snapshot now
+            if self.__journal is not None:
+                self.__journal.close()
+            self.__journal = open(self.__journalPath, "w", encoding="utf-8", )
+            self.__journalLength = 0
+
+    def close(self, ):
+        with self.__lock:
+            if self.__journal is not None:
+                self.__journal.close()
+                self.__journal = None
@@ -0,0 +1,30 @@
+from typing import (Optional, )
+
+from PySide6.QtCore import (QObject, Signal, )
+
+from .resource import (ResourceManager, )
+from .events import (ResourceChange, )
+
+
+class ResourceChangeNotifier(QObject, ):
+    """
+    Re-emits the changes of a ResourceManager as the `changed` signal.
+    Changes made by worker threads reach receivers through their event loop,
+    in the order they were made.
+    """
+    changed = Signal(object, )
+
+    @classmethod
+    def forManager(cls, manager: ResourceManager, ) -> "ResourceChangeNotifier":
+        """
+        The notifier shared by every view of `manager`. Create it in the GUI
+        thread.
+        """
+        return manager.getShared(cls, cls, )
+
+    def __init__(self, manager: ResourceManager, parent: Optional[QObject] = None, ):
+        super().__init__(parent, )
+        manager.addChangeListener(self.__onChange, )
+
+    def __onChange(self, change: ResourceChange, ):
+        self.changed.emit(change, )
@@ -0,0 +1,28 @@
+from typing import (Optional, )
+from enum import (Enum, )
+
+
+class ResourceChangeKind(Enum):
+    ADDED = "added"
+    REMOVED = "removed"
+    REF_COUNT = "ref-count"
+    # Every resource was forgotten at once
+    CLEARED = "cleared"
+
+
+class ResourceChange:
+    """
+    One change to the resources of a ResourceManager, as given to its
+    change listeners. `path` is the exported path and `suffix` the suffix of
+    the managed file; both are empty for CLEARED.
+    """
+    __slots__ = ("kind", "path", "suffix", "refCount", )
+
+    def __init__(self, kind: ResourceChangeKind, path: str = "", suffix: str = "", refCount: Optional[int] = None, ):
+        self.kind = kind
+        self.path = path
+        self.suffix = suffix
+        self.refCount = refCount
+
+    def __repr__(self, ):
+        return f"ResourceChange({self.kind.name}, {self.path!r}, refCount={self.refCount})"
@@ -0,0 +1,35 @@
+from typing import (Optional, )
+from concurrent.futures import (Future, )
+
+from PySide6.QtCore import (Qt, QObject, Signal, Slot, )
+
+
+class ResourceFutureWatcher(QObject, ):
+    """
+    Re-emits the outcome of a `concurrent.futures.Future` as Qt signals in
+    the thread the watcher lives in. Delivery is always queued, so signals
+    connected right after construction are never missed, even if the future
+    had already finished.
+    """
+    finished = Signal(object, )
+    failed = Signal(object, )
+    _resolved = Signal()
+
+    def __init__(self, future: Future, parent: Optional[QObject] = None, ):
+        super().__init__(parent, )
+        self.__future = future
+        self._resolved.connect(self.__deliver, Qt.ConnectionType.QueuedConnection, )
+        future.add_done_callback(lambda _: self._resolved.emit(), )
+
+    def future(self, ) -> Future:
+        return self.__future
+
+    @Slot()
+    def __deliver(self, ):
+        if not self.__future.cancelled():
+            error = self.__future.exception()
+            if error is not None:
+                self.failed.emit(error, )
+            else:
+                self.finished.emit(self.__future.result(), )
+        self.deleteLater()
@@ -0,0 +1,64 @@
+from typing import (Dict, List, Tuple, )
+import threading
+import time
+
+
+class GarbageCollectionReport:
+    """
+    Outcome of one garbage collection run. Paths are absolute posix paths.
+    """
+    def __init__(self, ):
+        self.deleted: List[str] = []
+        self.freedBytes = 0
+        # Referenced again before the grace period ended, or during the run
+        self.skippedInUse: List[str] = []
+        # Rejected by ResourcePathResolver.isImportantResource
+        self.skippedImportant: List[str] = []
+        self.failed: List[Tuple[str, str]] = []
+        self.cancelled = False
+
+    def merge(self, other: "GarbageCollectionReport", ):
+        self.deleted.extend(other.deleted, )
+        self.freedBytes += other.freedBytes
+        self.skippedInUse.extend(other.skippedInUse, )
+        self.skippedImportant.extend(other.skippedImportant, )
+        self.failed.extend(other.failed, )
+        self.cancelled = self.cancelled or other.cancelled
+
+
+class GarbageTracker:
+    """
+    Remembers since when each managed file has had no reference.
+    Keyed by absolute posix path, with the exported path alongside.
+    """
+    def __init__(self, ):
+        self.__candidates: Dict[str, Tuple[str, float]] = {}
+        self.__lock = threading.Lock()
+
+    def mark(self, fullPath: str, exportPath: str, ):
+        with self.__lock:
+            if fullPath not in self.__candidates:
+                self.__candidates[fullPath] = (exportPath, time.monotonic(), )
+
+    def unmark(self, fullPath: str, ):
+        with self.__lock:
+            self.__candidates.pop(fullPath, None, )
+
+    def clear(self, ):
+        with self.__lock:
+            self.__candidates.clear()
+
+    def __len__(self, ):
+        return len(self.__candidates, )
+
+    def take(self, gracePeriod: float, ) -> List[Tuple[str, str]]:
+        """
+        Remove and return the (fullPath, exportPath) of candidates that have
+        had no reference for at least `gracePeriod` seconds
+        """
+        deadline = time.monotonic() - gracePeriod
+        with self.__lock:
+            due = [(p, e) for p, (e, since) in self.__candidates.items() if since <= deadline]
+            for p, _ in due:
+                del self.__candidates[p]
+        return due
@@ -0,0 +1,139 @@
+from typing import (Dict, Tuple, Optional, Callable, )
+from pathlib import Path
+import os
+import sys
+import threading
+
+from .storage import (readJson, writeJson, )
+
+
+class HashIndex:
+    """
+    On-disk cache of file digests keyed by path, size, mtime_ns and inode.
+    Unchanged files get their digest back without being read again.
+    A "sample" and a "full" digest can be kept per file, as raw bytes in
+    memory and hex on disk. Safe to use from several threads.
+    """
+    VERSION = 3
+    # Position of each kind of digest in an entry
+    KINDS = {"sample": 3, "full": 4, }
+
+    def __init__(self, indexPath: Path, basePath: Path, algorithm: str, ):
+        self.__indexPath = indexPath
+        self.__basePath = basePath
+        self.__algorithm = algorithm
+        # key -> (size, mtime_ns, inode, sample digest, full digest)
+        self.__entries: Dict[str, Tuple] = {}
+        self.__dirty = False
+        self.__lock = threading.RLock()
+        # Orders writers, so an older copy never replaces a newer one
+        self.__saveLock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def __key(self, path: Path, ) -> str:
+        if path.is_relative_to(self.__basePath, ):
+            return path.relative_to(self.__basePath, ).as_posix()
+        return path.absolute().as_posix()
+
+    def load(self, ):
+        with self.__lock:
+            self.__load()
+
+    def __load(self, ):
+        self.__entries.clear()
+        self.__dirty = False
+        data = readJson(self.__indexPath, )
+        if data is None:
+            return
+        if data.get("version", ) != self.VERSION or data.get("algorithm", ) != self.__algorithm:
+            # Digests made by another algorithm are useless, start over
+            self.__dirty = True
+            return
+        for key, (size, mtime, ino, sample, full, ) in data.get("entries", {}, ).items():
+            self.__entries[sys.intern(key, )] = (
+                size, mtime, ino,
+                bytes.fromhex(sample, ) if sample is not None else None,
+                bytes.fromhex(full, ) if full is not None else None,
+            )
+
+    def save(self, ):
+        """
+        Write the index if it changed. Entries are copied under the lock
+        and written outside it, so lookups from other threads go on.
+        """
+        with self.__saveLock:
+            with self.__lock:
+                if not self.__dirty:
+                    return
+                entries = dict(self.__entries, )
+                self.__dirty = False
+            try:
+                writeJson(self.__indexPath, {
+                    "version": self.VERSION,
+                    "algorithm": self.__algorithm,
+                    "entries": {
+                        key: [
+                            size, mtime, ino,
+                            sample.hex() if sample is not None else None,
+                            full.hex() if full is not None else None,
+                        ]
+                        for key, (size, mtime, ino, sample, full, ) in entries.items()
+                    },
+                }, )
+            except BaseException:
+                with self.__lock:
+                    self.__dirty = True
+                raise
+
+    @staticmethod
+    def __isFresh(entry: Optional[Tuple], st: os.stat_result, ):
+        return entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns and entry[2] == st.st_ino
+
+    def lookup(self, path: Path, stat: Optional[os.stat_result] = None, kind: str = "full", ) -> Optional[bytes]:
+        st = stat if stat is not None else os.stat(path, )
+        with self.__lock:
+            entry = self.__entries.get(self.__key(path, ), )
+            if self.__isFresh(entry, st, ):
+                return entry[self.KINDS[kind]]
+        return None
+
+    def store(self, path: Path, digest: bytes, stat: Optional[os.stat_result] = None, kind: str = "full", ):
+        st = stat if stat is not None else os.stat(path, )
+        key = self.__key(path, )
+        with self.__lock:
+            entry = self.__entries.get(key, )
+            if not self.__isFresh(entry, st, ):
+                entry = (st.st_size, st.st_mtime_ns, st.st_ino, None, None, )
+            index = self.KINDS[kind]
+            # interned as on load, shared with the exported path when they are the same
+            self.__entries[sys.intern(key, )] = entry[:index] + (digest, ) + entry[index + 1:]
+            self.__dirty = True
+
+    def discard(self, path: Path, ):
+        with self.__lock:
+            if self.__entries.pop(self.__key(path, ), None, ) is not None:
+                self.__dirty = True
+
+    def getDigest(self, path: Path, compute: Callable[[Path], bytes], kind: str = "full", ) -> bytes:
+        st = os.stat(path, )
+        digest = self.lookup(path, st, kind, )
+        if digest is not None:
+            with self.__lock:
+                self.hits += 1
+            return digest
+
+        with self.__lock:
+            self.misses += 1
+        digest = compute(path, )
+        after = os.stat(path, )
+        # Only remember the digest if the file did not change while hashing it
+        if after.st_size == st.st_size and after.st_mtime_ns == st.st_mtime_ns:
+            self.store(path, digest, after, kind, )
+        return digest
+
+    def resetStatistics(self, ):
+        with self.__lock:
+            self.hits = 0
+            self.misses = 0
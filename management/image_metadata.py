@@ -0,0 +1,141 @@
+from typing import (Optional, Dict, List, Iterable, )
+from concurrent.futures import (ThreadPoolExecutor, )
+from pathlib import Path
+import threading
+
+from PySide6.QtGui import (QImage, QImageReader, )
+
+from .resource import (ResourceManager, )
+from .storage import (readJson, writeJson, DeferredSave, )
+
+
+class ImageMetadata:
+    """
+    What the header of an image file tells without decoding its pixels.
+    `depth` is in bits per pixel, 0 if the header does not say.
+    """
+    __slots__ = ("width", "height", "format", "depth", "frameCount", )
+
+    def __init__(self, width: int, height: int, format: str, depth: int, frameCount: int, ):
+        self.width = width
+        self.height = height
+        self.format = format
+        self.depth = depth
+        self.frameCount = frameCount
+
+    def toList(self, ) -> List:
+        return [self.width, self.height, self.format, self.depth, self.frameCount, ]
+
+    @classmethod
+    def fromList(cls, entry: List, ) -> "ImageMetadata":
+        return cls(*entry, )
+
+
+class ImageMetadataIndex:
+    """
+    Image metadata of the resources of a ResourceManager, keyed by content
+    digest and kept in the manager's metadata folder. Only file headers are
+    read. Safe to use from several threads.
+    """
+    VERSION = 1
+    # Seconds scheduleSave waits for more changes before writing
+    SAVE_DELAY = 2.0
+    INDEX_FILE = "image-metadata.json"
+
+    @classmethod
+    def forManager(cls, manager: ResourceManager, ) -> "ImageMetadataIndex":
+        """
+        The index shared by every picker of `manager`
+        """
+        return manager.getShared(cls, cls, )
+
+    def __init__(self, manager: ResourceManager, ):
+        self.__manager = manager
+        self.__indexPath = Path(manager.getRootPath(), ) / ResourceManager.METADATA_DIR / self.INDEX_FILE
+        # digest -> [width, height, format, depth, frameCount]
+        self.__entries: Dict[str, List] = {}
+        self.__dirty = False
+        self.__lock = threading.Lock()
+        self.__saveLock = threading.Lock()
+        self.__deferredSave = DeferredSave(self.save, self.SAVE_DELAY, )
+        self.load()
+
+    def load(self, ):
+        with self.__lock:
+            self.__entries.clear()
+            self.__dirty = False
+            data = readJson(self.__indexPath, )
+            if data is not None and data.get("version", ) == self.VERSION:
+                self.__entries.update(data.get("entries", {}, ), )
+
+    def save(self, ):
+        """
+        Write the index if it changed, outside the lock so readers go on
+        """
+        with self.__saveLock:
+            with self.__lock:
+                if not self.__dirty:
+                    return
+                entries = dict(self.__entries, )
+                self.__dirty = False
+            try:
+                writeJson(self.__indexPath, {"version": self.VERSION, "entries": entries, }, )
+            except BaseException:
+                with self.__lock:
+                    self.__dirty = True
+                raise
+
+    def scheduleSave(self, ):
+        """
+        Save a little later on a timer thread
+        """
+        self.__deferredSave.schedule()
+
+    def get(self, exportPath: str, compute: bool = True, ) -> Optional[ImageMetadata]:
+        """
+        Metadata of a managed image, or None if it is not managed or its
+        header cannot be read. If `compute` is False, nothing is hashed or
+        read and None is also returned for images not indexed yet.
+        """
+        digest = self.__manager.getDigest(exportPath, compute, )
+        if digest is None:
+            return None
+        with self.__lock:
+            entry = self.__entries.get(digest, )
+        if entry is not None:
+            return ImageMetadata.fromList(entry, )
+        if not compute:
+            return None
+
+        metadata = self.readHeader(self.__manager.getFullPath(exportPath, ), )
+        if metadata is not None:
+            with self.__lock:
+                self.__entries[digest] = metadata.toList()
+                self.__dirty = True
+        return metadata
+
+    def collect(self, exportPaths: Iterable[str], maxWorkers: int = 8, ) -> Dict[str, ImageMetadata]:
+        """
+        Metadata of many images at once, headers being read in parallel.
+        Images without readable metadata are left out.
+        """
+        exportPaths = list(exportPaths, )
+        with ThreadPoolExecutor(maxWorkers, thread_name_prefix="ImageMetadata", ) as executor:
+            found = executor.map(self.get, exportPaths, )
+            return {p: m for p, m in zip(exportPaths, found, ) if m is not None}
+
+    @staticmethod
+    def readHeader(fullPath: str, ) -> Optional[ImageMetadata]:
+        reader = QImageReader(fullPath, )
+        # Size and pixel format come from the header; read() is never called
+        size = reader.size()
+        if not size.isValid():
+            return None
+        imageFormat = reader.imageFormat()
+        depth = 0 if imageFormat == QImage.Format.Format_Invalid else QImage.toPixelFormat(imageFormat, ).bitsPerPixel()
+        frameCount = reader.imageCount() if reader.supportsAnimation() else 1
+        return ImageMetadata(
+            size.width(), size.height(),
+            bytes(reader.format(), ).decode("ascii", "replace", ).lower(),
+            depth, max(frameCount, 1, ),
+        )
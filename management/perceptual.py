@@ -0,0 +1,271 @@
+from typing import (Optional, Dict, List, Tuple, Iterable, Callable, Set, )
+from concurrent.futures import (ProcessPoolExecutor, )
+from pathlib import Path
+import multiprocessing
+import threading
+
+try:
+    import numpy
+except ImportError:
+    # Optional, only makes hashing and wide searches faster
+    numpy = None
+
+from PySide6.QtCore import (Qt, QSize, )
+from PySide6.QtGui import (QImage, QImageReader, )
+
+from .resource import (ResourceManager, )
+from .storage import (readJson, writeJson, DeferredSave, )
+
+
+HASH_BITS = 64
+# dHash compares each of 8 rows of 9 gray pixels with their right neighbour
+_HASH_WIDTH, _HASH_HEIGHT = 9, 8
+
+
+def differenceHash(fullPath: str, ) -> Optional[int]:
+    """
+    64 bit dHash of an image file, None if it cannot be decoded.
+    Similar looking images, e.g. the same picture saved at another size or
+    quality, have hashes differing by a few bits.
+    """
+    reader = QImageReader(fullPath, )
+    reader.setAutoTransform(True, )
+    size = reader.size()
+    if size.isValid():
+        # a small decode is enough, JPEG can skip most of the work
+        reader.setScaledSize(size.boundedTo(QSize(_HASH_WIDTH * 8, _HASH_HEIGHT * 8, ), ), )
+    image = reader.read()
+    if image.isNull():
+        return None
+    gray = image.scaled(
+        _HASH_WIDTH, _HASH_HEIGHT, Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    ).convertToFormat(QImage.Format.Format_Grayscale8, )
+    stride = gray.bytesPerLine()
+    data = bytes(gray.constBits(), )[:stride * _HASH_HEIGHT]
+    if numpy is not None:
+        pixels = numpy.frombuffer(data, numpy.uint8, ).reshape(_HASH_HEIGHT, stride, )[:, :_HASH_WIDTH]
+        bits = numpy.packbits(pixels[:, 1:] > pixels[:, :-1], )
+        return int.from_bytes(bits.tobytes(), "big", )
+    value = 0
+    for y in range(_HASH_HEIGHT, ):
+        row = data[y * stride:y * stride + _HASH_WIDTH]
+        for x in range(_HASH_WIDTH - 1, ):
+            value = (value << 1) | (row[x + 1] > row[x])
+    return value
+
+
+class PerceptualHashIndex:
+    """
+    dHashes of the images of a ResourceManager, keyed by content digest and
+    kept in the manager's metadata folder.
+    Near-duplicate queries use multi-index hashing: hashes are cut into
+    `maxDistance + 1` chunks, and two hashes within `maxDistance` bits of
+    each other share at least one chunk exactly, so only hashes sharing a
+    chunk are compared. Safe to use from several threads.
+    """
+    VERSION = 1
+    # Seconds scheduleSave waits for more changes before writing
+    SAVE_DELAY = 2.0
+    INDEX_FILE = "perceptual-hash.json"
+
+    @classmethod
+    def forManager(cls, manager: ResourceManager, ) -> "PerceptualHashIndex":
+        """
+        The index shared by every picker of `manager`
+        """
+        return manager.getShared(cls, cls, )
+
+    def __init__(self, manager: ResourceManager, maxDistance: int = 4, ):
+        self.__manager = manager
+        self.__indexPath = Path(manager.getRootPath(), ) / ResourceManager.METADATA_DIR / self.INDEX_FILE
+        self.maxDistance = maxDistance
+        count = maxDistance + 1
+        # (shift, mask) of each chunk
+        self.__chunks = [
+            (HASH_BITS - (i + 1) * HASH_BITS // count, (1 << ((i + 1) * HASH_BITS // count - i * HASH_BITS // count)) - 1, )
+            for i in range(count, )
+        ]
+        # digest -> hash, and per chunk: chunk value -> digests
+        self.__hashes: Dict[str, int] = {}
+        self.__tables: List[Dict[int, Set[str]]] = [{} for _ in self.__chunks]
+        self.__dirty = False
+        self.__lock = threading.Lock()
+        self.__saveLock = threading.Lock()
+        self.__deferredSave = DeferredSave(self.save, self.SAVE_DELAY, )
+        self.load()
+
+    def load(self, ):
+        with self.__lock:
+            self.__hashes.clear()
+            for table in self.__tables:
+                table.clear()
+            self.__dirty = False
+            data = readJson(self.__indexPath, )
+            if data is None or data.get("version", ) != self.VERSION:
+                return
+            for digest, value in data.get("entries", {}, ).items():
+                self.__insert(digest, value, )
+
+    def save(self, ):
+        """
+        Write the index if it changed, outside the lock so readers go on
+        """
+        with self.__saveLock:
+            with self.__lock:
+                if not self.__dirty:
+                    return
+                entries = dict(self.__hashes, )
+                self.__dirty = False
+            try:
+                writeJson(self.__indexPath, {"version": self.VERSION, "entries": entries, }, )
+            except BaseException:
+                with self.__lock:
+                    self.__dirty = True
+                raise
+
+    def scheduleSave(self, ):
+        """
+        Save a little later on a timer thread
+        """
+        self.__deferredSave.schedule()
+
+    def __len__(self, ):
+        return len(self.__hashes, )
+
+    def __insert(self, digest: str, value: int, ):
+        old = self.__hashes.get(digest, )
+        if old == value:
+            return
+        if old is not None:
+            for (shift, mask, ), table in zip(self.__chunks, self.__tables, ):
+                table[(old >> shift) & mask].discard(digest, )
+        self.__hashes[digest] = value
+        for (shift, mask, ), table in zip(self.__chunks, self.__tables, ):
+            table.setdefault((value >> shift) & mask, set(), ).add(digest, )
+
+    def store(self, digest: str, value: int, ):
+        with self.__lock:
+            self.__insert(digest, value, )
+            self.__dirty = True
+
+    def hashOf(self, digest: str, ) -> Optional[int]:
+        with self.__lock:
+            return self.__hashes.get(digest, )
+
+    def update(
+        self, exportPaths: Iterable[str], /,
+        maxWorkers: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Hash the managed images among `exportPaths` not hashed yet, decoding
+        them in a process pool. `progress(done, total)` is called as hashes
+        come in. Returns the number of images hashed.
+        """
+        missing: Dict[str, str] = {}
+        for exportPath in exportPaths:
+            digest = self.__manager.getDigest(exportPath, )
+            if digest is not None and self.hashOf(digest, ) is None:
+                missing.setdefault(digest, self.__manager.getFullPath(exportPath, ), )
+        if not missing:
+            return 0
+
+        digests = list(missing.keys(), )
+        done = 0
+        # spawned workers do not inherit the GUI's threads and Qt state
+        with ProcessPoolExecutor(maxWorkers, mp_context=multiprocessing.get_context("spawn", ), ) as executor:
+            for digest, value in zip(digests, executor.map(differenceHash, missing.values(), chunksize=16, ), ):
+                if value is not None:
+                    self.store(digest, value, )
+                done += 1
+                if progress is not None:
+                    progress(done, len(digests, ), )
+        return done
+
+    @staticmethod
+    def distance(a: int, b: int, ) -> int:
+        return (a ^ b).bit_count()
+
+    def __near(self, value: int, maxDistance: int, ) -> List[Tuple[str, int]]:
+        if maxDistance <= self.maxDistance:
+            candidates: Set[str] = set()
+            for (shift, mask, ), table in zip(self.__chunks, self.__tables, ):
+                candidates.update(table.get((value >> shift) & mask, ()), )
+            found = ((d, (value ^ self.__hashes[d]).bit_count(), ) for d in candidates)
+            return [(d, n, ) for d, n in found if n <= maxDistance]
+        # wider than the chunks allow, compare with every hash
+        digests = list(self.__hashes.keys(), )
+        if numpy is not None and digests:
+            hashes = numpy.fromiter(self.__hashes.values(), numpy.uint64, len(digests, ), )
+            xor = numpy.bitwise_xor(hashes, numpy.uint64(value, ), )
+            counts = numpy.unpackbits(xor.view(numpy.uint8, ).reshape(-1, 8, ), axis=1, ).sum(axis=1, )
+            return [(digests[i], int(counts[i]), ) for i in numpy.nonzero(counts <= maxDistance, )[0]]
+        found = ((d, (value ^ h).bit_count(), ) for d, h in self.__hashes.items())
+        return [(d, n, ) for d, n in found if n <= maxDistance]
+
+    def near(self, value: int, maxDistance: Optional[int] = None, ) -> List[Tuple[str, int]]:
+        """
+        (digest, distance) of the hashed images within `maxDistance` bits of
+        `value`, closest first
+        """
+        with self.__lock:
+            found = self.__near(value, self.maxDistance if maxDistance is None else maxDistance, )
+        found.sort(key=lambda e: e[1], )
+        return found
+
+    def __digestsToPaths(self, ) -> Dict[str, List[str]]:
+        paths: Dict[str, List[str]] = {}
+        for resource in self.__manager.listResources():
+            digest = self.__manager.getDigest(resource.path, False, )
+            if digest is not None:
+                paths.setdefault(digest, [], ).append(resource.path, )
+        return paths
+
+    def findSimilar(self, fullPath: str, maxDistance: Optional[int] = None, ) -> List[Tuple[str, int]]:
+        """
+        (exported path, distance) of the managed images looking like the file
+        at `fullPath`, closest first. Only images already hashed by `update`
+        are considered.
+        """
+        value = differenceHash(fullPath, )
+        if value is None:
+            return []
+        found = self.near(value, maxDistance, )
+        if not found:
+            return []
+        paths = self.__digestsToPaths()
+        return [(p, n, ) for d, n in found for p in paths.get(d, ())]
+
+    def clusters(self, maxDistance: Optional[int] = None, ) -> List[List[str]]:
+        """
+        Groups of managed images that are near-duplicates of each other, as
+        exported paths. Images are grouped when linked by a chain of pairs
+        within `maxDistance` bits.
+        """
+        with self.__lock:
+            hashes = dict(self.__hashes, )
+        parents = {d: d for d in hashes}
+
+        def root(d: str, ) -> str:
+            while parents[d] != d:
+                parents[d] = parents[parents[d]]
+                d = parents[d]
+            return d
+
+        for digest, value in hashes.items():
+            for other, _ in self.near(value, maxDistance, ):
+                if other in parents:
+                    a, b = root(digest, ), root(other, )
+                    if a != b:
+                        parents[a] = b
+        groups: Dict[str, List[str]] = {}
+        for digest in hashes:
+            groups.setdefault(root(digest, ), [], ).append(digest, )
+        paths = self.__digestsToPaths()
+        clusters = []
+        for digests in groups.values():
+            cluster = [p for d in digests for p in paths.get(d, ())]
+            if len(cluster, ) > 1:
+                clusters.append(sorted(cluster, ), )
+        return clusters
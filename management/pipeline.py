@@ -0,0 +1,223 @@
+from typing import (Optional, Dict, List, Iterable, Callable, Tuple, )
+from concurrent.futures import (Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, )
+from pathlib import Path
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+
+_logger = logging.getLogger(__name__, )
+
+
+def _formatOfSuffix(suffix: str, ) -> str:
+    suffix = suffix.lower().lstrip(".", )
+    return "jpeg" if suffix in ("jpg", "jpe", ) else suffix
+
+
+def _optimizeImage(
+    source: str, dest: str,
+    maxWidth: Optional[int], maxHeight: Optional[int],
+    format: str, quality: int, stripMetadata: bool,
+) -> bool:
+    # Runs in a worker process, Qt is only loaded there
+    from PySide6.QtCore import (Qt, QSize, )
+    from PySide6.QtGui import (QImageReader, QImageWriter, )
+
+    reader = QImageReader(source, )
+    # Orientation is applied to the pixels, so dropping EXIF loses nothing
+    reader.setAutoTransform(True, )
+    image = reader.read()
+    if image.isNull():
+        return False
+    bound = QSize(maxWidth or image.width(), maxHeight or image.height(), )
+    if image.width() > bound.width() or image.height() > bound.height():
+        image = image.scaled(bound, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation, )
+    writer = QImageWriter(dest, format.encode("ascii", ), )
+    if quality >= 0:
+        writer.setQuality(quality, )
+    if not stripMetadata:
+        for key in image.textKeys():
+            writer.setText(key, image.text(key, ), )
+    return writer.write(image, )
+
+
+class ImportRule:
+    """
+    How images imported into a subfolder are rewritten: scaled down to fit
+    `maxWidth` x `maxHeight`, saved as `format` (e.g. "webp", None keeps the
+    source's) at `quality` (0-100, -1 for the writer's default), with or
+    without their text metadata.
+    """
+    VERSION = 1
+    DEFAULT_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp", ".tif", ".tiff", )
+
+    def __init__(
+        self, /,
+        maxWidth: Optional[int] = None,
+        maxHeight: Optional[int] = None,
+        format: Optional[str] = None,
+        quality: int = -1,
+        stripMetadata: bool = True,
+        extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+    ):
+        self.maxWidth = maxWidth
+        self.maxHeight = maxHeight
+        self.format = format.lower() if format else None
+        self.quality = quality
+        self.stripMetadata = stripMetadata
+        self.extensions = {e.lower() for e in extensions}
+
+    def key(self, ) -> str:
+        """
+        Identifies what the rule does to a file, for caching its results
+        """
+        fields = [self.VERSION, self.maxWidth, self.maxHeight, self.format, self.quality, self.stripMetadata, ]
+        return hashlib.blake2b(json.dumps(fields, ).encode(), digest_size=8, ).hexdigest()
+
+    def applies(self, path: Path, ) -> bool:
+        return path.suffix.lower() in self.extensions
+
+    def outputSuffix(self, path: Path, ) -> str:
+        if self.format is None or self.format == _formatOfSuffix(path.suffix, ):
+            return path.suffix
+        return "." + self.format
+
+
+class ImportPipeline:
+    """
+    Rewrites images on their way into a ResourceManager, following the
+    ImportRule of the subfolder they are imported to (the longest matching
+    subfolder, "" for the default). Sources are digested on a thread pool,
+    images are processed in a process pool and the results cached by source
+    digest and rule, so importing the same file again costs no decode.
+    """
+    CACHE_DIR = "optimized"
+    # Written instead of a result when the rule would not make the file smaller
+    KEEP_SUFFIX = ".keep"
+
+    def __init__(self, rules: Dict[str, ImportRule], maxWorkers: Optional[int] = None, ):
+        self.__rules = {self.__normalize(k, ): v for k, v in rules.items()}
+        self.__maxWorkers = maxWorkers
+
+    @staticmethod
+    def __normalize(subFolder: str, ) -> str:
+        return "/".join(p for p in subFolder.replace("\\", "/", ).split("/", ) if p)
+
+    def ruleFor(self, subFolder: str, ) -> Optional[ImportRule]:
+        folder = self.__normalize(subFolder, )
+        while True:
+            rule = self.__rules.get(folder, )
+            if rule is not None or not folder:
+                return rule
+            folder = folder.rpartition("/", )[0]
+
+    def run(
+        self, paths: List[Path], subFolder: str, cacheDir: Path,
+        digestOf: Callable[[Path], str], /,
+        progress: Optional[Callable[[], None]] = None,
+        isCancelled: Optional[Callable[[], bool]] = None,
+    ) -> List[Optional[Tuple[Path, str]]]:
+        """
+        For each source, the file to import instead and the name to import
+        it under, or None to import the source as is, which is also what
+        sources failing to be read or rewritten get (the failure is logged).
+        `progress()` is called once per source processed, and `digestOf`
+        from several threads at once.
+        """
+        results: List[Optional[Tuple[Path, str]]] = [None] * len(paths, )
+        rule = self.ruleFor(subFolder, )
+        if rule is None:
+            return results
+        ruleKey = rule.key()
+        applicable = [i for i, path in enumerate(paths, ) if rule.applies(path, )]
+        if not applicable:
+            return results
+
+        def cancelled() -> bool:
+            return isCancelled is not None and isCancelled()
+
+        def step():
+            if progress is not None:
+                progress()
+
+        # Sources are digested on threads and each one is submitted to the
+        # optimizing pool as soon as its digest is known and missed the cache
+        executor: Optional[Executor] = None
+        jobs: Dict[Future, Tuple[int, Path, Path]] = {}
+        handled = set()
+        with ThreadPoolExecutor(self.__maxWorkers, thread_name_prefix="ImportDigest", ) as digester:
+            digests = {digester.submit(digestOf, paths[i], ): i for i in applicable}
+            for future in as_completed(digests, ):
+                if cancelled():
+                    break
+                i = digests[future]
+                path = paths[i]
+                try:
+                    key = f"{future.result()}-{ruleKey}"
+                except OSError:
+                    _logger.warning("Failed to read %s", path, exc_info=True, )
+                    step()
+                    continue
+                suffix = rule.outputSuffix(path, )
+                output = cacheDir / self.CACHE_DIR / key[:2] / (key + suffix)
+                if output.exists():
+                    results[i] = (output, path.stem + suffix, )
+                    step()
+                    continue
+                if output.with_suffix(self.KEEP_SUFFIX, ).exists():
+                    step()
+                    continue
+                if executor is None:
+                    executor = ThreadPoolExecutor(1, ) if len(applicable, ) == 1 else \
+                        ProcessPoolExecutor(self.__maxWorkers, mp_context=multiprocessing.get_context("spawn", ), )
+                os.makedirs(output.parent, exist_ok=True, )
+                tmpPath = output.with_name(output.stem + ".tmp" + output.suffix, )
+                jobs[executor.submit(
+                    _optimizeImage, path.as_posix(), tmpPath.as_posix(),
+                    rule.maxWidth, rule.maxHeight, _formatOfSuffix(output.suffix, ),
+                    rule.quality, rule.stripMetadata,
+                )] = (i, output, tmpPath, )
+            for future in digests:
+                future.cancel()
+
+        if executor is None:
+            return results
+        try:
+            with executor:
+                for future in as_completed(jobs, ):
+                    if cancelled():
+                        break
+                    handled.add(future, )
+                    i, output, tmpPath = jobs[future]
+                    path = paths[i]
+                    try:
+                        written = future.result()
+                    except Exception:
+                        _logger.warning("Failed to optimize %s", path, exc_info=True, )
+                        written = False
+                    if not written:
+                        tmpPath.unlink(missing_ok=True, )
+                    elif output.suffix == path.suffix and tmpPath.stat().st_size >= path.stat().st_size:
+                        # Same format and no smaller, the source is better kept
+                        tmpPath.unlink()
+                        output.with_suffix(self.KEEP_SUFFIX, ).touch()
+                    else:
+                        os.replace(tmpPath, output, )
+                        results[i] = (output, path.stem + output.suffix, )
+                    step()
+                for future in jobs:
+                    future.cancel()
+        finally:
+            # The pool has exited, so jobs left running on cancel are done writing
+            for future, (_, _, tmpPath, ) in jobs.items():
+                if future not in handled:
+                    tmpPath.unlink(missing_ok=True, )
+        return results
+
+    def pendingCount(self, paths: Iterable[Path], subFolder: str, ) -> int:
+        """
+        How many of `paths` the rule of `subFolder` applies to
+        """
+        rule = self.ruleFor(subFolder, )
+        return 0 if rule is None else sum(1 for p in paths if rule.applies(p, ))
@@ -1,54 +1,226 @@
-from typing import Dict, Optional, Iterable
+from typing import Dict, Optional, Iterable, Callable, List, Set, Tuple, Any, TypeVar, Union
 from abc import ABC, abstractmethod
 from pathlib import Path
+from concurrent.futures import (ThreadPoolExecutor, Future, )
+from contextlib import (contextmanager, )
 import hashlib
+import logging
 import os
+import sys
+import threading
+
+from .hash_index import (HashIndex, )
+from .storage import (DeferredSave, )
+from .transfer import (ImportStrategy, transferFile, )
+from .scanner import (DirectoryScanner, )
+from .catalog import (ResourceCatalog, )
+from .garbage import (GarbageCollectionReport, GarbageTracker, )
+from .search import (PathSearchIndex, )
+from .events import (ResourceChange, ResourceChangeKind, )
+from .pipeline import (ImportPipeline, )
+
+_logger = logging.getLogger(__name__, )
+
+T = TypeVar("T", )
+
+def _toBytes(digest: Union[str, bytes], ) -> bytes:
+    return digest if isinstance(digest, bytes, ) else bytes.fromhex(digest, )
+
+# Per thread, results of ResourceFile comparisons that need reading files,
+# set while those must not happen (see _deferComparisons)
+_deferred = threading.local()
+
+class _ComparisonDeferred(Exception):
+    """
+    Raised by a ResourceFile comparison under `_deferComparisons` when it
+    would have to read `first` and `second`
+    """
+    def __init__(self, first: "ResourceFile", second: "ResourceFile", ):
+        super().__init__()
+        self.first = first
+        self.second = second
+
+@contextmanager
+def _deferComparisons(known: Dict[Tuple[int, int], bool], ):
+    """
+    Within the block, comparing resource files that agree on size and
+    sample raises _ComparisonDeferred unless `known` has the result, keyed
+    by the files' ids, so no file is read while a lock is held
+    """
+    previous = getattr(_deferred, "known", None, )
+    _deferred.known = known
+    try:
+        yield
+    finally:
+        _deferred.known = previous
 
 class ResourceFile:
-    def __init__(self, path: Path, ):
-        self.path = path
-        self.hash_ = self.hashFile(self.path, )
-    
+    """
+    Identity of a file's content, checked in tiers: size, then a digest of
+    sampled head/middle/tail blocks, then a full digest computed on demand.
+    Byte-by-byte comparison only happens when `strict` is set.
+    Digests are kept as raw bytes, given either as bytes (shared with the
+    hash index) or hex, and the directory part of the path is interned, so
+    files in the same folder share it.
+    """
+    __slots__ = ("__dir", "__name", "size", "__sample", "__digest", "__hasher", "strict", )
+    SAMPLE_BLOCK_SIZE = 65536
+
+    def __init__(
+        self, path: Path, hash_: Optional[Union[str, bytes]] = None, /,
+        size: Optional[int] = None,
+        sample: Optional[Union[str, bytes]] = None,
+        hasher: Optional[Callable[[Path], Union[str, bytes]]] = None,
+        strict: bool = False,
+    ):
+        path = Path(path, )
+        self.__dir = sys.intern(path.parent.as_posix(), )
+        self.__name = sys.intern(path.name, )
+        self.size = size if size is not None else os.stat(path, ).st_size
+        if sample is None:
+            sample = self.digestSample(path, self.size, )
+        self.__sample = _toBytes(sample, )
+        if hash_ is None and self.size <= 3 * self.SAMPLE_BLOCK_SIZE:
+            # The sample already covered the whole file
+            hash_ = self.__sample
+        self.__digest = _toBytes(hash_, ) if hash_ is not None else None
+        self.__hasher = hasher
+        self.strict = strict
+
+    @property
+    def path(self, ) -> Path:
+        return Path(self.__dir, self.__name, )
+
+    @property
+    def name(self, ) -> str:
+        return self.__name
+
+    @property
+    def sample(self, ) -> str:
+        return self.__sample.hex()
+
+    @property
+    def sampleDigest(self, ) -> bytes:
+        return self.__sample
+
+    @property
+    def digest(self, ) -> bytes:
+        if self.__digest is None:
+            hasher = self.__hasher if self.__hasher is not None else ResourceFile.digestFile
+            self.__digest = _toBytes(hasher(self.path, ), )
+        return self.__digest
+
+    @property
+    def hash_(self, ) -> str:
+        return self.digest.hex()
+
+    def isHashed(self, ) -> bool:
+        return self.__digest is not None
+
+    def withPath(self, path: Path, hash_: Optional[Union[str, bytes]] = None, ) -> "ResourceFile":
+        """
+        Identity of a file at `path` known to have the same content
+        """
+        return ResourceFile(
+            path, hash_ if hash_ is not None else self.__digest,
+            size=self.size, sample=self.__sample, hasher=self.__hasher, strict=self.strict,
+        )
+
     def __hash__(self, ):
-        return hash(self.hash_, )
+        # bytes objects cache their own hash, and large samples already cover the size
+        return hash(self.__sample, )
 
     def __eq__(self, other: object, ):
         if not isinstance(other, (ResourceFile, )):
             return NotImplemented
-        
-        return self.compareFiles(self.path, other.path, )
+        if self is other:
+            return True
+        if self.size != other.size or self.__sample != other.__sample:
+            return False
+        known = getattr(_deferred, "known", None, )
+        if known is not None:
+            result = known.get((id(self, ), id(other, ), ), )
+            if result is None:
+                raise _ComparisonDeferred(self, other, )
+            return result
+        if self.digest != other.digest:
+            return False
+        if self.strict or other.strict:
+            return self.compareFiles(self.path, other.path, )
+        return True
     
     def __ne__(self, other: object, ):
-        return not self.__eq__(other, )
+        result = self.__eq__(other, )
+        return result if result is NotImplemented else not result
 
     @staticmethod
-    def hashFile(path: Path, blockSize: int = 65536, ):
-        hasher = hashlib.md5()
-        with open(path, "rb", ) as f:
+    def newHasher():
+        return hashlib.blake2b(digest_size=16, )
+
+    @staticmethod
+    def hashFile(path: Path, blockSize: int = 1 << 20, ):
+        return ResourceFile.digestFile(path, blockSize, ).hex()
+
+    @staticmethod
+    def digestFile(path: Path, blockSize: int = 1 << 20, ) -> bytes:
+        hasher = ResourceFile.newHasher()
+        buffer = bytearray(blockSize, )
+        view = memoryview(buffer, )
+        with open(path, "rb", buffering=0, ) as f:
             while True:
-                block = f.read(blockSize, )
-                if not block:
+                n = f.readinto(buffer, )
+                if not n:
                     break
-                hasher.update(block, )
-        return hasher.hexdigest()
+                hasher.update(view[:n], )
+        return hasher.digest()
+
+    @classmethod
+    def sampleFile(cls, path: Path, size: int, ):
+        return cls.digestSample(path, size, ).hex()
+
+    @classmethod
+    def digestSample(cls, path: Path, size: int, ) -> bytes:
+        block = cls.SAMPLE_BLOCK_SIZE
+        if size <= 3 * block:
+            return cls.digestFile(path, )
+        hasher = hashlib.blake2b(digest_size=16, person=b"sample", )
+        hasher.update(size.to_bytes(8, "little", ), )
+        with open(path, "rb", ) as f:
+            for offset in (0, (size - block) // 2, size - block, ):
+                f.seek(offset, )
+                hasher.update(f.read(block, ), )
+        return hasher.digest()
     
     @staticmethod
-    def compareFiles(path1: Path, path2: Path, blockSize: int = 65536, ):
-        f1 = open(path1, "rb", )
-        f2 = open(path2, "rb", )
-        while True:
-            block1 = f1.read(blockSize, )
-            block2 = f2.read(blockSize, )
-            if not block1 and not block2:
-                return True
-            if block1 != block2:
-                return False
+    def compareFiles(path1: Path, path2: Path, blockSize: int = 1 << 20, ):
+        if os.path.getsize(path1, ) != os.path.getsize(path2, ):
+            return False
+        with open(path1, "rb", ) as f1, open(path2, "rb", ) as f2:
+            while True:
+                block1 = f1.read(blockSize, )
+                block2 = f2.read(blockSize, )
+                if block1 != block2:
+                    return False
+                if not block1:
+                    return True
 
 class ReferenceCountedResource:
+    # The path is interned, so the manager's indexes keyed by it all share
+    # this one string instead of each holding a copy
+    __slots__ = ("__path", "refCount", )
+
     def __init__(self, path: str, ):
         self.path = path
         self.refCount = 0
 
+    @property
+    def path(self, ) -> str:
+        return self.__path
+
+    @path.setter
+    def path(self, path: str, ):
+        self.__path = sys.intern(path, )
+
     def __eq__(self, other: object, ):
         if not isinstance(other, (ReferenceCountedResource, )):
             return NotImplemented
@@ -73,82 +245,736 @@ class ResourcePathResolver(ABC, ):
         ...
 
 class ResourceManager:
-    def __init__(self, rootPath: str, pathResolver: ResourcePathResolver, ):
+    # Sidecar folder under the root holding the manager's own bookkeeping files
+    METADATA_DIR = ".resource-manager"
+    HASH_INDEX_FILE = "hash-index.json"
+    # Seconds single adds wait for others before the hash index is written
+    HASH_INDEX_SAVE_DELAY = 2.0
+    # resolveNameConflict calls before a destination name is given up on
+    MAX_NAME_ATTEMPTS = 1000
+
+    def __init__(
+        self, rootPath: str, pathResolver: ResourcePathResolver, /,
+        persistentHashIndex: bool = True,
+        strictCompare: bool = False,
+        importStrategy: ImportStrategy = ImportStrategy.COPY,
+        asyncWorkers: Optional[int] = None,
+        persistentCatalog: bool = False,
+        gcGracePeriod: float = 300.0,
+        catalogCompactThreshold: int = 4096,
+        importPipeline: Optional[ImportPipeline] = None,
+    ):
         self.__rootPath = Path(rootPath, )
         self.__pathResolver = pathResolver
         self.__resources: Dict[ResourceFile, ReferenceCountedResource] = {}
+        # Secondary indexes kept in sync with __resources
+        ## exported path -> resource file
+        self.__byPath: Dict[str, ResourceFile] = {}
+        ## suffix -> resource files (dict used as an ordered set)
+        self.__bySuffix: Dict[str, Dict[ResourceFile, None]] = {}
+        ## absolute posix folder -> names of the managed files in it, the
+        ## names being the resource files' own strings
+        self.__managedPaths: Dict[str, Set[str]] = {}
+        ## exported paths, for searchResources
+        self.__searchIndex = PathSearchIndex()
+        self.__hashIndex = HashIndex(
+            self.__rootPath / self.METADATA_DIR / self.HASH_INDEX_FILE, self.__rootPath, "blake2b-128",
+        )
+        self.__persistentHashIndex = persistentHashIndex
+        self.__hashIndexSave = DeferredSave(self.__saveHashIndexNow, self.HASH_INDEX_SAVE_DELAY, )
+        self.__strictCompare = strictCompare
+        self.__importStrategy = importStrategy
+        self.__lock = threading.RLock()
+        # Content being imported and destinations being written by running calls
+        self.__inFlight: Dict[ResourceFile, threading.Event] = {}
+        self.__reservedPaths: Set[Path] = set()
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        self.__asyncWorkers = asyncWorkers
+        # One bound method shared by every ResourceFile instead of one each
+        self.__hasher = self.__hashFile
+        self.__scanner = DirectoryScanner(
+            self.__rootPath, self.__pathResolver.isImportantResource, (self.METADATA_DIR, ),
+        )
+        self.__catalog = ResourceCatalog(
+            self.__rootPath / self.METADATA_DIR, catalogCompactThreshold,
+        ) if persistentCatalog else None
+        # exported path -> references restored from the catalog not yet claimed by addResource
+        self.__unclaimed: Dict[str, int] = {}
+        # Files without references, deleted by collectGarbage once the grace period is over
+        self.__garbage = GarbageTracker()
+        self.__gcGracePeriod = gcGracePeriod
+        self.__changeListeners: List[Callable[[ResourceChange], None]] = []
+        self.__importPipeline = importPipeline
+        # Objects shared by every user of the manager, see getShared
+        self.__shared: Dict[Any, Any] = {}
+        self.__sharedLock = threading.RLock()
 
     def getRootPath(self, ) -> str:
         return self.__rootPath.as_posix()
+
+    def getFullPath(self, exportPath: str, ) -> str:
+        """
+        Absolute posix path of the file of a resource
+        """
+        return self.getRootPath() + "/" + self.__pathResolver.importPathToRelativePath(exportPath, )
+
+    def getShared(self, key: Any, factory: Callable[["ResourceManager"], T], ) -> T:
+        """
+        The object shared by every user of the manager under `key`, made by
+        `factory(manager)` on first use. It lives as long as the manager, and
+        may hold the manager without keeping it alive.
+        """
+        with self.__sharedLock:
+            shared = self.__shared.get(key, )
+            if shared is None:
+                shared = self.__shared[key] = factory(self, )
+            return shared
     
     def getPathResolver(self, ) -> ResourcePathResolver:
         return self.__pathResolver
 
-    def clearResources(self, deleteFiles: bool = False, ):
-        if deleteFiles:
-            for resourceFile in self.__resources.keys():
-                try:
-                    if not self.__pathResolver.isImportantResource(resourceFile.path.as_posix(), ):
-                        os.remove(resourceFile.path, )
-                except Exception as e:
-                    print(f"Failed to delete file {resourceFile.path}: {e}", )
-        self.__resources.clear()
-
-    def addResource(self, filePath: str, copyIfNotUnderRoot: bool = True, / , subFolder: str = "") -> ReferenceCountedResource:
-        resourceFile = ResourceFile(Path(
-            self.__rootPath / self.__pathResolver.importPathToRelativePath(filePath, ),
+    def getHashIndex(self, ) -> HashIndex:
+        return self.__hashIndex
+
+    def saveHashIndex(self, ):
+        self.__hashIndexSave.flush()
+
+    def scheduleHashIndexSave(self, ):
+        """
+        Save the hash index a little later on a timer thread, so a run of
+        single adds writes it once instead of once per add
+        """
+        if self.__persistentHashIndex:
+            self.__hashIndexSave.schedule()
+
+    def __saveHashIndexNow(self, ):
+        if self.__persistentHashIndex:
+            self.__hashIndex.save()
+
+    def setImportPipeline(self, pipeline: Optional[ImportPipeline], ):
+        """
+        Rewrite files copied in by addResources with `pipeline`, or import
+        them as they are if None
+        """
+        self.__importPipeline = pipeline
+
+    def addChangeListener(self, listener: Callable[[ResourceChange], None], ):
+        """
+        Call `listener` with every ResourceChange. Listeners run in the thread
+        making the change, with the manager locked, so they should only hand
+        the change over (e.g. emit a queued Qt signal) and never block.
+        """
+        with self.__lock:
+            self.__changeListeners.append(listener, )
+
+    def removeChangeListener(self, listener: Callable[[ResourceChange], None], ):
+        with self.__lock:
+            if listener in self.__changeListeners:
+                self.__changeListeners.remove(listener, )
+
+    def __notify(self, change: ResourceChange, ):
+        for listener in self.__changeListeners:
+            try:
+                listener(change, )
+            except Exception:
+                _logger.exception("Resource change listener failed", )
+
+    def __hashFile(self, path: Path, ) -> bytes:
+        return self.__hashIndex.getDigest(path, ResourceFile.digestFile, "full", )
+
+    def __hashFileHex(self, path: Path, ) -> str:
+        return self.__hashFile(path, ).hex()
+
+    def __makeResourceFile(self, path: Path, ) -> ResourceFile:
+        stat = os.stat(path, )
+        sample = self.__hashIndex.getDigest(
+            path, lambda p: ResourceFile.digestSample(p, stat.st_size, ), "sample",
+        )
+        return ResourceFile(
+            path, self.__hashIndex.lookup(path, stat, "full", ),
+            size=stat.st_size, sample=sample, hasher=self.__hasher, strict=self.__strictCompare,
+        )
+
+    def __register(self, resourceFile: ResourceFile, resource: ReferenceCountedResource, journal: bool = True, ):
+        # Registered before journaling, so a compaction it triggers snapshots it
+        self.__resources[resourceFile] = resource
+        if journal and self.__catalog is not None:
+            self.__catalog.recordAdd(
+                resource.path, resourceFile.path.relative_to(self.__rootPath, ).as_posix(),
+                resourceFile.size, resourceFile.sample,
+                resourceFile.hash_ if resourceFile.isHashed() else None, resource.refCount,
+            )
+            self.__compactCatalogIfNeeded()
+        if resource.refCount > 0:
+            self.__garbage.unmark(resourceFile.path.absolute().as_posix(), )
+        if self.__byPath.get(resource.path, ) is None:
+            self.__searchIndex.add(resource.path, )
+        self.__byPath[resource.path] = resourceFile
+        self.__bySuffix.setdefault(resourceFile.path.suffix, {}, )[resourceFile] = None
+        self.__managedPaths.setdefault(
+            sys.intern(resourceFile.path.parent.absolute().as_posix(), ), set(),
+        ).add(resourceFile.name, )
+        self.__notify(ResourceChange(
+            ResourceChangeKind.ADDED, resource.path, resourceFile.path.suffix, resource.refCount,
         ), )
-        if resourceFile in self.__resources:
-            resource = self.__resources[resourceFile]
-            resource.refCount += 1
-            return resource
+
+    def __unregister(self, resourceFile: ResourceFile, ):
+        resource = self.__resources.pop(resourceFile, )
+        if self.__catalog is not None:
+            self.__catalog.recordRemove(resource.path, )
+            self.__compactCatalogIfNeeded()
+        self.__unclaimed.pop(resource.path, None, )
+        if self.__byPath.pop(resource.path, None, ) is not None:
+            self.__searchIndex.remove(resource.path, )
+        folder = resourceFile.path.parent.absolute().as_posix()
+        names = self.__managedPaths.get(folder, )
+        if names is not None:
+            names.discard(resourceFile.name, )
+            if not names:
+                del self.__managedPaths[folder]
+        bucket = self.__bySuffix.get(resourceFile.path.suffix, )
+        if bucket is not None:
+            bucket.pop(resourceFile, None, )
+            if not bucket:
+                del self.__bySuffix[resourceFile.path.suffix]
+        self.__notify(ResourceChange(
+            ResourceChangeKind.REMOVED, resource.path, resourceFile.path.suffix, resource.refCount,
+        ), )
+
+    def __changeRefCount(self, resource: ReferenceCountedResource, delta: int, ):
+        resource.refCount += delta
+        resourceFile = self.__byPath[resource.path]
+        fullPath = resourceFile.path.absolute().as_posix()
+        if resource.refCount <= 0:
+            self.__garbage.mark(fullPath, resource.path, )
         else:
-            if copyIfNotUnderRoot and not resourceFile.path.is_relative_to(self.__rootPath, ):
-                # Copy file to root path
-                destPath = self.__rootPath / subFolder / resourceFile.path.name
-                if destPath.exists():
-                    destPath = self.__rootPath / self.__pathResolver.resolveNameConflict(destPath.name, )
-                os.makedirs(destPath.parent, exist_ok=True, )
-                with open(resourceFile.path, "rb", ) as src, open(destPath, "wb", ) as dst:
-                    while True:
-                        block = src.read(65536, )
-                        if not block:
-                            break
-                        dst.write(block, )
-                resourceFile = ResourceFile(destPath, )
-
-            resource = ReferenceCountedResource(self.__pathResolver.exportPathFromRelativePath(
+            self.__garbage.unmark(fullPath, )
+        unclaimed = self.__unclaimed.get(resource.path, )
+        if unclaimed is not None and unclaimed > resource.refCount:
+            self.__unclaimed[resource.path] = max(resource.refCount, 0, )
+        if self.__catalog is not None:
+            self.__catalog.recordRefCount(resource.path, resource.refCount, )
+            self.__compactCatalogIfNeeded()
+        self.__notify(ResourceChange(
+            ResourceChangeKind.REF_COUNT, resource.path, resourceFile.path.suffix, resource.refCount,
+        ), )
+
+    def __catalogEntries(self, ):
+        for resourceFile, resource in self.__resources.items():
+            yield resource.path, [
                 resourceFile.path.relative_to(self.__rootPath, ).as_posix(),
-            ), )
-            resource.refCount = 1
-            self.__resources[resourceFile] = resource
-            return resource
+                resourceFile.size, resourceFile.sample,
+                resourceFile.hash_ if resourceFile.isHashed() else None, resource.refCount,
+            ]
+
+    def __compactCatalogIfNeeded(self, ):
+        if self.__catalog is not None and self.__catalog.needsCompaction():
+            self.__catalog.compact(self.__catalogEntries(), )
+
+    def saveCatalog(self, ):
+        """
+        Write a fresh catalog snapshot, e.g. when the project is saved
+        """
+        with self.__lock:
+            if self.__catalog is not None:
+                self.__catalog.compact(self.__catalogEntries(), )
+        self.saveHashIndex()
+
+    def restoreCatalog(self, ) -> int:
+        """
+        Rebuild the resources and their refcounts from the catalog in one
+        read, without touching the asset files. Restored references are
+        claimed by later `addResource` calls for the same managed path, so
+        replaying the editors' values afterwards does not count them twice.
+        Returns the number of restored resources.
+        """
+        if self.__catalog is None:
+            return 0
+        entries = self.__catalog.load()
+        with self.__lock:
+            for exportPath, (relativePath, size, sample, digest, refCount, ) in entries.items():
+                if exportPath in self.__byPath:
+                    continue
+                resourceFile = ResourceFile(
+                    self.__rootPath / relativePath, digest,
+                    size=size, sample=sample, hasher=self.__hasher, strict=self.__strictCompare,
+                )
+                resource = ReferenceCountedResource(exportPath, )
+                resource.refCount = refCount
+                self.__register(resourceFile, resource, journal=False, )
+                self.__unclaimed[resource.path] = refCount
+                if refCount <= 0:
+                    # Unreferenced when the catalog was written, collectable
+                    # once the grace period has passed again
+                    self.__garbage.mark(resourceFile.path.absolute().as_posix(), resource.path, )
+        return len(entries, )
+
+    def releaseUnclaimed(self, ):
+        """
+        Drop restored references that no `addResource` call claimed,
+        once every editor value has been replayed
+        """
+        with self.__lock:
+            unclaimed, self.__unclaimed = self.__unclaimed, {}
+            for exportPath, count in unclaimed.items():
+                resource = self.getResource(exportPath, )
+                if resource is not None and count > 0:
+                    self.__changeRefCount(resource, -count, )
+
+    def getDigest(self, filePath: str, compute: bool = True, ) -> Optional[str]:
+        """
+        Full content digest of a managed resource, re-hashed only if the file
+        changed on disk since it was last hashed. None if it is not managed
+        or cannot be read, or if it would need hashing and `compute` is False.
+        """
+        with self.__lock:
+            resourceFile = self.__byPath.get(filePath, )
+        if resourceFile is None:
+            return None
+        try:
+            if compute:
+                digest = self.__hashFile(resourceFile.path, )
+            else:
+                digest = self.__hashIndex.lookup(resourceFile.path, None, "full", )
+        except OSError:
+            return None
+        return digest.hex() if digest is not None else None
+
+    def getResource(self, filePath: str, ) -> Optional[ReferenceCountedResource]:
+        with self.__lock:
+            resourceFile = self.__byPath.get(filePath, )
+            return self.__resources[resourceFile] if resourceFile is not None else None
+
+    def __resolveDestPath(self, name: str, subFolder: str, reserved: Set[Path], ) -> Path:
+        destPath = self.__rootPath / subFolder / name
+        for _ in range(self.MAX_NAME_ATTEMPTS, ):
+            if not (destPath in reserved or destPath.exists() or destPath.is_symlink()):
+                return destPath
+            destPath = destPath.parent / self.__pathResolver.resolveNameConflict(destPath.name, )
+        raise FileExistsError(
+            f"No free name for {name} after {self.MAX_NAME_ATTEMPTS} attempts of the path resolver",
+        )
+
+    def __importFile(self, resourceFile: ResourceFile, destPath: Path, strategy: ImportStrategy, ) -> ResourceFile:
+        os.makedirs(destPath.parent, exist_ok=True, )
+        digest = transferFile(
+            resourceFile.path, destPath, strategy,
+            None if resourceFile.isHashed() else ResourceFile.newHasher(),
+        )
+        if digest is not None:
+            digest = bytes.fromhex(digest, )
+            self.__hashIndex.store(resourceFile.path, digest, None, "full", )
+        # The destination has the same content, so reuse the digests instead of reading it back
+        destFile = resourceFile.withPath(destPath, digest, )
+        self.__hashIndex.store(destPath, destFile.sampleDigest, None, "sample", )
+        if destFile.isHashed():
+            self.__hashIndex.store(destPath, destFile.digest, None, "full", )
+        return destFile
+
+    def clearResources(self, deleteFiles: bool = False, ) -> "Optional[Future[GarbageCollectionReport]]":
+        """
+        Forget every resource. With `deleteFiles`, their files are deleted in
+        batches on the worker pool and the returned future gives the report.
+        """
+        with self.__lock:
+            candidates = [
+                (resourceFile.path.absolute().as_posix(), resource.path, )
+                for resourceFile, resource in self.__resources.items()
+            ] if deleteFiles else []
+            if self.__catalog is not None:
+                self.__catalog.recordClear()
+            self.__unclaimed.clear()
+            # Files kept by the caller must not be collected later on
+            self.__garbage.clear()
+            self.__resources.clear()
+            self.__byPath.clear()
+            self.__searchIndex.clear()
+            self.__bySuffix.clear()
+            self.__managedPaths.clear()
+            self.__notify(ResourceChange(ResourceChangeKind.CLEARED, ), )
+        if deleteFiles:
+            return self.__getExecutor().submit(self.__deleteGarbage, candidates, )
+        return None
+
+    def collectGarbage(
+        self, gracePeriod: Optional[float] = None,
+        batchSize: int = 256,
+        isCancelled: Optional[Callable[[], bool]] = None,
+    ) -> "Future[GarbageCollectionReport]":
+        """
+        Delete the files that have had no reference for longer than the grace
+        period (the manager's `gcGracePeriod` by default), in batches on the
+        worker pool. Files referenced again in the meantime, or reported by
+        `isImportantResource`, are kept.
+        """
+        due = self.__garbage.take(self.__gcGracePeriod if gracePeriod is None else gracePeriod, )
+        return self.__getExecutor().submit(self.__deleteGarbage, due, batchSize, isCancelled, )
+
+    def __deleteGarbage(
+        self, candidates: List[Tuple[str, str]],
+        batchSize: int = 256,
+        isCancelled: Optional[Callable[[], bool]] = None,
+    ) -> GarbageCollectionReport:
+        report = GarbageCollectionReport()
+        for start in range(0, len(candidates, ), batchSize, ):
+            if isCancelled is not None and isCancelled():
+                report.cancelled = True
+                for fullPath, exportPath in candidates[start:]:
+                    self.__garbage.mark(fullPath, exportPath, )
+                break
+            # The lock is only held per batch, so other calls can run in between
+            with self.__lock:
+                for fullPath, exportPath in candidates[start:start + batchSize]:
+                    resourceFile = self.__byPath.get(exportPath, )
+                    managed = resourceFile is not None and resourceFile.path.absolute().as_posix() == fullPath
+                    if managed and self.__resources[resourceFile].refCount > 0:
+                        report.skippedInUse.append(fullPath, )
+                        continue
+                    if not managed and self.__isManagedPath(fullPath, ):
+                        report.skippedInUse.append(fullPath, )
+                        continue
+                    # Checked before unregistering, so an important file stays managed
+                    if self.__pathResolver.isImportantResource(fullPath, ):
+                        report.skippedImportant.append(fullPath, )
+                        continue
+                    if managed:
+                        self.__unregister(resourceFile, )
+                    try:
+                        size = os.lstat(fullPath, ).st_size
+                        os.remove(fullPath, )
+                    except FileNotFoundError:
+                        continue
+                    except OSError as e:
+                        report.failed.append((fullPath, str(e), ), )
+                        continue
+                    report.deleted.append(fullPath, )
+                    report.freedBytes += size
+                    self.__hashIndex.discard(Path(fullPath, ), )
+        self.saveHashIndex()
+        return report
+
+    def __isManagedPath(self, fullPath: str, ) -> bool:
+        folder, _, name = fullPath.rpartition("/", )
+        return name in self.__managedPaths.get(folder, (), )
+
+    def __getManaged(self, path: Path, ) -> Optional[ReferenceCountedResource]:
+        if not path.is_relative_to(self.__rootPath, ):
+            return None
+        return self.getResource(self.__pathResolver.exportPathFromRelativePath(
+            path.relative_to(self.__rootPath, ).as_posix(),
+        ), )
+
+    @staticmethod
+    def __runParallel(task: Callable[[int], None], items: List[int], maxWorkers: Optional[int], ):
+        if maxWorkers == 0 or len(items, ) <= 1:
+            for i in items:
+                task(i, )
+        else:
+            with ThreadPoolExecutor(maxWorkers, ) as pool:
+                # Consume the results so that worker exceptions are raised here
+                for _ in pool.map(task, items, ):
+                    pass
+
+    def addResource(
+        self, filePath: str, copyIfNotUnderRoot: bool = True, /,
+        subFolder: str = "",
+        strategy: Optional[ImportStrategy] = None,
+    ) -> ReferenceCountedResource:
+        resource = self.addResources(
+            [filePath], copyIfNotUnderRoot,
+            subFolder=subFolder, strategy=strategy, maxWorkers=0,
+        )[0]
+        assert resource is not None
+        return resource
+
+    def addResourceAsync(
+        self, filePath: str, copyIfNotUnderRoot: bool = True, /,
+        subFolder: str = "",
+        strategy: Optional[ImportStrategy] = None,
+    ) -> "Future[ReferenceCountedResource]":
+        """
+        Same as `addResource`, but hashing and copying run on the manager's
+        worker pool. Concurrent adds of the same content end up as one entry.
+        """
+        return self.__getExecutor().submit(
+            self.addResource, filePath, copyIfNotUnderRoot, subFolder=subFolder, strategy=strategy,
+        )
+
+    def __getExecutor(self, ) -> ThreadPoolExecutor:
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(self.__asyncWorkers, thread_name_prefix="ResourceManager", )
+            return self.__executor
+
+    def shutdown(self, wait: bool = True, ):
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+        if executor is not None:
+            executor.shutdown(wait, )
+        self.saveHashIndex()
+        if self.__catalog is not None:
+            self.__catalog.close()
+
+    def addResources(
+        self, filePaths: Iterable[str], copyIfNotUnderRoot: bool = True, /,
+        subFolder: str = "",
+        strategy: Optional[ImportStrategy] = None,
+        maxWorkers: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        isCancelled: Optional[Callable[[], bool]] = None,
+    ) -> List[Optional[ReferenceCountedResource]]:
+        """
+        Add many files at once. Hashing and copying run on a thread pool
+        (`maxWorkers=0` keeps everything on the calling thread), files with
+        the same content become one entry and name conflicts are resolved in
+        input order. Files copied in go through the import pipeline first, if
+        one is set; each file it rewrites counts as one more step of
+        `progress(done, total)`, which may be called from worker threads.
+        Once `isCancelled()` returns True the remaining files are skipped and
+        their slots in the returned list are None.
+        """
+        strategy = strategy if strategy is not None else self.__importStrategy
+        filePaths = list(filePaths, )
+        paths = [
+            Path(self.__rootPath / self.__pathResolver.importPathToRelativePath(p, ), )
+            for p in filePaths
+        ]
+        results: List[Optional[ReferenceCountedResource]] = [None] * len(paths, )
+        files: List[Optional[ResourceFile]] = [None] * len(paths, )
+        pipeline = self.__importPipeline
+        progressLock = threading.Lock()
+        done = [0]
+
+        def advance():
+            if progress is not None:
+                with progressLock:
+                    done[0] += 1
+                    progress(done[0], total, )
+
+        def cancelled() -> bool:
+            return isCancelled is not None and isCancelled()
+
+        def needsCopy(path: Path, ) -> bool:
+            return copyIfNotUnderRoot and not path.is_relative_to(self.__rootPath, )
+
+        total = len(paths, ) + (
+            pipeline.pendingCount([p for p in paths if needsCopy(p, )], subFolder, ) if pipeline is not None else 0
+        )
+
+        # Paths that are already managed only need one more reference
+        pending: List[int] = []
+        with self.__lock:
+            for i, path in enumerate(paths, ):
+                managed = self.__getManaged(path, )
+                if managed is not None:
+                    unclaimed = self.__unclaimed.get(managed.path, 0, )
+                    if unclaimed > 0:
+                        # A reference restored from the catalog is being replayed
+                        self.__unclaimed[managed.path] = unclaimed - 1
+                    else:
+                        self.__changeRefCount(managed, 1, )
+                    results[i] = managed
+                    advance()
+                else:
+                    pending.append(i, )
+
+        # Files to copy in may be rewritten first, then imported under another name
+        sources: Dict[int, Path] = {}
+        names: Dict[int, str] = {}
+        external = [i for i in pending if needsCopy(paths[i], )]
+        if pipeline is not None and external:
+            outputs = pipeline.run(
+                [paths[i] for i in external], subFolder, self.__rootPath / self.METADATA_DIR, self.__hashFileHex,
+                progress=advance, isCancelled=cancelled,
+            )
+            for i, output in zip(external, outputs, ):
+                if output is not None:
+                    sources[i], names[i] = output
+
+        # Fingerprint the others in parallel
+        def fingerprint(i: int, ):
+            if cancelled():
+                return
+            files[i] = self.__makeResourceFile(sources.get(i, paths[i], ), )
+            if not needsCopy(paths[i], ):
+                advance()
+        self.__runParallel(fingerprint, pending, maxWorkers, )
+
+        # Plan in input order: reuse managed or earlier entries, reserve destinations.
+        # Content that another call is importing right now is waited for instead.
+        # Files that agree on size and sample with another are only read
+        # outside the lock, after which planning resumes where it stopped
+        duplicateOf: Dict[int, int] = {}
+        waitFor: Dict[int, threading.Event] = {}
+        destPaths: Dict[int, Path] = {}
+        firstOfContent: Dict[ResourceFile, int] = {}
+        managedAs: Dict[int, ReferenceCountedResource] = {}
+        known: Dict[Tuple[int, int], bool] = {}
+        # keeps the compared files, and so their ids, alive
+        compared: List[ResourceFile] = []
+
+        def plan(i: int, ):
+            resourceFile = files[i]
+            if resourceFile is None:
+                return
+            resource = self.__resources.get(resourceFile, )
+            if resource is not None:
+                # Content already managed, nothing to copy
+                managedAs[i] = resource
+                if needsCopy(paths[i], ):
+                    advance()
+                return
+            if resourceFile in firstOfContent:
+                duplicateOf[i] = firstOfContent[resourceFile]
+                if needsCopy(paths[i], ):
+                    advance()
+                return
+            if resourceFile in self.__inFlight:
+                waitFor[i] = self.__inFlight[resourceFile]
+                return
+            firstOfContent[resourceFile] = i
+            self.__inFlight[resourceFile] = threading.Event()
+            if needsCopy(paths[i], ):
+                destPaths[i] = self.__resolveDestPath(
+                    names.get(i, resourceFile.path.name, ), subFolder, self.__reservedPaths,
+                )
+                self.__reservedPaths.add(destPaths[i], )
+
+        try:
+            position = 0
+            while position < len(pending, ):
+                deferred: Optional[_ComparisonDeferred] = None
+                with self.__lock, _deferComparisons(known, ):
+                    try:
+                        while position < len(pending, ):
+                            plan(pending[position], )
+                            position += 1
+                    except _ComparisonDeferred as e:
+                        deferred = e
+                if deferred is not None:
+                    first, second = deferred.first, deferred.second
+                    known[(id(first, ), id(second, ), )] = known[(id(second, ), id(first, ), )] = first == second
+                    compared += (first, second, )
+
+            # Copy (or link) new files to the root path in parallel
+            def importFile(i: int, ):
+                if cancelled():
+                    files[i] = None
+                    return
+                files[i] = self.__importFile(files[i], destPaths[i], strategy, )
+                advance()
+            self.__runParallel(importFile, list(destPaths.keys(), ), maxWorkers, )
+
+            # Commit in input order
+            with self.__lock:
+                for i in pending:
+                    if i in waitFor:
+                        continue
+                    if i in duplicateOf:
+                        resource = results[duplicateOf[i]]
+                        if resource is not None:
+                            self.__changeRefCount(resource, 1, )
+                        results[i] = resource
+                        continue
+                    resourceFile = files[i]
+                    if resourceFile is None:
+                        continue
+                    resource = managedAs.get(i, )
+                    if resource is None or self.__byPath.get(resource.path, ) is None:
+                        resource = self.__resources.get(resourceFile, )
+                    if resource is None:
+                        resource = ReferenceCountedResource(self.__pathResolver.exportPathFromRelativePath(
+                            resourceFile.path.relative_to(self.__rootPath, ).as_posix(),
+                        ), )
+                        resource.refCount = 1
+                        self.__register(resourceFile, resource, )
+                    else:
+                        self.__changeRefCount(resource, 1, )
+                    results[i] = resource
+        finally:
+            with self.__lock:
+                for resourceFile in firstOfContent.keys():
+                    self.__inFlight.pop(resourceFile, ).set()
+                self.__reservedPaths.difference_update(destPaths.values(), )
+
+        # Our own imports are committed, so waiting for others cannot deadlock
+        for i, event in waitFor.items():
+            event.wait()
+            with self.__lock:
+                resource = self.__resources.get(files[i], )
+                if resource is not None:
+                    self.__changeRefCount(resource, 1, )
+                    results[i] = resource
+            if resource is None:
+                # The other import failed or was cancelled, do it ourselves
+                results[i] = self.addResources(
+                    [filePaths[i]], copyIfNotUnderRoot,
+                    subFolder=subFolder, strategy=strategy, maxWorkers=0, isCancelled=isCancelled,
+                )[0]
+            if needsCopy(paths[i], ):
+                advance()
+        if len(paths, ) > 1:
+            self.saveHashIndex()
+        else:
+            self.scheduleHashIndexSave()
+        return results
 
     def removeResource(self, filePath: str, deleteRefIfZero: bool = False, ):
-        ref = ReferenceCountedResource(filePath, )
-        # Find the corresponding ResourceFile & Resource
-        target = next(((rf, r) for rf, r in self.__resources.items() if r == ref), None)
-        if target is not None:
-            resourceFile, resource = target
-            resource.refCount -= 1
-            if resource.refCount <= 0 and deleteRefIfZero:
-                del self.__resources[resourceFile]
+        with self.__lock:
+            resourceFile = self.__byPath.get(filePath, )
+            if resourceFile is not None:
+                resource = self.__resources[resourceFile]
+                self.__changeRefCount(resource, -1, )
+                if resource.refCount <= 0 and deleteRefIfZero:
+                    self.__unregister(resourceFile, )
+
+    def watchRoot(self, enabled: bool = True, ):
+        """
+        Keep the unmanaged file listing up to date with a file system watcher
+        (needs a running Qt event loop) instead of checking directory mtimes
+        """
+        self.__scanner.watch(enabled, )
 
     def listNotManagedFilesUnderRoot(self, ):
-        fileList = list[str]()
-        for root, _, files in os.walk(self.__rootPath, ):
-            for file in files:
-                fullPath = Path(root, file, ).absolute().as_posix()
-                if not self.__pathResolver.isImportantResource(fullPath, ):
-                    fileList.append(fullPath)
-
-        managedPaths = set(resourceFile.path.absolute().as_posix() for resourceFile in self.__resources.keys())
-        notManagedFiles = set(fileList) - managedPaths
-        return [p for p in notManagedFiles]
-
-    def listResources(self, extension: Optional[Iterable[str]] = None, ):
-        if extension is None:
-            return list(self.__resources.values(), )
-        else:
-            return [r for rf, r in list(self.__resources.items(), ) if rf.path.suffix in extension]
+        files = self.__scanner.scan()
+        with self.__lock:
+            return [p for p in files if not self.__isManagedPath(p, )]
+
+    def listResources(self, extension: Optional[Iterable[str]] = None, ) -> List[ReferenceCountedResource]:
+        with self.__lock:
+            if extension is None:
+                return list(self.__resources.values(), )
+            else:
+                return [
+                    self.__resources[rf]
+                    for suffix in set(extension, )
+                    for rf in self.__bySuffix.get(suffix, {}, )
+                ]
+
+    def searchResources(
+        self, query: str, extension: Optional[Iterable[str]] = None, /,
+        prefix: bool = False,
+    ) -> List[ReferenceCountedResource]:
+        """
+        Resources whose exported path contains `query`, or starts with it if
+        `prefix`, ignoring case. Sorted by path, case-insensitively.
+        """
+        paths = self.searchPaths(query, extension, prefix=prefix, )
+        with self.__lock:
+            found = []
+            for path in paths:
+                resourceFile = self.__byPath.get(path, )
+                if resourceFile is not None:
+                    found.append(self.__resources[resourceFile], )
+            return found
+
+    def searchPaths(
+        self, query: str, extension: Optional[Iterable[str]] = None, /,
+        prefix: bool = False,
+    ) -> List[str]:
+        """
+        Exported paths of searchResources, without looking their resources
+        up. Extensions are matched against the end of the exported path.
+        """
+        return self.__searchIndex.search(query, prefix, extension, )
     
\ No newline at end of file
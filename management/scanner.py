@@ -0,0 +1,133 @@
+from typing import (Dict, List, Set, Optional, Callable, Iterable, Any, )
+from pathlib import Path
+import os
+
+
+class _DirectorySnapshot:
+    __slots__ = ("mtime", "files", "ignored", "subDirs", )
+
+    def __init__(self, mtime: int, files: List[str], ignored: Set[str], subDirs: List[str], ):
+        self.mtime = mtime
+        # Absolute posix paths of the files kept by the filter
+        self.files = files
+        # ... and of the files it rejected
+        self.ignored = ignored
+        self.subDirs = subDirs
+
+
+class DirectoryScanner:
+    """
+    Lists the files under a root with `os.scandir`, remembering each
+    directory's listing together with its mtime_ns. A directory whose mtime
+    did not change is not listed again, and the filter is only called for
+    new files.
+    With `watch()`, a QFileSystemWatcher marks changed directories instead,
+    so a query with no change since the last one returns the cached result.
+    """
+
+    def __init__(
+        self, rootPath: Path,
+        isIgnored: Callable[[str], bool],
+        excludeDirs: Iterable[str] = (),
+    ):
+        self.__rootPath = rootPath.absolute().as_posix()
+        self.__isIgnored = isIgnored
+        self.__excludeDirs = set(excludeDirs, )
+        self.__snapshots: Dict[str, _DirectorySnapshot] = {}
+        self.__watcher: Optional[Any] = None
+        self.__dirtyDirs: Set[str] = set()
+        self.__result: Optional[Set[str]] = None
+
+    def invalidate(self, ):
+        self.__snapshots.clear()
+        self.__result = None
+
+    def isWatching(self, ) -> bool:
+        return self.__watcher is not None
+
+    def watch(self, enabled: bool = True, ):
+        if enabled == self.isWatching():
+            return
+        if enabled:
+            from PySide6.QtCore import (QFileSystemWatcher, )
+            self.__watcher = QFileSystemWatcher()
+            self.__watcher.directoryChanged.connect(self.__onDirectoryChanged, )
+            self.__dirtyDirs.clear()
+            # Snapshots taken before watching cannot be trusted without a stat
+            self.__result = None
+            if self.__snapshots:
+                self.__watcher.addPaths(list(self.__snapshots.keys(), ), )
+        else:
+            self.__watcher.directoryChanged.disconnect(self.__onDirectoryChanged, )
+            self.__watcher.deleteLater()
+            self.__watcher = None
+
+    def __onDirectoryChanged(self, path: str, ):
+        self.__dirtyDirs.add(Path(path, ).as_posix(), )
+        self.__result = None
+
+    def __list(self, dirPath: str, mtime: int, ) -> _DirectorySnapshot:
+        old = self.__snapshots.get(dirPath, )
+        kept = set(old.files, ) if old is not None else set()
+        rejected = old.ignored if old is not None else set()
+        files: List[str] = []
+        ignored: Set[str] = set()
+        subDirs: List[str] = []
+        with os.scandir(dirPath, ) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False, ):
+                    if dirPath == self.__rootPath and entry.name in self.__excludeDirs:
+                        continue
+                    subDirs.append(dirPath + "/" + entry.name, )
+                else:
+                    fullPath = dirPath + "/" + entry.name
+                    if fullPath in kept:
+                        files.append(fullPath, )
+                    elif fullPath in rejected or self.__isIgnored(fullPath, ):
+                        ignored.add(fullPath, )
+                    else:
+                        files.append(fullPath, )
+        if self.__watcher is not None:
+            newDirs = [d for d in subDirs if d not in self.__snapshots]
+            if old is None:
+                newDirs.append(dirPath, )
+            if newDirs:
+                self.__watcher.addPaths(newDirs, )
+        return _DirectorySnapshot(mtime, files, ignored, subDirs, )
+
+    def scan(self, ) -> Set[str]:
+        """
+        Absolute posix paths of all files under the root that are not ignored.
+        The returned set must not be modified.
+        """
+        if self.__result is not None and self.__watcher is not None and not self.__dirtyDirs:
+            return self.__result
+
+        result: Set[str] = set()
+        seen: Set[str] = set()
+        stack = [self.__rootPath]
+        while stack:
+            dirPath = stack.pop()
+            seen.add(dirPath, )
+            snapshot = self.__snapshots.get(dirPath, )
+            # With a watcher, a clean directory is trusted without a stat
+            if snapshot is None or self.__watcher is None or dirPath in self.__dirtyDirs:
+                try:
+                    mtime = os.stat(dirPath, ).st_mtime_ns
+                    if snapshot is None or snapshot.mtime != mtime or dirPath in self.__dirtyDirs:
+                        snapshot = self.__list(dirPath, mtime, )
+                        self.__snapshots[dirPath] = snapshot
+                except OSError:
+                    seen.discard(dirPath, )
+                    continue
+            result.update(snapshot.files, )
+            stack.extend(snapshot.subDirs, )
+
+        # Forget directories that disappeared
+        for dirPath in [d for d in self.__snapshots if d not in seen]:
+            del self.__snapshots[dirPath]
+            if self.__watcher is not None:
+                self.__watcher.removePath(dirPath, )
+        self.__dirtyDirs.clear()
+        self.__result = result
+        return result
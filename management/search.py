@@ -0,0 +1,172 @@
+from typing import (Dict, Iterable, List, Optional, Tuple, )
+from bisect import (bisect_left, bisect_right, )
+from itertools import (accumulate, compress, )
+import threading
+
+
+class PathSearchIndex:
+    """
+    Case-insensitive prefix and substring search over resource paths.
+    Paths are kept in a sorted array updated as they are added or removed.
+    Substring queries seek through one joined string of every path, rebuilt
+    lazily after changes, and a query containing the previous one only
+    rechecks the previous matches, as when typing. Results come in
+    case-insensitive path order, and can be narrowed to some extensions.
+    Safe to use from several threads.
+    """
+    SEPARATOR = "\0"
+    # Additions merged one by one below this count, by one sort above it
+    MERGE_THRESHOLD = 64
+    # Matches found by seeking before testing every remaining path instead
+    DENSE_MATCHES = 256
+
+    def __init__(self, ):
+        # casefolded paths, sorted, and the original paths alongside
+        self.__keys: List[str] = []
+        self.__paths: List[str] = []
+        # added paths not merged into the sorted arrays yet
+        self.__pending: List[str] = []
+        # the keys joined by SEPARATOR, and where each key starts in it
+        self.__blob: Optional[str] = None
+        self.__starts: List[int] = []
+        # last substring query and the rows it matched
+        self.__last: Optional[Tuple[str, List[int]]] = None
+        # extension -> how many paths have it, to skip filtering by extensions every path has
+        self.__suffixCounts: Dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    def __len__(self, ):
+        return len(self.__keys, ) + len(self.__pending, )
+
+    @staticmethod
+    def __keyOf(path: str, ) -> str:
+        # paths already in lower case are their own key, not a copy
+        key = path.casefold()
+        return path if key == path else key
+
+    @staticmethod
+    def __suffixOf(path: str, ) -> str:
+        # as Path.suffix
+        name = path[path.rfind("/", ) + 1:]
+        dot = name.rfind(".", )
+        return name[dot:] if 0 < dot < len(name, ) - 1 else ""
+
+    def __countSuffix(self, path: str, delta: int, ):
+        suffix = self.__suffixOf(path, )
+        count = self.__suffixCounts.get(suffix, 0, ) + delta
+        if count > 0:
+            self.__suffixCounts[suffix] = count
+        else:
+            self.__suffixCounts.pop(suffix, None, )
+
+    def add(self, path: str, ):
+        with self.__lock:
+            self.__pending.append(path, )
+            self.__countSuffix(path, 1, )
+
+    def remove(self, path: str, ):
+        with self.__lock:
+            if path in self.__pending:
+                self.__pending.remove(path, )
+                self.__countSuffix(path, -1, )
+                return
+            key = path.casefold()
+            row = bisect_left(self.__keys, key, )
+            while row < len(self.__keys, ) and self.__keys[row] == key:
+                if self.__paths[row] == path:
+                    del self.__keys[row]
+                    del self.__paths[row]
+                    self.__countSuffix(path, -1, )
+                    self.__changed()
+                    return
+                row += 1
+
+    def clear(self, ):
+        with self.__lock:
+            self.__keys.clear()
+            self.__paths.clear()
+            self.__pending.clear()
+            self.__suffixCounts.clear()
+            self.__changed()
+
+    def __changed(self, ):
+        self.__blob = None
+        self.__last = None
+
+    def __merge(self, ):
+        if not self.__pending:
+            return
+        if len(self.__pending, ) < self.MERGE_THRESHOLD:
+            for path in self.__pending:
+                key = self.__keyOf(path, )
+                row = bisect_right(self.__keys, key, )
+                self.__keys.insert(row, key, )
+                self.__paths.insert(row, path, )
+        else:
+            # Both runs are sorted or nearly, which timsort merges in linear time
+            entries = sorted(
+                [*zip(self.__keys, self.__paths, ), *((self.__keyOf(p, ), p, ) for p in self.__pending)],
+                key=lambda e: e[0],
+            )
+            self.__keys = [k for k, _ in entries]
+            self.__paths = [p for _, p in entries]
+        self.__pending.clear()
+        self.__changed()
+
+    def search(self, query: str, prefix: bool = False, suffixes: Optional[Iterable[str]] = None, ) -> List[str]:
+        """
+        Paths starting with `query` if `prefix`, else containing it, and
+        ending with one of `suffixes` if given
+        """
+        key = query.casefold()
+        with self.__lock:
+            self.__merge()
+            if not key:
+                paths = list(self.__paths, )
+            elif prefix:
+                first = bisect_left(self.__keys, key, )
+                last = bisect_left(self.__keys, key + "\U0010ffff", first, )
+                paths = self.__paths[first:last]
+            elif self.SEPARATOR in key:
+                return []
+            else:
+                rows = self.__match(key, )
+                if len(rows, ) == len(self.__paths, ):
+                    paths = list(self.__paths, )
+                else:
+                    paths = [self.__paths[row] for row in rows]
+            if suffixes is None:
+                return paths
+            suffixes = tuple(set(suffixes, ), )
+            if sum(self.__suffixCounts.get(s, 0, ) for s in suffixes) == len(self.__paths, ):
+                # every path has one of them
+                return paths
+        return [p for p in paths if p.endswith(suffixes, )] if suffixes else []
+
+    def __match(self, key: str, ) -> List[int]:
+        keys = self.__keys
+        if self.__last is not None and self.__last[0] in key:
+            # Refining the last query, only its matches can match
+            previous = self.__last[1]
+            rows = list(compress(previous, [key in keys[row] for row in previous], ), )
+        else:
+            if self.__blob is None:
+                self.__blob = self.SEPARATOR.join(keys, )
+                self.__starts = list(accumulate((len(k, ) + 1 for k in keys[:-1]), initial=0, )) if keys else []
+            blob, starts = self.__blob, self.__starts
+            rows = []
+            position = blob.find(key, )
+            while position >= 0:
+                row = bisect_right(starts, position, ) - 1
+                rows.append(row, )
+                if len(rows, ) == self.DENSE_MATCHES:
+                    # A common query, testing each remaining path beats seeking
+                    rest = range(row + 1, len(keys, ), )
+                    rows.extend(compress(rest, [key in k for k in keys[row + 1:]], ), )
+                    break
+                if row + 1 >= len(starts, ):
+                    break
+                # One match per path is enough, go on from the next one
+                position = blob.find(key, starts[row + 1], )
+        self.__last = (key, rows, )
+        return rows
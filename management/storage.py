@@ -0,0 +1,65 @@
+from typing import (Optional, Dict, Any, Callable, )
+from pathlib import Path
+import json
+import os
+import threading
+
+
+def readJson(path: Path, ) -> Optional[Dict[str, Any]]:
+    """
+    The object stored in the JSON file at `path`, or None if it is missing
+    or unreadable
+    """
+    try:
+        with open(path, "r", encoding="utf-8", ) as f:
+            data = json.load(f, )
+    except (OSError, ValueError, ):
+        return None
+    return data if isinstance(data, dict, ) else None
+
+
+def writeJson(path: Path, data: Dict[str, Any], durable: bool = False, ):
+    """
+    Replace the JSON file at `path` with `data` in one step, so a reader or
+    a crash never sees it half written. With `durable`, the new content is
+    on disk before it replaces the old.
+    """
+    os.makedirs(path.parent, exist_ok=True, )
+    tmpPath = path.with_name(path.name + ".tmp", )
+    with open(tmpPath, "w", encoding="utf-8", ) as f:
+        json.dump(data, f, separators=(",", ":", ), )
+        if durable:
+            f.flush()
+            os.fsync(f.fileno(), )
+    os.replace(tmpPath, path, )
+
+
+class DeferredSave:
+    """
+    Runs `save` on a timer thread `delay` seconds after the first of a run
+    of `schedule()` calls, so the run writes once and the caller never
+    waits on the disk.
+    """
+
+    def __init__(self, save: Callable[[], None], delay: float, ):
+        self.__save = save
+        self.__delay = delay
+        self.__timer: Optional[threading.Timer] = None
+        self.__lock = threading.Lock()
+
+    def schedule(self, ):
+        with self.__lock:
+            if self.__timer is None:
+                self.__timer = threading.Timer(self.__delay, self.flush, )
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def flush(self, ):
+        """
+        Save now, instead of when the pending timer fires
+        """
+        with self.__lock:
+            timer, self.__timer = self.__timer, None
+        if timer is not None:
+            timer.cancel()
+        self.__save()
@@ -0,0 +1,191 @@
+from typing import (Optional, Dict, Tuple, Iterable, List, )
+from collections import (OrderedDict, )
+from concurrent.futures import (ThreadPoolExecutor, Future, )
+from pathlib import Path
+import os
+import threading
+
+from PySide6.QtCore import (Qt, QObject, Signal, )
+from PySide6.QtGui import (QImage, QImageReader, )
+
+from .resource import (ResourceManager, )
+
+
+class ThumbnailCache:
+    """
+    Two-tier cache of pre-scaled thumbnails keyed by content digest and size.
+    The first tier is PNG files in the manager's metadata folder, the second
+    an in-memory LRU bounded by `memoryBudget` bytes. A thumbnail only goes
+    stale when the content of its file changes, so moving or re-adding a
+    resource keeps it. Safe to use from several threads.
+    """
+    DIR_NAME = "thumbnails"
+
+    @classmethod
+    def forManager(cls, manager: ResourceManager, ) -> "ThumbnailCache":
+        """
+        The cache shared by every picker of `manager`
+        """
+        return manager.getShared(cls, cls, )
+
+    def __init__(self, manager: ResourceManager, memoryBudget: int = 64 << 20, ):
+        self.__manager = manager
+        self.__directory = Path(manager.getRootPath(), ) / ResourceManager.METADATA_DIR / self.DIR_NAME
+        self.__memoryBudget = memoryBudget
+        self.__memoryUsed = 0
+        self.__memory: "OrderedDict[str, QImage]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __diskPath(self, key: str, ) -> Path:
+        return self.__directory / key[:2] / (key + ".png")
+
+    def __remember(self, key: str, image: QImage, ):
+        with self.__lock:
+            old = self.__memory.pop(key, None, )
+            if old is not None:
+                self.__memoryUsed -= old.sizeInBytes()
+            self.__memory[key] = image
+            self.__memoryUsed += image.sizeInBytes()
+            while self.__memoryUsed > self.__memoryBudget and len(self.__memory, ) > 1:
+                _, evicted = self.__memory.popitem(last=False, )
+                self.__memoryUsed -= evicted.sizeInBytes()
+
+    def cached(self, exportPath: str, size: int, ) -> Optional[QImage]:
+        """
+        The thumbnail if it is already in memory. Only stats the file, so it
+        is cheap enough for the GUI thread.
+        """
+        digest = self.__manager.getDigest(exportPath, False, )
+        if digest is None:
+            return None
+        key = f"{digest}-{size}"
+        with self.__lock:
+            image = self.__memory.get(key, )
+            if image is not None:
+                self.__memory.move_to_end(key, )
+            return image
+
+    def get(self, exportPath: str, size: int, ) -> Optional[QImage]:
+        """
+        Thumbnail of a managed image fitting in `size` x `size`, or None if
+        the file cannot be read as an image
+        """
+        digest = self.__manager.getDigest(exportPath, )
+        if digest is None:
+            return None
+        key = f"{digest}-{size}"
+        with self.__lock:
+            image = self.__memory.get(key, )
+            if image is not None:
+                self.__memory.move_to_end(key, )
+                return image
+
+        diskPath = self.__diskPath(key, )
+        image = QImage(diskPath.as_posix(), ) if diskPath.exists() else QImage()
+        if image.isNull():
+            image = self._decode(self.__manager.getFullPath(exportPath, ), size, )
+            if image.isNull():
+                return None
+            os.makedirs(diskPath.parent, exist_ok=True, )
+            tmpPath = diskPath.with_name(diskPath.name + ".tmp.png", )
+            if image.save(tmpPath.as_posix(), "PNG", ):
+                os.replace(tmpPath, diskPath, )
+        self.__remember(key, image, )
+        return image
+
+    @staticmethod
+    def _decode(fullPath: str, size: int, ) -> QImage:
+        # Let the reader decode at reduced size (JPEG can skip most of the
+        # work) instead of decoding the full image and scaling it afterwards
+        reader = QImageReader(fullPath, )
+        reader.setAutoTransform(True, )
+        original = reader.size()
+        if original.isValid() and (original.width() > size or original.height() > size):
+            reader.setScaledSize(original.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, ), )
+        image = reader.read()
+        if image.isNull() or (image.width() <= size and image.height() <= size):
+            return image
+        return image.scaled(
+            size, size, Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+
+
+class ThumbnailLoader(QObject, ):
+    """
+    Loads thumbnails from a ThumbnailCache on a worker pool and reports them
+    through `loaded(exportPath, size, image)` in the loader's thread.
+    Requests that are no longer needed can be cancelled; a cancelled request
+    never emits. A request made several times is only cancelled once every
+    `cancel` matching a `request` came in.
+    """
+    loaded = Signal(str, int, QImage, )
+
+    @classmethod
+    def forManager(cls, manager: ResourceManager, ) -> "ThumbnailLoader":
+        """
+        A single-worker loader of the manager's ThumbnailCache, shared by
+        every picker of `manager`. Each picker picks its own results out of
+        `loaded` by path and size.
+        """
+        return manager.getShared(cls, lambda m: cls(ThumbnailCache.forManager(m, ), maxWorkers=1, ), )
+
+    def __init__(self, cache: ThumbnailCache, parent: Optional[QObject] = None, /, maxWorkers: int = 4, ):
+        super().__init__(parent, )
+        self.__cache = cache
+        self.__executor = ThreadPoolExecutor(maxWorkers, thread_name_prefix="ThumbnailLoader", )
+        # key -> [future, number of requests not cancelled yet]
+        self.__pending: Dict[Tuple[str, int], List] = {}
+        self.__lock = threading.Lock()
+        executor = self.__executor
+        self.destroyed.connect(lambda: executor.shutdown(False, cancel_futures=True, ), )
+
+    def request(self, exportPath: str, size: int, ) -> Optional[QImage]:
+        """
+        The thumbnail right away if it is in memory, else None and `loaded`
+        is emitted later
+        """
+        image = self.__cache.cached(exportPath, size, )
+        if image is not None:
+            return image
+        key = (exportPath, size, )
+        with self.__lock:
+            pending = self.__pending.get(key, )
+            if pending is None:
+                self.__pending[key] = [self.__executor.submit(self.__load, exportPath, size, ), 1, ]
+            else:
+                pending[1] += 1
+        return None
+
+    def __load(self, exportPath: str, size: int, ):
+        image = self.__cache.get(exportPath, size, )
+        with self.__lock:
+            wanted = self.__pending.pop((exportPath, size, ), None, ) is not None
+        if wanted and image is not None:
+            self.loaded.emit(exportPath, size, image, )
+
+    def cancel(self, exportPath: str, size: int, ):
+        key = (exportPath, size, )
+        with self.__lock:
+            pending = self.__pending.get(key, )
+            if pending is None:
+                return
+            pending[1] -= 1
+            if pending[1] > 0:
+                return
+            del self.__pending[key]
+        pending[0].cancel()
+
+    def retain(self, keys: Iterable[Tuple[str, int]], ):
+        """
+        Cancel every pending request not in `keys`
+        """
+        keep = set(keys, )
+        with self.__lock:
+            dropped = [k for k in self.__pending if k not in keep]
+            futures = [self.__pending.pop(k, )[0] for k in dropped]
+        for future in futures:
+            future.cancel()
+
+    def cancelAll(self, ):
+        self.retain((), )
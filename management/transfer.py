@@ -0,0 +1,125 @@
+from typing import (Optional, Any, )
+from enum import (Enum, )
+from pathlib import Path
+import errno
+import os
+import sys
+
+
+class ImportStrategy(Enum):
+    # Kernel-side copy when the digest is already known, otherwise a single
+    # pass copy that hashes while writing
+    COPY = "copy"
+    # Always copy inside the kernel (copy_file_range / sendfile)
+    KERNEL_COPY = "kernel-copy"
+    # Copy-on-write clone where the filesystem supports it, else KERNEL_COPY
+    REFLINK = "reflink"
+    # Hard link to the source, else KERNEL_COPY (e.g. across devices)
+    HARDLINK = "hardlink"
+    # Symbolic link to the absolute source path
+    SYMLINK = "symlink"
+
+
+# linux/fs.h: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+# Errors meaning "this fast path is not available here", not "the copy failed"
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY,
+    errno.EPERM, errno.EBADF, errno.ETXTBSY,
+}
+
+
+def _copyRange(inFd: int, outFd: int, size: int, ):
+    copied = 0
+    if hasattr(os, "copy_file_range", ):
+        try:
+            while copied < size:
+                n = os.copy_file_range(inFd, outFd, size - copied, copied, copied, )
+                if n == 0:
+                    break
+                copied += n
+            return
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    os.lseek(outFd, copied, os.SEEK_SET, )
+    if hasattr(os, "sendfile", ) and sys.platform.startswith("linux", ):
+        try:
+            while copied < size:
+                n = os.sendfile(outFd, inFd, copied, size - copied, )
+                if n == 0:
+                    break
+                copied += n
+            return
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    os.lseek(inFd, copied, os.SEEK_SET, )
+    os.lseek(outFd, copied, os.SEEK_SET, )
+    while True:
+        block = os.read(inFd, 1 << 20, )
+        if not block:
+            break
+        os.write(outFd, block, )
+
+
+def _kernelCopy(src: Path, dest: Path, ):
+    with open(src, "rb", ) as fsrc, open(dest, "wb", ) as fdst:
+        _copyRange(fsrc.fileno(), fdst.fileno(), os.fstat(fsrc.fileno(), ).st_size, )
+
+
+def _hashingCopy(src: Path, dest: Path, hasher: Any, blockSize: int = 1 << 20, ):
+    buffer = bytearray(blockSize, )
+    view = memoryview(buffer, )
+    with open(src, "rb", buffering=0, ) as fsrc, open(dest, "wb", buffering=0, ) as fdst:
+        while True:
+            n = fsrc.readinto(buffer, )
+            if not n:
+                break
+            hasher.update(view[:n], )
+            fdst.write(view[:n], )
+
+
+def _reflink(src: Path, dest: Path, ) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, "rb", ) as fsrc, open(dest, "wb", ) as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno(), )
+            return True
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    os.remove(dest, )
+    return False
+
+
+def transferFile(src: Path, dest: Path, strategy: ImportStrategy, hasher: Optional[Any] = None, ) -> Optional[str]:
+    """
+    Place the content of `src` at `dest` using `strategy`.
+    If `hasher` is given and the COPY strategy is used, the data is hashed
+    while it is copied and the hex digest is returned, so that `dest`
+    never has to be read back. Otherwise None is returned.
+    """
+    if strategy == ImportStrategy.SYMLINK:
+        os.symlink(src.absolute(), dest, )
+        return None
+
+    if strategy == ImportStrategy.HARDLINK:
+        try:
+            os.link(src, dest, )
+            return None
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    elif strategy == ImportStrategy.REFLINK:
+        if _reflink(src, dest, ):
+            return None
+    elif strategy == ImportStrategy.COPY and hasher is not None:
+        _hashingCopy(src, dest, hasher, )
+        return hasher.hexdigest()
+
+    _kernelCopy(src, dest, )
+    return None
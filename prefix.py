@@ -16,6 +16,8 @@ class PrefixStringEditor(Editor[str], ):
     ):
         super().__init__(parent, labelText=labelText, )
         self.__editor = QLineEdit("", )
+        # value before the latest change, reported along with it
+        self.__value = ""
         # 預設可接受的前綴（優先順序會用在自動補前綴時）
         self.__prefixes = prefixes if prefixes else [""]
         # 阻擋因程式設定文字造成的遞迴或多重事件
@@ -44,10 +46,9 @@ class PrefixStringEditor(Editor[str], ):
             self.__editor.setText(new_text, )
             self.__editor.blockSignals(False, )
             self.__suppress = False
-            # 發出 valueChanged，new value 已為 new_text
-            self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
-        else:
-            self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
+        # 發出 valueChanged，new value 已為 new_text
+        oldValue, self.__value = self.__value, self.getValue()
+        self._emitValueChanged(ValueChangedData(oldValue, self.__value, ), )
 
     def getValue(self, ) -> str:
         return self.__editor.text()
@@ -0,0 +1,360 @@
+from typing import (Optional, Iterable, List, Dict, Any, Callable, )
+from collections import (OrderedDict, )
+
+from PySide6.QtCore import (
+    QObject, Slot, Qt, QPoint, QTimer,
+    QAbstractListModel, QModelIndex, QPersistentModelIndex, QSize,
+)
+from PySide6.QtGui import (QPixmap, QIcon, QImage, )
+from PySide6.QtWidgets import (QWidget, QListView, )
+
+from .management import (ResourceManager, ResourceChange, ResourceChangeKind, )
+from .management.thumbnail import (ThumbnailCache, ThumbnailLoader, )
+from .management.change_notifier import (ResourceChangeNotifier, )
+
+
+class ResourceListModel(QAbstractListModel, ):
+    """
+    Resources of a ResourceManager as a list model.
+    Rows are exposed in batches through canFetchMore/fetchMore, and icons are
+    only loaded when the view asks for them, i.e. for rows being painted.
+    Once refreshed, the model follows the manager's changes row by row.
+    """
+    PathRole = Qt.ItemDataRole.UserRole
+
+    def __init__(
+        self, manager: ResourceManager,
+        extensions: Optional[Iterable[str]] = None,
+        parent: Optional[QObject] = None, /,
+        thumbnails: Optional[ThumbnailCache] = None,
+        thumbnailSize: int = 128,
+        batchSize: int = 256,
+        iconCacheSize: int = 512,
+    ):
+        super().__init__(parent, )
+        self.__manager = manager
+        self.__extensions = set(extensions, ) if extensions is not None else None
+        self.__batchSize = batchSize
+        # listed paths, in row order; resources are never looked up for them
+        self.__paths: List[str] = []
+        # rows currently exposed to views
+        self.__loaded = 0
+        # changes are only followed after the first refresh
+        self.__populated = False
+
+        self.__thumbnailSize = thumbnailSize
+        self.__loader: Optional[ThumbnailLoader] = None
+        self.__placeholder = QIcon()
+        if thumbnails is not None:
+            self.__loader = ThumbnailLoader(thumbnails, self, )
+            self.__loader.loaded.connect(self.__onThumbnailLoaded, )
+            placeholder = QPixmap(thumbnailSize, thumbnailSize, )
+            placeholder.fill(Qt.GlobalColor.transparent, )
+            self.__placeholder = QIcon(placeholder, )
+        # only recently painted icons are kept, so memory does not grow with scrolling
+        self.__icons: "OrderedDict[str, QIcon]" = OrderedDict()
+        self.__iconCacheSize = iconCacheSize
+        # path -> row of icons being loaded
+        self.__pendingIcons: Dict[str, int] = {}
+
+        self.__query = ""
+        self.__filter: Optional[Callable[[str], bool]] = None
+        self.__sortKey: Optional[Callable[[str], Any]] = None
+        self.__descending = False
+        self.__toolTip: Optional[Callable[[str], Optional[str]]] = None
+
+        ResourceChangeNotifier.forManager(manager, ).changed.connect(self.__onResourceChanged, )
+
+    def setQuery(self, query: str, ):
+        """
+        Only list resources whose path contains `query`, ignoring case.
+        Takes effect on the next refresh.
+        """
+        self.__query = query
+
+    def query(self, ) -> str:
+        return self.__query
+
+    def setFilter(self, predicate: Optional[Callable[[str], bool]], ):
+        """
+        Only list resources whose path satisfies `predicate`. Takes effect on
+        the next refresh.
+        """
+        self.__filter = predicate
+
+    def setSortKey(self, key: Optional[Callable[[str], Any]], descending: bool = False, ):
+        """
+        Order resources by `key` of their path, or by path if None. Takes
+        effect on the next refresh.
+        """
+        self.__sortKey = key
+        self.__descending = descending
+
+    def setToolTip(self, provider: Optional[Callable[[str], Optional[str]]], ):
+        self.__toolTip = provider
+
+    def refresh(self, ):
+        # comes sorted by path from the manager's search index
+        paths = self.__manager.searchPaths(self.__query, self.__extensions, )
+        if self.__filter is not None:
+            paths = [p for p in paths if self.__filter(p, )]
+        if self.__sortKey is not None:
+            paths.sort(key=self.__sortKey, reverse=self.__descending, )
+        elif self.__descending:
+            paths.reverse()
+        self.beginResetModel()
+        self.__paths = paths
+        self.__loaded = 0
+        self.__populated = True
+        self.__pendingIcons.clear()
+        if self.__loader is not None:
+            self.__loader.cancelAll()
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex(), ) -> int:
+        return 0 if parent.isValid() else self.__loaded
+
+    def canFetchMore(self, parent: QModelIndex | QPersistentModelIndex, ) -> bool:
+        return not parent.isValid() and self.__loaded < len(self.__paths, )
+
+    def fetchMore(self, parent: QModelIndex | QPersistentModelIndex, ):
+        if not parent.isValid():
+            self.__loadUpTo(self.__loaded + self.__batchSize, )
+
+    def __loadUpTo(self, count: int, ):
+        count = min(count, len(self.__paths, ), )
+        if count <= self.__loaded:
+            return
+        self.beginInsertRows(QModelIndex(), self.__loaded, count - 1, )
+        self.__loaded = count
+        self.endInsertRows()
+
+    def __accepts(self, change: ResourceChange, ) -> bool:
+        if self.__extensions is not None and change.suffix not in self.__extensions:
+            return False
+        if self.__query and self.__query.casefold() not in change.path.casefold():
+            return False
+        return self.__filter is None or self.__filter(change.path, )
+
+    def __sortValue(self, path: str, ) -> Any:
+        return self.__sortKey(path, ) if self.__sortKey is not None else path.casefold()
+
+    def __insertionRow(self, path: str, ) -> int:
+        # binary search, so the sort key is only computed for a few rows
+        value = self.__sortValue(path, )
+        low, high = 0, len(self.__paths, )
+        while low < high:
+            middle = (low + high) // 2
+            other = self.__sortValue(self.__paths[middle], )
+            if (other < value) if self.__descending else (value < other):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def __find(self, path: str, ) -> int:
+        # rows are in sort order, so the path is right before where it would be inserted,
+        # among the rows sorting the same; a sort key that changed since the refresh falls
+        # back to a scan
+        row = self.__insertionRow(path, ) - 1
+        value = self.__sortValue(path, )
+        while row >= 0 and self.__sortValue(self.__paths[row], ) == value:
+            if self.__paths[row] == path:
+                return row
+            row -= 1
+        try:
+            return self.__paths.index(path, )
+        except ValueError:
+            return -1
+
+    @Slot(object, )
+    def __onResourceChanged(self, change: ResourceChange, ):
+        if not self.__populated:
+            return
+        if change.kind == ResourceChangeKind.CLEARED:
+            self.refresh()
+        elif change.kind == ResourceChangeKind.ADDED:
+            if self.__manager.getResource(change.path, ) is None or not self.__accepts(change, ) or \
+                    self.__find(change.path, ) >= 0:
+                return
+            row = self.__insertionRow(change.path, )
+            # rows past the fetched ones are not known to views yet
+            if row < self.__loaded or self.__loaded == len(self.__paths, ):
+                self.beginInsertRows(QModelIndex(), row, row, )
+                self.__paths.insert(row, change.path, )
+                self.__loaded += 1
+                self.endInsertRows()
+            else:
+                self.__paths.insert(row, change.path, )
+        elif change.kind == ResourceChangeKind.REMOVED:
+            row = self.__find(change.path, )
+            if row < 0:
+                return
+            self.__icons.pop(change.path, None, )
+            self.__pendingIcons.pop(change.path, None, )
+            if row < self.__loaded:
+                self.beginRemoveRows(QModelIndex(), row, row, )
+                del self.__paths[row]
+                self.__loaded -= 1
+                self.endRemoveRows()
+            else:
+                del self.__paths[row]
+        # REF_COUNT changes are ignored, no role shows reference counts
+
+    def pathAt(self, row: int, ) -> Optional[str]:
+        if 0 <= row < self.__loaded:
+            return self.__paths[row]
+        return None
+
+    def rowOf(self, path: str, ) -> int:
+        """
+        Row of `path`, fetching rows up to it if needed. -1 if not listed.
+        """
+        row = self.__find(path, )
+        if row >= self.__loaded:
+            self.__loadUpTo(row + self.__batchSize - row % self.__batchSize, )
+        return row
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.ItemDataRole.DisplayRole, ) -> Any:
+        path = self.pathAt(index.row(), ) if index.isValid() else None
+        if path is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole or role == self.PathRole:
+            return path
+        if role == Qt.ItemDataRole.DecorationRole and self.__loader is not None:
+            return self.__icon(index.row(), path, )
+        if role == Qt.ItemDataRole.ToolTipRole and self.__toolTip is not None:
+            return self.__toolTip(path, )
+        return None
+
+    def __icon(self, row: int, path: str, ) -> QIcon:
+        icon = self.__icons.get(path, )
+        if icon is not None:
+            self.__icons.move_to_end(path, )
+            return icon
+        if path not in self.__pendingIcons:
+            thumbnail = self.__loader.request(path, self.__thumbnailSize, )
+            if thumbnail is not None:
+                return self.__rememberIcon(path, thumbnail, )
+            self.__pendingIcons[path] = row
+        return self.__placeholder
+
+    def __rememberIcon(self, path: str, thumbnail: QImage, ) -> QIcon:
+        icon = QIcon(QPixmap.fromImage(thumbnail, ), )
+        self.__icons[path] = icon
+        while len(self.__icons, ) > self.__iconCacheSize:
+            self.__icons.popitem(last=False, )
+        return icon
+
+    @Slot(str, int, QImage, )
+    def __onThumbnailLoaded(self, path: str, size: int, thumbnail: QImage, ):
+        row = self.__pendingIcons.pop(path, None, )
+        if row is None or size != self.__thumbnailSize:
+            return
+        self.__rememberIcon(path, thumbnail, )
+        if self.pathAt(row, ) != path:
+            # rows moved since the icon was requested
+            row = self.__find(path, )
+        if 0 <= row < self.__loaded:
+            index = self.index(row, )
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole, ], )
+
+    def retainIcons(self, first: int, last: int, ):
+        """
+        Cancel icon loads of rows outside `first`..`last`
+        """
+        if self.__loader is None:
+            return
+        for path, row in list(self.__pendingIcons.items(), ):
+            if not first <= row <= last:
+                del self.__pendingIcons[path]
+        self.__loader.retain((p, self.__thumbnailSize, ) for p in self.__pendingIcons)
+
+    def cancelIcons(self, ):
+        self.__pendingIcons.clear()
+        if self.__loader is not None:
+            self.__loader.cancelAll()
+
+
+class ResourceBrowser(QListView, ):
+    """
+    List view over a ResourceListModel, shared by the resource pickers.
+    Queries typed in a row are applied once typing pauses.
+    """
+    # Milliseconds a query waits for the next one before the list is refreshed
+    QUERY_DELAY = 150
+
+    def __init__(
+        self, manager: ResourceManager,
+        extensions: Optional[Iterable[str]] = None,
+        parent: Optional[QWidget] = None, /,
+        thumbnails: Optional[ThumbnailCache] = None,
+        thumbnailSize: int = 128,
+        iconSize: Optional[int] = None,
+    ):
+        super().__init__(parent, )
+        self.__model = ResourceListModel(
+            manager, extensions, self,
+            thumbnails=thumbnails, thumbnailSize=thumbnailSize,
+        )
+        self.setModel(self.__model, )
+        # rows all have the same height, so the view never measures every row
+        self.setUniformItemSizes(True, )
+        if iconSize is not None:
+            self.setIconSize(QSize(iconSize, iconSize, ), )
+        self.verticalScrollBar().valueChanged.connect(self.__onScrolled, )
+        self.__queryTimer = QTimer(self, )
+        self.__queryTimer.setSingleShot(True, )
+        self.__queryTimer.setInterval(self.QUERY_DELAY, )
+        self.__queryTimer.timeout.connect(self.__applyQuery, )
+
+    def resourceModel(self, ) -> ResourceListModel:
+        return self.__model
+
+    def refresh(self, ):
+        # a query waiting to be applied is applied by this refresh
+        self.__queryTimer.stop()
+        self.__model.refresh()
+
+    @Slot(str, )
+    def setQuery(self, query: str, ):
+        """
+        Narrow the list to paths containing `query`, keeping the current
+        resource selected if it still matches. The list is refreshed after
+        QUERY_DELAY, unless another query comes first.
+        """
+        if query == self.__model.query() and not self.__queryTimer.isActive():
+            return
+        self.__model.setQuery(query, )
+        self.__queryTimer.start()
+
+    @Slot()
+    def __applyQuery(self, ):
+        current = self.currentPath()
+        self.__model.refresh()
+        if current:
+            self.setCurrentPath(current, )
+
+    def currentPath(self, ) -> Optional[str]:
+        index = self.currentIndex()
+        return self.__model.pathAt(index.row(), ) if index.isValid() else None
+
+    def setCurrentPath(self, path: str, ) -> bool:
+        row = self.__model.rowOf(path, )
+        if row < 0:
+            return False
+        index = self.__model.index(row, )
+        self.setCurrentIndex(index, )
+        self.scrollTo(index, )
+        return True
+
+    @Slot(int, )
+    def __onScrolled(self, _: int, ):
+        first = self.indexAt(QPoint(0, 0, ), ).row()
+        if first < 0:
+            return
+        last = self.indexAt(QPoint(0, self.viewport().height() - 1, ), ).row()
+        self.__model.retainIcons(first, last if last >= 0 else self.__model.rowCount() - 1, )
+
+    def cancelIcons(self, ):
+        self.__model.cancelIcons()
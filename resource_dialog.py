@@ -0,0 +1,166 @@
+from typing import (Optional, Iterable, Tuple, Any, )
+from functools import (partial, )
+import logging
+
+from PySide6.QtCore import (Slot, )
+from PySide6.QtGui import (QPixmap, QIcon, )
+from PySide6.QtWidgets import (
+    QDialog,
+    QLayout,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPushButton,
+    QLineEdit,
+    QInputDialog,
+    QFileDialog,
+    QDialogButtonBox,
+    QMessageBox,
+)
+
+from .management import (ResourceManager, ReferenceCountedResource, )
+from .management.future_watcher import (ResourceFutureWatcher, )
+from .resource_browser import (ResourceBrowser, )
+from .dialog_pool import (DialogPool, )
+
+_logger = logging.getLogger(__name__, )
+
+
+class ResourcePickerDialog(QDialog, ):
+    """
+    Dialog of the resource pickers: a searchable list of the manager's
+    resources, with buttons to add a file to the manager and to remove the
+    selected resource. `translation` gives the texts shown, as
+    FilePickerTranslation and ImagePickerTranslation do.
+    """
+
+    def __init__(
+        self, resourceManager: ResourceManager,
+        allowExtensions: Optional[Iterable[str]],
+        translation: Any,
+        browser: ResourceBrowser,
+    ):
+        super().__init__()
+        self.__manager = resourceManager
+        self.__extensions = allowExtensions
+        self.__i18n = translation
+        # label of the picker the dialog is open for
+        self.__labelText: Optional[str] = None
+
+        self.setModal(True)
+        self.setWindowTitle(self.__i18n.resourceManagerTitle())
+        self.__layout = QVBoxLayout(self)
+
+        self.__search = QLineEdit()
+        self.__search.setPlaceholderText(self.__i18n.searchPlaceholder())
+        self.__search.setClearButtonEnabled(True)
+        self.__layout.addWidget(self.__search)
+
+        self.__list = browser
+        self.__layout.addWidget(self.__list)
+
+        btnRow = QHBoxLayout()
+        self.__addBtn = QPushButton(self.__i18n.addButton())
+        self.__removeBtn = QPushButton(self.__i18n.removeButton())
+        btnRow.addWidget(self.__addBtn)
+        btnRow.addWidget(self.__removeBtn)
+        self.__layout.addLayout(btnRow)
+
+        self.__buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        self.__layout.addWidget(self.__buttons)
+
+        # connections
+        self.__search.textChanged.connect(self.__list.setQuery)
+        self.__addBtn.clicked.connect(self.__onAdd)
+        self.__removeBtn.clicked.connect(self.__onRemove)
+        self.__buttons.accepted.connect(self.accept)
+        self.__buttons.rejected.connect(self.reject)
+
+    def resourceBrowser(self, ) -> ResourceBrowser:
+        return self.__list
+
+    def _insertControls(self, layout: QLayout, ):
+        """
+        Show `layout` between the search box and the list
+        """
+        self.__layout.insertLayout(1, layout, )
+
+    def _fileFilter(self, ) -> str:
+        """
+        Filter of the file dialog picking a file to add
+        """
+        return ""
+
+    def _acceptAdd(self, path: str, ) -> bool:
+        """
+        Whether the file picked at `path` is to be added
+        """
+        return True
+
+    def _prepare(self, ):
+        """
+        Bring the list up to date before the dialog is shown
+        """
+        self.__list.refresh()
+
+    def _finish(self, ):
+        """
+        Called once the dialog is closed
+        """
+
+    @Slot()
+    def __onAdd(self, ):
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            self.__i18n.dialogTitle(self.__labelText),
+            filter=self._fileFilter(),
+        )
+        if not path or not self._acceptAdd(path, ):
+            return
+        # add to resource manager (copy into root if needed)
+        subFolder = QInputDialog.getText(
+            self,
+            self.__i18n.dialogTitle(self.__labelText),
+            self.__i18n.subFolderLabel(),
+            text="",
+        )
+        # hashing and copying run in the background, the dialog stays responsive
+        watcher = ResourceFutureWatcher(self.__manager.addResourceAsync(
+            path, True, subFolder=subFolder[0] if subFolder[1] else '',
+        ), self, )
+        watcher.finished.connect(self.__onAdded, )
+        watcher.failed.connect(partial(self.__onAddFailed, path, ), )
+
+    @Slot(object, )
+    def __onAdded(self, res: ReferenceCountedResource, ):
+        # the list already got the new row from the manager's change events
+        self.__list.setCurrentPath(res.path, )
+
+    def __onAddFailed(self, path: str, error: BaseException, ):
+        _logger.warning("Failed to add %s", path, exc_info=error, )
+        QMessageBox.warning(self, self.__i18n.addFailedTitle(), self.__i18n.addFailed(path, error, ), )
+
+    @Slot()
+    def __onRemove(self, ):
+        path = self.__list.currentPath()
+        if not path:
+            return
+        # the row goes away through the manager's change events
+        self.__manager.removeResource(path, True)
+
+    def choose(
+        self, value: Optional[str], labelText: Optional[str],
+        windowIcon: Optional[QIcon | QPixmap],
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Show the dialog with `value` selected. Whether it was accepted, and
+        the resource path selected then.
+        """
+        self.__labelText = labelText
+        DialogPool.setWindowIcon(self, windowIcon, )
+        self._prepare()
+        if value:
+            self.__list.setCurrentPath(value, )
+
+        accepted = self.exec() == QDialog.DialogCode.Accepted
+        self._finish()
+        return accepted, self.__list.currentPath() if accepted else None
@@ -10,12 +10,15 @@ class StringEditor(Editor[str], ):
     def __init__(self, parent: Optional[QObject] = None, /, labelText: Optional[str] = None, ):
         super().__init__(parent, labelText=labelText, )
         self.__editor = QLineEdit("", )
+        # value before the latest change, reported along with it
+        self.__value = ""
         self.__editor.textEdited.connect(self.onEdited, )
         self.__editor.textChanged.connect(self.__onTextChanged, )
 
     @Slot(str, )
     def __onTextChanged(self, _: str, ):
-        self.valueChanged.emit(ValueChangedData(None, self.getValue(), ), )
+        oldValue, self.__value = self.__value, self.getValue()
+        self._emitValueChanged(ValueChangedData(oldValue, self.__value, ), )
 
     def getValue(self, ) -> str:
         return self.__editor.text()
@@ -0,0 +1,63 @@
+"""
+The repository root is the package itself, and its `string.py` would shadow
+the standard library if the root were put on sys.path. The package is
+registered here as `editors` instead, without running its `__init__` (which
+needs PySide6), so `editors.management` and the other subpackages import
+on their own. Also registered under the folder's name, the one pytest gives
+the root package, so pytest reuses it rather than importing it again.
+Test modules import this one, so they also run directly with python.
+"""
+from typing import (List, )
+from pathlib import Path
+import importlib.util
+import sys
+
+ROOT = Path(__file__, ).resolve().parents[1]
+PACKAGE = "editors"
+
+
+def _registerPackage():
+    if PACKAGE in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, ROOT / "__init__.py", submodule_search_locations=[ROOT.as_posix(), ],
+    )
+    package = importlib.util.module_from_spec(spec, )
+    sys.modules[PACKAGE] = package
+    sys.modules.setdefault(ROOT.name, package, )
+
+
+_registerPackage()
+
+from editors.management import (ResourcePathResolver, )  # noqa: E402
+
+
+class IdentityResolver(ResourcePathResolver, ):
+    """
+    Paths relative to the root exported as they are, conflicting names
+    prefixed with "_"
+    """
+    def importPathToRelativePath(self, path: str, ) -> str:
+        return path
+
+    def exportPathFromRelativePath(self, path: str, ) -> str:
+        return path
+
+    def resolveNameConflict(self, name: str, ) -> str:
+        return "_" + name
+
+    def isImportantResource(self, fullPath: str, ) -> bool:
+        return False
+
+
+def writeFiles(folder: Path, contents: List[str], ) -> List[str]:
+    """
+    Write `contents[i]` to `folder`/f{i}.txt, and return the posix paths
+    """
+    folder.mkdir(parents=True, exist_ok=True, )
+    paths = []
+    for i, content in enumerate(contents, ):
+        path = folder / f"f{i}.txt"
+        path.write_text(content, )
+        paths.append(path.as_posix(), )
+    return paths
@@ -0,0 +1,133 @@
+import copy
+import os
+import sys
+
+import pytest
+
+import conftest  # noqa: F401  registers the package
+
+pytest.importorskip("PySide6", )
+
+from editors.interface import (ArrayEditor, Editor, ValueChangedData, ValueDelta, )  # noqa: E402
+
+
+class _Leaf(Editor[int], ):
+    def __init__(self, value: int = 0, ):
+        super().__init__()
+        self.value = value
+
+    def bindEditingWidget(self, parent=None, ):
+        from PySide6.QtWidgets import (QWidget, )
+        return QWidget(parent, )
+
+    def getValue(self, ) -> int:
+        return self.value
+
+    def setValue(self, value: int, ):
+        old, self.value = self.value, value
+        self._emitValueChanged(ValueChangedData(old, value, ), )
+
+    def edit(self, value: int, ):
+        self.setValue(value, )
+        self._emitEdited()
+
+
+@pytest.fixture(scope="module", )
+def qapp():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen", )
+    from PySide6.QtWidgets import (QApplication, )
+    return QApplication.instance() or QApplication([], )
+
+
+def _record(editor: Editor, ) -> list:
+    changes = []
+    editor.valueChanged.connect(changes.append, )
+    return changes
+
+
+def test_delta_apply():
+    value = {"items": [1, 2, 3, ], "name": "a", }
+    cases = [
+        (ValueDelta(("name", ), "a", "b", ), {"items": [1, 2, 3, ], "name": "b", }),
+        (ValueDelta(("items", 1, ), 2, 5, ), {"items": [1, 5, 3, ], "name": "a", }),
+        (ValueDelta(("items", 1, ), None, [7, 8, ], ValueDelta.INSERT, ), {"items": [1, 7, 8, 2, 3, ], "name": "a", }),
+        (ValueDelta(("items", 0, ), [1, 2, ], None, ValueDelta.REMOVE, ), {"items": [3, ], "name": "a", }),
+        (ValueDelta(("items", 0, ), None, 2, ValueDelta.MOVE, ), {"items": [2, 3, 1, ], "name": "a", }),
+        (ValueDelta((), None, 4, ), 4),
+    ]
+    for delta, expected in cases:
+        assert delta.applyTo(copy.deepcopy(value, ), ) == expected, delta.operation
+
+
+def test_nested_change():
+    data = ValueChangedData(1, 2, ).nested(3, lambda: [0, 0, 0, 2, ], )
+    assert data.oldValue is None
+    assert data.delta.keyPath == (3, ) and (data.delta.oldValue, data.delta.newValue, ) == (1, 2, )
+    assert data.nested("key", lambda: {}, ).delta.keyPath == ("key", 3, )
+    assert data.newValue == [0, 0, 0, 2, ]
+
+
+def test_update_folds_changes(qapp, ):
+    editor = _Leaf()
+    changes = _record(editor, )
+    edits = []
+    editor.onEdited.connect(lambda: edits.append(None, ), )
+    with editor.updating():
+        editor.edit(1, )
+        editor.beginUpdate()
+        editor.edit(2, )
+        editor.endUpdate()
+        assert changes == [] and edits == []
+        editor.edit(3, )
+    assert len(changes, ) == 1 and len(edits, ) == 1
+    assert (changes[0].oldValue, changes[0].newValue, ) == (0, 3, )
+
+    with editor.updating():
+        editor.setValue(4, )
+    assert changes[-1].delta is None and (changes[-1].oldValue, changes[-1].newValue, ) == (3, 4, )
+
+
+def test_unbalanced_end_update(qapp, ):
+    editor = _Leaf()
+    with pytest.raises(RuntimeError, ):
+        editor.endUpdate()
+    editor.beginUpdate()
+    editor.endUpdate()
+    with pytest.raises(RuntimeError, ):
+        editor.endUpdate()
+    assert not editor.isUpdating()
+
+
+def test_array_deltas(qapp, ):
+    editors = []
+
+    def build(index: int, ) -> _Leaf:
+        editors.append(_Leaf(), )
+        return editors[-1]
+
+    array = ArrayEditor(build, )
+    array.setValue([1, 2, 3, ], )
+    changes = _record(array, )
+    before = array.getValue()
+    last = editors[-1]
+
+    last.setValue(9, )
+    array.insertItems(1, [5, 6, ], )
+    array.removeItems(0, )
+    array.moveItem(0, 2, )
+    value = list(before, )
+    for change in changes:
+        value = change.delta.applyTo(value, )
+    assert value == array.getValue() == [6, 2, 5, 9, ]
+    assert changes[0].delta.keyPath == (2, )
+
+    # Changes of the rows and of the array fold into one
+    changes.clear()
+    with array.updating():
+        last.setValue(10, )
+        array.extend([7, ], )
+    assert len(changes, ) == 1 and changes[0].newValue == [6, 2, 5, 10, 7, ]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, ], ), )
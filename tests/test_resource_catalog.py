@@ -0,0 +1,30 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+from conftest import (IdentityResolver, writeFiles, )
+from editors.management import (ResourceManager, )
+
+
+def test_restore_after_compaction(tmp_path: Path, ):
+    root = tmp_path / "root"
+    paths = writeFiles(tmp_path / "source", [f"content {i}" for i in range(3, )], )
+    manager = ResourceManager(
+        root.as_posix(), IdentityResolver(), persistentCatalog=True, catalogCompactThreshold=3,
+    )
+    # The third add crosses the threshold and compacts the catalog
+    for path in paths:
+        manager.addResource(path, )
+    manager.shutdown()
+
+    restored = ResourceManager(
+        root.as_posix(), IdentityResolver(), persistentCatalog=True, catalogCompactThreshold=3,
+    )
+    assert restored.restoreCatalog() == 3
+    assert sorted(r.path for r in restored.listResources()) == ["f0.txt", "f1.txt", "f2.txt", ]
+    restored.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, ], ), )
@@ -0,0 +1,132 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+from conftest import (IdentityResolver, writeFiles, )
+from editors.management import (ResourceManager, )
+
+
+class _NoFreeName(IdentityResolver, ):
+    def resolveNameConflict(self, name: str, ) -> str:
+        return name
+
+
+def _manager(root: Path, **kwargs, ) -> ResourceManager:
+    return ResourceManager(root.as_posix(), IdentityResolver(), **kwargs, )
+
+
+@pytest.mark.parametrize("strictCompare", [False, True, ], )
+@pytest.mark.parametrize("maxWorkers", [0, None, ], )
+def test_add_resources_dedups_content(tmp_path: Path, strictCompare: bool, maxWorkers, ):
+    root = tmp_path / "root"
+    paths = writeFiles(tmp_path / "source", ["same", "other", "same", "size", ], )
+    manager = _manager(root, strictCompare=strictCompare, )
+    results = manager.addResources(paths, maxWorkers=maxWorkers, )
+    assert [r.path for r in results] == ["f0.txt", "f1.txt", "f0.txt", "f3.txt", ]
+    assert results[0] is results[2] and results[0].refCount == 2
+    assert sorted(p.name for p in root.glob("*.txt", )) == ["f0.txt", "f1.txt", "f3.txt", ]
+
+    # Same content again, from outside and from under the root
+    again = manager.addResources([paths[2], (root / "f1.txt").as_posix(), ], )
+    assert again[0] is results[0] and results[0].refCount == 3
+    assert again[1] is results[1] and results[1].refCount == 2
+    assert len(manager.listResources(), ) == 3
+    manager.shutdown()
+
+
+def test_name_conflicts_resolved_in_input_order(tmp_path: Path, ):
+    root = tmp_path / "root"
+    first = writeFiles(tmp_path / "a", ["one", ], )
+    second = writeFiles(tmp_path / "b", ["two", ], )
+    manager = _manager(root, )
+    results = manager.addResources(first + second, )
+    assert [r.path for r in results] == ["f0.txt", "_f0.txt", ]
+    assert (root / "_f0.txt").read_text() == "two"
+    manager.shutdown()
+
+
+def test_cancel_skips_remaining_files(tmp_path: Path, ):
+    root = tmp_path / "root"
+    paths = writeFiles(tmp_path / "source", ["a", "b", "c", ], )
+    manager = _manager(root, )
+    steps = []
+    results = manager.addResources(
+        paths, maxWorkers=0, progress=lambda done, total: steps.append((done, total, ), ),
+        isCancelled=lambda: len(steps, ) > 0,
+    )
+    assert results[0] is not None and results[1:] == [None, None, ]
+    assert [r.path for r in manager.listResources()] == ["f0.txt", ]
+    assert not (root / "f1.txt").exists()
+
+    # Nothing is left reserved or in flight by the cancelled call
+    results = manager.addResources(paths, maxWorkers=0, )
+    assert [r.path for r in results] == ["f0.txt", "f1.txt", "f2.txt", ]
+    assert results[0].refCount == 2
+    manager.shutdown()
+
+
+def test_cancel_before_start(tmp_path: Path, ):
+    root = tmp_path / "root"
+    paths = writeFiles(tmp_path / "source", ["a", "b", ], )
+    manager = _manager(root, )
+    assert manager.addResources(paths, isCancelled=lambda: True, ) == [None, None, ]
+    assert manager.listResources() == []
+    manager.shutdown()
+
+
+def test_no_free_name(tmp_path: Path, ):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "f0.txt").write_text("taken", )
+    paths = writeFiles(tmp_path / "source", ["new", ], )
+    manager = ResourceManager(root.as_posix(), _NoFreeName(), )
+    with pytest.raises(FileExistsError, ):
+        manager.addResource(paths[0], )
+    assert manager.listResources() == []
+    # The failed call released what it had planned
+    (root / "f0.txt").unlink()
+    assert manager.addResource(paths[0], ).path == "f0.txt"
+    manager.shutdown()
+
+
+def test_collect_garbage(tmp_path: Path, ):
+    root = tmp_path / "root"
+    paths = writeFiles(tmp_path / "source", ["kept", "dropped", "again", ], )
+    manager = _manager(root, )
+    for path in paths:
+        manager.addResource(path, )
+    manager.removeResource("f1.txt", )
+    manager.removeResource("f2.txt", )
+    # Referenced again before the collection
+    manager.addResource(paths[2], )
+
+    # Still within the default grace period
+    report = manager.collectGarbage().result()
+    assert report.deleted == []
+
+    report = manager.collectGarbage(0, isCancelled=lambda: True, ).result()
+    assert report.cancelled and report.deleted == []
+    assert (root / "f1.txt").exists()
+
+    report = manager.collectGarbage(0, ).result()
+    assert report.deleted == [(root / "f1.txt").absolute().as_posix(), ]
+    assert report.freedBytes == len("dropped", )
+    assert not (root / "f1.txt").exists()
+    assert manager.getResource("f1.txt", ) is None
+    assert sorted(r.path for r in manager.listResources()) == ["f0.txt", "f2.txt", ]
+    assert manager.collectGarbage(0, ).result().deleted == []
+    manager.shutdown()
+
+
+def test_not_managed_files(tmp_path: Path, ):
+    root = tmp_path / "root"
+    manager = _manager(root, )
+    manager.addResource(writeFiles(tmp_path / "source", ["managed", ], )[0], )
+    (root / "loose.txt").write_text("loose", )
+    assert manager.listNotManagedFilesUnderRoot() == [(root / "loose.txt").absolute().as_posix(), ]
+    manager.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, ], ), )
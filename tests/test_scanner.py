@@ -0,0 +1,46 @@
+from pathlib import Path
+import shutil
+import sys
+
+import pytest
+
+import conftest  # noqa: F401  registers the package
+from editors.management import (DirectoryScanner, )
+
+
+def _write(path: Path, ):
+    path.parent.mkdir(parents=True, exist_ok=True, )
+    path.write_text(path.name, )
+
+
+def test_scan_filters_and_follows_changes(tmp_path: Path, ):
+    for name in ["a.png", "skip.tmp", "sub/b.png", "sub/deep/c.png", ".meta/index.json", ]:
+        _write(tmp_path / name, )
+    filtered = []
+
+    def isIgnored(path: str, ) -> bool:
+        filtered.append(path, )
+        return path.endswith(".tmp", )
+
+    scanner = DirectoryScanner(tmp_path, isIgnored, (".meta", ), )
+    root = tmp_path.as_posix()
+    assert scanner.scan() == {f"{root}/a.png", f"{root}/sub/b.png", f"{root}/sub/deep/c.png", }
+    assert len(filtered, ) == 4
+
+    # Only new files go through the filter again
+    filtered.clear()
+    _write(tmp_path / "sub/d.png", )
+    assert f"{root}/sub/d.png" in scanner.scan()
+    assert filtered == [f"{root}/sub/d.png", ]
+
+    shutil.rmtree(tmp_path / "sub", )
+    assert scanner.scan() == {f"{root}/a.png", }
+
+    filtered.clear()
+    scanner.invalidate()
+    assert scanner.scan() == {f"{root}/a.png", }
+    assert sorted(filtered, ) == [f"{root}/a.png", f"{root}/skip.tmp", ]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, ], ), )
@@ -0,0 +1,80 @@
+import sys
+
+import pytest
+
+import conftest  # noqa: F401  registers the package
+from editors.management import (PathSearchIndex, )
+
+
+def _index(*paths: str, ) -> PathSearchIndex:
+    index = PathSearchIndex()
+    for path in paths:
+        index.add(path, )
+    return index
+
+
+def test_substring_ignores_case_and_sorts():
+    index = _index("b/Stone.png", "a/stone.jpg", "c/wood.png", "A/STONES.png", )
+    assert index.search("stone", ) == ["a/stone.jpg", "A/STONES.png", "b/Stone.png", ]
+    assert index.search("", ) == ["a/stone.jpg", "A/STONES.png", "b/Stone.png", "c/wood.png", ]
+    assert index.search("metal", ) == []
+    assert index.search("\0", ) == []
+
+
+def test_prefix():
+    index = _index("tex/a.png", "Tex/b.png", "textures/c.png", "other/tex/d.png", )
+    assert index.search("tex/", prefix=True, ) == ["tex/a.png", "Tex/b.png", ]
+    assert index.search("tex", prefix=True, ) == ["tex/a.png", "Tex/b.png", "textures/c.png", ]
+
+
+def test_suffixes():
+    index = _index("a.png", "b.jpg", "c.png", )
+    assert index.search("", suffixes=[".png", ], ) == ["a.png", "c.png", ]
+    # every path has one of them
+    assert index.search("", suffixes=[".png", ".jpg", ], ) == ["a.png", "b.jpg", "c.png", ]
+    assert index.search("", suffixes=[], ) == []
+    index.remove("b.jpg", )
+    assert index.search("", suffixes=[".png", ], ) == ["a.png", "c.png", ]
+
+
+def test_remove_and_clear():
+    index = _index("a.png", "b.png", )
+    # merged, then one pending
+    assert index.search("png", ) == ["a.png", "b.png", ]
+    index.add("c.png", )
+    index.remove("c.png", )
+    index.remove("a.png", )
+    index.remove("missing.png", )
+    assert len(index, ) == 1
+    assert index.search("png", ) == ["b.png", ]
+    index.clear()
+    assert len(index, ) == 0 and index.search("", ) == []
+
+
+def test_refined_queries_after_changes():
+    index = _index("stone.png", "sand.png", "steel.png", )
+    assert index.search("s", ) == ["sand.png", "steel.png", "stone.png", ]
+    assert index.search("st", ) == ["steel.png", "stone.png", ]
+    index.add("stick.png", )
+    index.remove("stone.png", )
+    # the previous matches are stale after the changes
+    assert index.search("sti", ) == ["stick.png", ]
+    assert index.search("st", ) == ["steel.png", "stick.png", ]
+
+
+def test_many_paths_match_brute_force():
+    paths = [f"set{i % 7}/Item_{i:04d}.{'png' if i % 3 else 'jpg'}" for i in range(1000, )]
+    index = PathSearchIndex()
+    # more additions than MERGE_THRESHOLD at once, and queries past DENSE_MATCHES
+    for path in paths:
+        index.add(path, )
+    ordered = sorted(paths, key=str.casefold, )
+    for query in ["item", "item_0", "item_01", "set3/", "4.png", "0000", ]:
+        assert index.search(query, ) == [p for p in ordered if query in p.casefold()], query
+    assert index.search("SET2/item_00", prefix=True, ) == [
+        p for p in ordered if p.casefold().startswith("set2/item_00", )
+    ]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, ], ), )